@@ -1,11 +1,26 @@
 from __future__ import annotations
 
-from pydantic import Field
+from pathlib import Path
+from typing import Dict, List
+
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Leagues whose clubs are built into the canonical team registry
+# (services/utils/team_registry_service.py). Any other league is added by config: list it
+# in LEAGUES and drop its clubs at team_data_path(league). Without club data its fixtures
+# resolve no team ids, so the match store, points resolution and FBref team stats would
+# silently drop them: refuse to start instead.
+BUILTIN_LEAGUES = ("ENG-Premier League",)
+
+
+def team_data_path(league: str) -> Path:
+    """Club file for a league outside BUILTIN_LEAGUES: {team_id: [display name, [aliases]]}."""
+    return Path("data") / "teams" / "leagues" / f"{league}.json"
+
 
 class Settings(BaseSettings):
     # ---- Mongo ----
@@ -15,6 +30,40 @@ class Settings(BaseSettings):
     # ---- Server ----
     PORT: int = Field(default=8080, description="Port to run the server on")
 
+    # ---- Leagues ----
+    LEAGUES: List[str] = Field(
+        default=["ENG-Premier League"], description="soccerdata league ids to ingest (JSON list in env)"
+    )
+    SEASON: str = Field(default="2526", description="soccerdata season id, e.g. 2526")
+
+    # ---- Ingestion ----
+    INGEST_PROCESSES: int = Field(default=4, description="Worker processes for (league, source) scrapes")
+    SOURCE_CONCURRENCY: Dict[str, int] = Field(
+        default={"fotmob": 2, "whoscored": 1},
+        description="Max concurrent scrapes per source across leagues (JSON object in env)",
+    )
+
+    # ---- Scheduler ----
+    SCHEDULER_LEASE_BACKEND: str = Field(
+        default="file", description='"mongo" when running several instances, "file" for a single host'
+    )
+
+    @field_validator("LEAGUES")
+    @classmethod
+    def _supported_leagues(cls, leagues: List[str]) -> List[str]:
+        if not leagues:
+            raise ValueError("LEAGUES must name at least one league")
+        unsupported = [
+            league for league in leagues
+            if league not in BUILTIN_LEAGUES and not team_data_path(league).exists()
+        ]
+        if unsupported:
+            raise ValueError(
+                f"LEAGUES {unsupported} have no team registry data: add their clubs at "
+                f"{[str(team_data_path(league)) for league in unsupported]}"
+            )
+        return leagues
+
     # Pydantic Settings config
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -24,4 +73,19 @@ class Settings(BaseSettings):
     )
 
 
+    @property
+    def DEFAULT_LEAGUE(self) -> str:
+        return self.LEAGUES[0]
+
+
 settings = Settings() # type: ignore
+
+
+def fixtures_path(source: str, league: str, season: str) -> Path:
+    """On-disk fixtures file for a source ("fbref", "fotmob", "whoscored") / league / season."""
+    return Path("data") / source / "fixtures" / f"{league}_{season}.json"
+
+
+def table_path(source: str, kind: str, league: str, season: str) -> Path:
+    """On-disk Parquet table for a source / kind ("fixtures", "table") / league / season."""
+    return Path("data") / source / kind / f"{league}_{season}.parquet"
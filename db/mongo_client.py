@@ -8,6 +8,7 @@ COLLECTION_NAME = "users"
 client = AsyncIOMotorClient(MONGO_URL)
 db = client[MONGO_DB]
 collection = db[COLLECTION_NAME]
+wishlist_collection = db["fantasy_wishlists"]
 
 
 def fix_id(doc: dict) -> dict:
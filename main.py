@@ -1,4 +1,4 @@
-# from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 # routes
 from routes.admin.admin_route import router as admin_route
@@ -7,16 +7,34 @@ from routes.auth.register import router as user_registration_router
 from routes.user.user_actions import router as user_update_router
 from routes.fbref.fbref_fixtures import router as fixtures_router
 from routes.fbref.fbref_players import router as players_router
+from routes.fbref.fbref_teams import router as teams_router
+from routes.fbref.fbref_events import router as events_router
+from routes.matches.match_route import router as matches_router
 from routes.fanatsy.fantasy_route import router as fantasy_router
 from routes.fanatsy.fantasy_player_model_route import router as fantasy_player_model_router
 from fastapi.middleware.cors import CORSMiddleware as Cors
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from core.config import settings
-from services.startup.startup_service import StartupService
+from services.startup.startup_service import startup_service
+
+
+# ---- Lifespan: background ingestion ----
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve from the on-disk snapshots straight away; ingestion runs in the background
+    await startup_service.start()
+    yield
+    await startup_service.stop()
+
 
 app = FastAPI(
     title="WhoScored API",
     description="Scapres Fbref and Fotmob. EPL Predictor",
     version="1.0.0",
+    lifespan=lifespan,
+    # orjson for every route that returns plain data
+    default_response_class=ORJSONResponse,
 )
 
 # ---- Root route ----
@@ -40,8 +58,14 @@ app.include_router(table_router, prefix="/api/fotmob")
 app.include_router(user_update_router, prefix="/api/user")
 # players
 app.include_router(players_router, prefix="/api/fbref")
+# teams
+app.include_router(teams_router, prefix="/api/fbref")
+# match events
+app.include_router(events_router, prefix="/api/fbref")
 # fixtures
 app.include_router(fixtures_router, prefix="/api/fbref")
+# matches
+app.include_router(matches_router, prefix="/api/matches")
 # fantasy
 app.include_router(fantasy_router, prefix="/api/fantasy")
 # fantasy
@@ -56,6 +80,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ---- Compression ----
+# Routes going through response_cache are compressed (and cached) already and skipped here
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # ---- Run ----
 if __name__ == "__main__":
     import uvicorn
@@ -1,45 +1,98 @@
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
+import asyncio
+from typing import Dict, Optional
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 from services.fbref.fbref_service import FBREFService
 from services.utils.points_resolver_service import PointsResolverService
+from services.utils.job_queue_service import Job, job_queue
+from services.startup.startup_service import startup_service
+from core.config import settings
 
 router = APIRouter(
     tags=["Admin Actions"]
 )
 
-# Initialize FBREFService for Premier League 25/26
-fbs = FBREFService(
-    seasons='2526',
-    league='ENG-Premier League'
-)
+# One FBREFService per configured league, created on first use
+services: Dict[str, FBREFService] = {}
+
+
+def get_service(league: Optional[str]) -> FBREFService:
+    league = league or settings.DEFAULT_LEAGUE
+    if league not in settings.LEAGUES:
+        raise HTTPException(status_code=404, detail=f"League '{league}' is not configured")
+    if league not in services:
+        services[league] = FBREFService(seasons=settings.SEASON, league=league)
+    return services[league]
 
 # -----------------------------
 # Route: Update FBref JSON + resolve points automatically
 # -----------------------------
-@router.get("/update")
+async def run_update(job: Job, fbs: FBREFService, week: Optional[int]) -> dict:
+    # The FBref scrape + enrichment is blocking: keep it off the event loop
+    data = await asyncio.to_thread(fbs.update_json, week, job.report)
+
+    job.report("resolve points")
+    resolver = PointsResolverService(fbs.league, fbs.seasons[0])
+    await resolver.resolve_and_save_all_users()
+
+    fixtures = data.get("fixtures", [])
+    return {
+        "meta": data.get("meta", {}),
+        "fixtures": len(fixtures),
+        "enriched": sum(1 for f in fixtures if f.get("enriched")),
+    }
+
+
+@router.get("/update", status_code=202)
 async def update(
-    background_tasks: BackgroundTasks,
-    week: Optional[int] = Query(None, description="Optional week to return from JSON")
+    week: Optional[int] = Query(None, description="Optional week to return from JSON"),
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
 ):
     """
-    Update FBref JSON for a given week (or upcoming if none).
-    Points resolver runs automatically after the update.
+    Queue an FBref JSON update for a given week (or all weeks if none); points are
+    resolved once it's written. Returns the job straight away: poll
+    /update/jobs/{job_id} (from any worker) for progress. An identical update already
+    queued or running anywhere is reused instead of starting another one.
     """
+    fbs = get_service(league)
     try:
-        # Update FBref JSON
-        data = fbs.update_json(week)
-
-        # Trigger points resolver in background immediately
-        resolver = PointsResolverService()
-        background_tasks.add_task(resolver.resolve_and_save_all_users)
-
-        return JSONResponse(content={
-            "status": "success",
-            "message": "FBref JSON updated. Points resolver running in background.",
-            "data": data
+        job = await job_queue.submit(
+            "fbref-update",
+            lambda job: run_update(job, fbs, week),
+            key=("fbref-update", fbs.league, week),
+            params={"league": fbs.league, "week": week},
+            lane=("fbref", fbs.league),  # one writer per fixtures file
+        )
+        return JSONResponse(status_code=202, content={
+            "status": "queued" if job["waiters"] == 1 else "coalesced",
+            "message": "FBref update queued. Points resolver runs once it finishes.",
+            "job": job,
         })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.get("/update/jobs")
+async def update_jobs():
+    """Recent update jobs, newest first."""
+    return JSONResponse(content=await job_queue.list())
+
+
+@router.get("/update/jobs/{job_id}")
+async def update_job(job_id: str):
+    """Status, current stage / progress, per-stage timings and result of one update job."""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return JSONResponse(content=job)
+
+
+
+# -----------------------------
+# Route: background ingestion job status
+# -----------------------------
+@router.get("/jobs")
+async def jobs():
+    """Last run, duration and outcome of each ingestion job, plus the next scheduled poll."""
+    return JSONResponse(content=startup_service.status())
@@ -1,16 +1,30 @@
 # routes/fantasy/fantasy_players_route.py
-from fastapi import APIRouter, Query
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from services.fantasy.fantasy_optimizer_service import FantasyOptimizerService
 from services.fantasy.fantasy_player_model_service import FantasyPlayerModelService
+from services.fantasy.fantasy_projection_service import FantasyProjectionService
+from services.fantasy.fantasy_transfer_planner_service import FantasyTransferPlannerService
+from services.startup.startup_service import startup_service
+from core.config import settings
 
 router = APIRouter(
     tags=["Fantasy Players"]
 )
 
 fbs = FantasyPlayerModelService(
-    season='2526',
-    league='ENG-Premier League'
+    season=settings.SEASON,
+    league=settings.DEFAULT_LEAGUE
 )
+projections = FantasyProjectionService(fbs)
+optimizer = FantasyOptimizerService(projections)
+transfer_planner = FantasyTransferPlannerService(projections)
+
+# Reload FPL data and re-score projections whenever FBref team stats refresh
+# after a gameweek; the refreshes themselves run on the app scheduler, on the leader only
+fbs.fixture_service.add_refresh_listener(projections.refresh)
+startup_service.add_team_stats(fbs.fixture_service)
+
 @router.get("/by-position")
 def get_players_by_position(
     position_code: Optional[int] = Query(None, description="Position code: 1=GK, 2=DEF, 3=MID, 4=FWD")
@@ -35,3 +49,61 @@ def get_players_by_position(
             "FWD": fbs.get_players_by_position(4),
         }
     }
+
+
+@router.get("/projections")
+def get_projections(
+    horizon: int = Query(5, ge=1, le=38, description="Number of upcoming gameweeks to project"),
+    position_code: Optional[int] = Query(None, description="Position code: 1=GK, 2=DEF, 3=MID, 4=FWD")
+):
+    """
+    Expected points for every player over the next `horizon` gameweeks,
+    with per-gameweek and per-fixture breakdowns (double/blank gameweeks included).
+    """
+    return {"success": True, **projections.get_projections(horizon, position_code)}
+
+
+@router.get("/optimize")
+def optimize_squad(
+    horizon: int = Query(5, ge=1, le=38, description="Number of upcoming gameweeks to optimize for"),
+    budget: float = Query(100.0, gt=0, description="Budget in millions"),
+    locked: List[int] = Query([], description="Player ids that must be in the squad"),
+    excluded: List[int] = Query([], description="Player ids that must not be in the squad"),
+):
+    """
+    Best 15-man squad (2 GKP / 5 DEF / 5 MID / 3 FWD, max 3 per club, within budget)
+    by projected points over `horizon` gameweeks, with starting XI and captain.
+    """
+    try:
+        return {"success": True, **optimizer.optimize(horizon, budget, locked, excluded)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/transfers/{team_id}")
+def plan_transfers(
+    team_id: int,
+    gw: int = Query(..., ge=1, le=38, description="Gameweek whose picks form the current squad"),
+    horizon: int = Query(5, ge=1, le=38, description="Number of upcoming gameweeks to evaluate"),
+    free_transfers: int = Query(1, ge=0, le=5, description="Free transfers available (extra ones cost -4)"),
+    top_k: int = Query(10, ge=1, le=50, description="Number of plans to return"),
+):
+    """
+    Best 0/1/2-transfer plans (including hits) for a team's squad over `horizon` gameweeks.
+    """
+    try:
+        return {"success": True, **transfer_planner.plan(team_id, gw, horizon, free_transfers, top_k)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/fixture-ticker")
+def get_fixture_ticker(
+    horizon: int = Query(5, ge=1, le=38, description="Number of upcoming gameweeks to show"),
+    start_gw: Optional[int] = Query(None, ge=1, le=38, description="First gameweek (defaults to the next one)"),
+):
+    """
+    Per-team fixture run for the next `horizon` gameweeks from the precomputed difficulty grid,
+    easiest run first.
+    """
+    return {"success": True, **fbs.fixture_service.get_fixture_ticker(horizon, start_gw)}
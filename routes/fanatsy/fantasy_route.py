@@ -1,18 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from services.fantasy.fantasy_service import FantasyService
+from services.utils.response_cache_service import response_cache
+from services.fantasy.fantasy_wishlist_service import FantasyWishlistService
 
 router = APIRouter(tags=["Fantasy"])
 
 
 @router.get("/bootstrap")
-async def get_bootstrap(team_id: int):
+async def get_bootstrap(request: Request, team_id: int):
     """
     Fetch global Fantasy Premier League bootstrap-static data (players, teams, events).
+    Encoded and compressed once per fetch; repeat polls get 304 via ETag.
     """
     try:
         service = FantasyService(team_id)
         data = service.get_bootstrap()
-        return {"success": True, "data": data}
+        version = ("bootstrap", service.bootstrap_version())
+        return response_cache.respond(request, version, lambda: {"success": True, "data": data})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -46,11 +50,22 @@ async def get_team_picks(team_id: int, gw: int):
 @router.get("/team/{team_id}/wishlist")
 async def get_wishlist(team_id: int):
     """
-    Get wishlist players for this team (local persistence).
+    Get wishlist player ids for this team.
     """
     try:
-        service = FantasyService(team_id)
-        data = service.get_wishlist()
+        data = await FantasyWishlistService.get_wishlist(team_id)
+        return {"success": True, "data": data}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/team/{team_id}/wishlist/players")
+async def get_wishlist_players(team_id: int):
+    """
+    Get wishlist players with details joined from the cached bootstrap.
+    """
+    try:
+        data = await FantasyWishlistService.get_wishlist_players(team_id)
         return {"success": True, "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -62,8 +77,7 @@ async def add_to_wishlist(team_id: int, player_id: int):
     Add player to wishlist.
     """
     try:
-        service = FantasyService(team_id)
-        data = service.add_to_wishlist(player_id)
+        data = await FantasyWishlistService.add_to_wishlist(team_id, player_id)
         return {"success": True, "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -75,8 +89,7 @@ async def remove_from_wishlist(team_id: int, player_id: int):
     Remove player from wishlist.
     """
     try:
-        service = FantasyService(team_id)
-        data = service.remove_from_wishlist(player_id)
+        data = await FantasyWishlistService.remove_from_wishlist(team_id, player_id)
         return {"success": True, "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,63 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from core.config import settings
+from services.fbref.fbref_event_index_service import FBrefEventIndexService
+
+router = APIRouter(tags=["Fbref Events"])
+
+LEAGUE_QUERY = Query(None, description="soccerdata league id (defaults to the first configured league)")
+
+
+def get_index(league: Optional[str]) -> FBrefEventIndexService:
+    league = league or settings.DEFAULT_LEAGUE
+    if league not in settings.LEAGUES:
+        raise HTTPException(status_code=404, detail=f"League '{league}' is not configured")
+    return FBrefEventIndexService.for_league(league, settings.SEASON)
+
+
+# -----------------------------
+# Route: events across all enriched matches
+# -----------------------------
+@router.get("/events")
+async def events(
+    player: Optional[str] = Query(None, description="Scorer / booked / subbed-on player: full name or name prefix"),
+    assist: Optional[str] = Query(None, description="Assisting / subbed-off player: full name or name prefix"),
+    team: Optional[str] = Query(None, description="Team name or canonical team id"),
+    type: Optional[str] = Query(None, description="Event type (goal, yellow_card, ...) or group: goals, own_goals, cards, red_cards, subs"),
+    minute_from: Optional[int] = Query(None, ge=0, description="e.g. 80 for late events"),
+    minute_to: Optional[int] = Query(None, ge=0),
+    week: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    league: Optional[str] = LEAGUE_QUERY,
+):
+    """E.g. all goals by a player (?player=Saka&type=goals), cards by team, late goals (?type=goals&minute_from=80)."""
+    index = get_index(league)
+    try:
+        data = index.query(player, assist, team, type, minute_from, minute_to, week, limit)
+        return JSONResponse(content=data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# -----------------------------
+# Route: event leaderboards (top scorers, most booked teams, ...)
+# -----------------------------
+@router.get("/events/leaders")
+async def event_leaders(
+    by: str = Query("player", pattern="^(player|secondary|team)$"),
+    type: Optional[str] = Query(None, description="Event type or group, e.g. goals"),
+    team: Optional[str] = Query(None),
+    minute_from: Optional[int] = Query(None, ge=0),
+    minute_to: Optional[int] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    league: Optional[str] = LEAGUE_QUERY,
+):
+    """Event counts grouped by player, secondary player (e.g. assists) or team."""
+    index = get_index(league)
+    try:
+        data = index.counts(by, team=team, event_type=type, minute_from=minute_from, minute_to=minute_to)
+        return JSONResponse(content=data[:limit])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
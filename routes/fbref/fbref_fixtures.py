@@ -1,26 +1,74 @@
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+import asyncio
+from typing import Dict, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from core.config import settings
 from services.fbref.fbref_service import FBREFService
+from services.utils.artifact_store_service import artifact_store
+from services.utils.response_cache_service import response_cache
 
 
 router = APIRouter(tags=["Fbref Fixtures"])
 
-fbs = FBREFService(
-    seasons='2526',
-    league='ENG-Premier League'
-)
+# One FBREFService per configured league, created on first use
+services: Dict[str, FBREFService] = {}
+
+
+def get_service(league: Optional[str]) -> FBREFService:
+    league = league or settings.DEFAULT_LEAGUE
+    if league not in settings.LEAGUES:
+        raise HTTPException(status_code=404, detail=f"League '{league}' is not configured")
+    if league not in services:
+        services[league] = FBREFService(seasons=settings.SEASON, league=league)
+    return services[league]
+
 
 @router.get("/fixtures")
-async def fixtures(week: Optional[int] = Query(None, description="Optional week to return from JSON")):
+async def fixtures(
+    request: Request,
+    week: Optional[int] = Query(None, description="Optional week to return from JSON"),
+    events: bool = Query(True, description="Include each enriched match's events"),
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
+):
     """
     Return fixtures from JSON only.
     - If `week` is provided, return that week.
     - If no week is provided, return the upcoming week (yet to be played) without enrichment.
+    - `events=false` skips loading events; rows still carry `enriched` and `event_count`.
+    - Served from the response pre-rendered at update time (ETag / If-None-Match → 304);
+      a stored week never rendered yet is rendered on first request.
     """
+    fbs = get_service(league)
+    try:
+        if week is None:
+            week = fbs.match_store.next_round()
+        name = fbs.fixtures_artifact(week, include_events=events)
+        response = artifact_store.serve(request, name)
+        # Only weeks the store holds get artifacts: arbitrary ?week= values must not create files
+        if response is None and week in fbs.fixture_store.weeks():
+            await asyncio.to_thread(fbs.publish_fixtures, [week])
+            response = artifact_store.serve(request, name)
+        if response is not None:
+            return response
+        # Unknown week, nothing stored yet, or the artifact couldn't be written: render live,
+        # with the same content-hash ETag an artifact of this payload would carry
+        return response_cache.respond(request, None, fbs.get_fixtures(week, include_events=events))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/fixtures/{game_id}/events")
+async def fixture_events(
+    request: Request,
+    game_id: str,
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
+):
+    """Events of one enriched match, loaded on demand."""
+    fbs = get_service(league)
     try:
-        data = fbs.get_fixtures(week)
-        return JSONResponse(content=data)
+        return response_cache.respond(
+            request,
+            ("events", fbs.league, game_id, fbs.fixture_store.version()),
+            lambda: fbs.get_events(game_id),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
@@ -1,49 +1,84 @@
-from fastapi import APIRouter
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
-import soccerdata as sd
-import pandas as pd
 
-from routes.fbref.utils import detect_columns, flatten_columns
+from core.config import settings
+from services.fbref.fbref_snapshot_service import FBrefSnapshotService
+from services.fbref.fbref_feature_store_service import FBrefFeatureStoreService
+from services.utils.response_cache_service import response_cache
 
 router = APIRouter(tags=["Fbref Players"])
 
+
+async def get_snapshot(league: Optional[str]) -> FBrefSnapshotService:
+    """Snapshot for a configured league; built on the spot only if none exists on disk yet."""
+    league = league or settings.DEFAULT_LEAGUE
+    if league not in settings.LEAGUES:
+        raise HTTPException(status_code=404, detail=f"League '{league}' is not configured")
+    snapshot = FBrefSnapshotService.for_league(league, settings.SEASON)
+    if not snapshot.ready:
+        try:
+            await asyncio.to_thread(snapshot.ensure_ready)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    return snapshot
+
+
 # -----------------------------
 # Route: get all players with 3-4 standard stats
 # -----------------------------
 @router.get("/epl/players")
-async def get_epl_players():
-    fbref = sd.FBref(leagues="ENG-Premier League", seasons="2526")
-    df = fbref.read_player_season_stats("standard").reset_index()
-    df = flatten_columns(df)
-    col_map = detect_columns(df)
-    print(df.columns)
-    # Ensure required columns
-    required = ["player", "team", "pos"]
-    missing = [k for k in required if k not in col_map]
-    if missing:
-        return JSONResponse(
-            content={"error": f"Missing columns: {missing}", "all_columns": df.columns.tolist()},
-            status_code=500
-        )
-
-  # Select relevant columns
-    cols = ["player", "team", "pos", "Playing Time_Starts", "Performance_Gls",
-            "Performance_Ast", "Expected_xG", "Expected_xAG"]
-    players_df = df[cols].copy()
-
-    # Build player list
-    player_list = []
-    for _, row in players_df.iterrows():
-        player_list.append({
-            "label": str(row["player"]),
-            "team": str(row["team"]),
-            "position": str(row["pos"]),
-            "value": str(row["player"]).lower().replace(" ", "_"),
-            "starts": row["Playing Time_Starts"],
-            "goals": row["Performance_Gls"],
-            "assists": row["Performance_Ast"],
-            "xG": row["Expected_xG"],
-            "xGA": row["Expected_xAG"]
-        })
-
-    return JSONResponse(content=player_list)
+async def get_epl_players(
+    request: Request,
+    team: Optional[str] = Query(None, description="Team name or canonical team id"),
+    position: Optional[str] = Query(None, description="FBref position: GK, DF, MF or FW"),
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
+):
+    """Players from the precomputed season snapshot (refreshed in the background after matches)."""
+    snapshot = await get_snapshot(league)
+    version = ("players", snapshot.league, snapshot.season, snapshot.meta.get("last_updated"), team, position)
+    return response_cache.respond(request, version, lambda: snapshot.players_bytes(team, position))
+
+
+# -----------------------------
+# Route: type-ahead player search for season predictions
+# -----------------------------
+@router.get("/epl/players/search")
+async def search_epl_players(
+    q: str = Query(..., min_length=1, description="Name prefix, e.g. 'haa' or 'b fern'"),
+    limit: int = Query(10, ge=1, le=50),
+    team: Optional[str] = Query(None, description="Team name or canonical team id"),
+    position: Optional[str] = Query(None, description="FBref position: GK, DF, MF or FW"),
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
+):
+    """Top players whose name starts with the query (typo-tolerant), best goal involvement first."""
+    snapshot = await get_snapshot(league)
+    return JSONResponse(content=snapshot.search_players(q, limit, team, position))
+
+
+# -----------------------------
+# Route: side-by-side player comparison from the wide feature store
+# -----------------------------
+@router.get("/epl/players/compare")
+async def compare_epl_players(
+    players: str = Query(..., description="Comma-separated player names"),
+    stats: Optional[str] = Query(None, description="Comma-separated feature columns (default: all)"),
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
+):
+    """Shooting / passing / defense / possession stats (totals and per 90) for the given players."""
+    league = league or settings.DEFAULT_LEAGUE
+    if league not in settings.LEAGUES:
+        raise HTTPException(status_code=404, detail=f"League '{league}' is not configured")
+    features = FBrefFeatureStoreService.for_league(league, settings.SEASON)
+    names = [n.strip() for n in players.split(",") if n.strip()]
+    columns = [c.strip() for c in stats.split(",") if c.strip()] if stats else None
+    try:
+        # Memory-maps the Feather files on first use: keep that off the event loop
+        rows = await asyncio.to_thread(features.players, names, columns)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    rows = rows.astype(object).where(rows.notna(), None)
+    return JSONResponse(content=rows.to_dict(orient="records"))
@@ -1,9 +1,9 @@
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Query, Request
 from fastapi.responses import JSONResponse
-import soccerdata as sd
-import pandas as pd
 
-from routes.fbref.utils import detect_columns, flatten_columns
+from routes.fbref.fbref_players import get_snapshot
+from services.utils.response_cache_service import response_cache
 
 router = APIRouter(tags=["Fbref Teams"])
 
@@ -12,20 +12,25 @@ router = APIRouter(tags=["Fbref Teams"])
 # Route: get all teams
 # -----------------------------
 @router.get("/epl/teams")
-async def get_epl_teams():
-    fbref = sd.FBref(leagues="ENG-Premier League", seasons="2526")
-    df = fbref.read_player_season_stats("standard").reset_index()
-    df = flatten_columns(df)
+async def get_epl_teams(
+    request: Request,
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
+):
+    """Teams from the precomputed season snapshot."""
+    snapshot = await get_snapshot(league)
+    version = ("teams", snapshot.league, snapshot.season, snapshot.meta.get("last_updated"))
+    return response_cache.respond(request, version, snapshot.teams_bytes)
 
-    # Detect team column
-    col_map = detect_columns(df)
-    if "team" not in col_map:
-        return JSONResponse(
-            content={"error": "Could not detect team column", "columns": df.columns.tolist()},
-            status_code=500
-        )
 
-    teams = sorted(df[col_map["team"]].dropna().unique())
-    team_list = [{"label": t, "value": t.lower().replace(" ", "_")} for t in teams]
-
-    return JSONResponse(content=team_list)
+# -----------------------------
+# Route: type-ahead team search for season predictions
+# -----------------------------
+@router.get("/epl/teams/search")
+async def search_epl_teams(
+    q: str = Query(..., min_length=1, description="Name prefix or nickname, e.g. 'spu' or 'man u'"),
+    limit: int = Query(10, ge=1, le=50),
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
+):
+    """Teams whose name or any known alias starts with the query."""
+    snapshot = await get_snapshot(league)
+    return JSONResponse(content=snapshot.search_teams(q, limit))
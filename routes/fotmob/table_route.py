@@ -1,22 +1,43 @@
 
-from fastapi import APIRouter,HTTPException
-from typing import List
+import asyncio
+from fastapi import APIRouter,HTTPException, Query, Request
+from typing import Dict, List, Optional
 
+from core.config import settings
 from services.fotmob.fotmob_service import FotMobService
+from services.utils.artifact_store_service import artifact_store
+from services.utils.response_cache_service import response_cache
 
 router = APIRouter(tags=["Fotmob Table"])
 
 
-fotmob_service = FotMobService(
-    seasons='2526',
-    league='ENG-Premier League'
-)
+# One FotMobService per configured league, created on first use
+services: Dict[str, FotMobService] = {}
+
+
+def get_service(league: Optional[str]) -> FotMobService:
+    league = league or settings.DEFAULT_LEAGUE
+    if league not in settings.LEAGUES:
+        raise HTTPException(status_code=404, detail=f"League '{league}' is not configured")
+    if league not in services:
+        services[league] = FotMobService(seasons=settings.SEASON, league=league)
+    return services[league]
 
 
 @router.get("/table", response_model=List[dict])
-async def fixtures():
+async def fixtures(
+    request: Request,
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
+):
+    """Current table, pre-rendered at ingestion (scraped here only if it never was)."""
+    fotmob_service = get_service(league)
     try:
-        return fotmob_service.get_table()
+        response = artifact_store.serve(request, fotmob_service.table_artifact())
+        if response is not None:
+            return response
+        table = await asyncio.to_thread(fotmob_service.get_table)
+        # get_table() rendered the artifact; the content-hash ETag below is the same one
+        return response_cache.respond(request, None, table)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -0,0 +1,49 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+from core.config import settings
+from services.utils.match_store_service import MatchStoreService
+
+router = APIRouter(tags=["Matches"])
+
+
+def get_store(league: Optional[str]) -> MatchStoreService:
+    league = league or settings.DEFAULT_LEAGUE
+    if league not in settings.LEAGUES:
+        raise HTTPException(status_code=404, detail=f"League '{league}' is not configured")
+    return MatchStoreService.for_league(league, settings.SEASON)
+
+
+# -----------------------------
+# Route: canonical cross-source matches
+# -----------------------------
+@router.get("/")
+async def matches(
+    round: Optional[int] = Query(None, description="Round / gameweek"),
+    team: Optional[str] = Query(None, description="Canonical team id or any known team name"),
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
+):
+    """
+    Pre-joined matches (FBref / FotMob / WhoScored ids, scores, statuses).
+    Defaults to the next round to kick off.
+    """
+    store = get_store(league)
+    try:
+        if team:
+            data = store.by_team(team)
+            if round is not None:
+                data = [m for m in data if m.get("round") == round]
+        else:
+            data = store.by_round(round if round is not None else store.next_round())
+        return JSONResponse(content={"meta": {"last_updated": store.updated_at}, "matches": data})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{match_id}")
+async def match(match_id: str):
+    # Match ids start with their league: "<league>:<season>:<home>:<away>"
+    data = get_store(match_id.split(":", 1)[0]).get(match_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"Match {match_id} not found")
+    return JSONResponse(content=data)
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, Path
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from core.config import settings
 from models.user.register_models import UserRead
 from fastapi import Body
 from services.users.auth.register.register_service import UserService
 from services.users.update.user_service import UserUpdateService
+from services.utils.artifact_store_service import artifact_store
+from services.utils.points_resolver_service import PointsResolverService
 
 router = APIRouter(tags=["User Actions"])
 
@@ -45,4 +49,31 @@ async def get_all_users():
         users = await UserService.get_all_users()  
         return users
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/leaderboard")
+async def get_leaderboard(
+    request: Request,
+    round: Optional[int] = Query(None, description="Round number (defaults to the latest resolved round)"),
+    league: Optional[str] = Query(None, description="soccerdata league id (defaults to the first configured league)"),
+):
+    """
+    Leaderboard after a round, pre-rendered whenever points are resolved (ETag / 304).
+    Rendered here from the stored points only if it never was.
+    """
+    league = league or settings.DEFAULT_LEAGUE
+    if league not in settings.LEAGUES:
+        raise HTTPException(status_code=404, detail=f"League '{league}' is not configured")
+    resolver = PointsResolverService(league, settings.SEASON)
+    name = resolver.leaderboard_artifact(round)
+    try:
+        response = artifact_store.serve(request, name)
+        if response is None and artifact_store.etag(resolver.leaderboard_artifact()) is None:
+            await resolver.publish_leaderboards()
+            response = artifact_store.serve(request, name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if response is None:
+        raise HTTPException(status_code=404, detail=f"No leaderboard for round {round}" if round else "No leaderboard yet")
+    return response
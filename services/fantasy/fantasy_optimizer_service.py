@@ -0,0 +1,292 @@
+# services/fantasy/fantasy_optimizer_service.py
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from services.fantasy.fantasy_projection_service import FantasyProjectionService
+
+
+class FantasyOptimizerService:
+    """
+    Exact FPL squad optimizer on top of the expected-points projections.
+
+    Maximizes total squad expected points over the horizon subject to budget,
+    2/5/5/3 position quotas, max 3 per club and locked/excluded players, then picks
+    the best valid starting XI and captain from that squad.
+
+    Solver:
+      1. Dominance pruning - a player is dropped when enough cheaper-and-better players
+         exist that one of them can always be swapped in (club limits included).
+      2. Branch-and-bound over positions. The bound at every node is an exact knapsack
+         (position quotas + budget, clubs ignored), precomputed as NumPy tables, so the
+         search only branches where club limits actually bind.
+    """
+
+    POSITIONS = {1: "GKP", 2: "DEF", 3: "MID", 4: "FWD"}
+    QUOTAS = {1: 2, 2: 5, 3: 5, 4: 3}
+    SEARCH_ORDER = (1, 4, 3, 2)
+    MAX_PER_CLUB = 3
+    MAX_FULL_CLUBS = 15 // 3
+    # Valid outfield formations (DEF, MID, FWD) for the starting XI
+    FORMATIONS = [(d, m, f) for d in range(3, 6) for m in range(2, 6) for f in range(1, 4) if d + m + f == 10]
+    MAX_NODES = 500_000
+    CACHE_SIZE = 64
+    EPS = 1e-9
+
+    def __init__(self, projections: FantasyProjectionService):
+        self.projections = projections
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+
+    # ------------------------
+    # Public API
+    # ------------------------
+    def optimize(
+        self,
+        horizon: int,
+        budget: float = 100.0,
+        locked: Optional[Iterable[int]] = None,
+        excluded: Optional[Iterable[int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Best 15-man squad + XI for the next `horizon` gameweeks. Results are cached per
+        (projection version, horizon, budget, locked, excluded).
+        Raises ValueError if the constraints admit no squad.
+        """
+        locked_set = frozenset(locked or [])
+        excluded_set = frozenset(excluded or [])
+        if locked_set & excluded_set:
+            raise ValueError(f"Players both locked and excluded: {sorted(locked_set & excluded_set)}")
+
+        key = (self.projections.version, horizon, int(round(budget * 10)), tuple(sorted(locked_set)), tuple(sorted(excluded_set)))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        result = self._solve(horizon, key[2], locked_set, excluded_set)
+        self._cache[key] = result
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    # ------------------------
+    # Solver
+    # ------------------------
+    def _solve(self, horizon: int, budget: int, locked: frozenset, excluded: frozenset) -> Dict[str, Any]:
+        proj = self.projections
+        ep = proj.compute(horizon)["total"]
+        ids = np.array([p.get("id") for p in proj.players], dtype=np.int64)
+        cost = np.array([int(p.get("now_cost") or 0) for p in proj.players], dtype=np.int64)
+        pos = proj.player_pos
+        team = proj.player_team
+
+        unknown = locked - set(ids.tolist())
+        if unknown:
+            raise ValueError(f"Unknown locked player ids: {sorted(unknown)}")
+
+        is_locked = np.isin(ids, list(locked))
+        pool = np.isin(pos, list(self.QUOTAS)) & ~np.isin(ids, list(excluded))
+        if np.any(is_locked & ~pool):
+            raise ValueError(f"Locked players must be GKP/DEF/MID/FWD: {ids[is_locked & ~pool].tolist()}")
+
+        # Locked players are placed up front
+        quotas = dict(self.QUOTAS)
+        clubs = [0] * len(proj.team_ids)
+        locked_idx = np.flatnonzero(is_locked).tolist()
+        for i in locked_idx:
+            quotas[int(pos[i])] -= 1
+            clubs[int(team[i])] += 1
+        if any(q < 0 for q in quotas.values()):
+            raise ValueError("Locked players exceed a position quota (2 GKP / 5 DEF / 5 MID / 3 FWD)")
+        if any(c > self.MAX_PER_CLUB for c in clubs):
+            raise ValueError(f"Locked players exceed {self.MAX_PER_CLUB} per club")
+        remaining = budget - int(cost[locked_idx].sum())
+        if remaining < 0:
+            raise ValueError("Locked players exceed the budget")
+
+        # Per-position candidate lists (EP desc), after dominance pruning
+        candidates: Dict[int, np.ndarray] = {}
+        for code in self.SEARCH_ORDER:
+            idx = np.flatnonzero(pool & ~is_locked & (pos == code))
+            idx = self._prune_dominated(idx, ep, cost, team, self.QUOTAS[code])
+            order = np.lexsort((cost[idx], -ep[idx]))
+            candidates[code] = idx[order]
+
+        # Knapsack bound tables: tables[code][s, r, b] = best EP taking r of candidates[s:] within cost b
+        tables = {
+            code: self._knapsack_tables(ep[candidates[code]], cost[candidates[code]], quotas[code], remaining)
+            for code in self.SEARCH_ORDER
+        }
+        # rest[k][b] = best EP filling positions SEARCH_ORDER[k:] within cost b
+        rest = [np.zeros(remaining + 1)]
+        for code in reversed(self.SEARCH_ORDER):
+            rest.insert(0, self._max_plus(tables[code][0, quotas[code]], rest[0]))
+
+        if not np.isfinite(rest[0][remaining]):
+            raise ValueError("No squad satisfies the budget and position constraints")
+
+        # ---- branch-and-bound ----
+        order = self.SEARCH_ORDER
+        state = {"best": -np.inf, "squad": None, "nodes": 0}
+        chosen: List[int] = []
+        ep_l = ep.tolist()
+        cost_l = cost.tolist()
+        team_l = team.tolist()
+
+        def search(k: int, start: int, r: int, budget_left: int, value: float) -> None:
+            if state["nodes"] >= self.MAX_NODES:
+                return
+            state["nodes"] += 1
+
+            if r == 0:
+                if k + 1 == len(order):
+                    if value > state["best"] + self.EPS:
+                        state["best"], state["squad"] = value, list(chosen)
+                    return
+                k, start, r = k + 1, 0, quotas[order[k + 1]]
+                if r == 0:
+                    search(k, 0, 0, budget_left, value)
+                    return
+
+            code = order[k]
+            cands = candidates[code]
+            within = tables[code][start, r, :budget_left + 1]
+            after = rest[k + 1][budget_left::-1]
+            if value + np.max(within + after) <= state["best"] + self.EPS:
+                return
+
+            for j in range(start, len(cands) - r + 1):
+                i = int(cands[j])
+                c = cost_l[i]
+                if c > budget_left or clubs[team_l[i]] >= self.MAX_PER_CLUB:
+                    continue
+                # Candidates are EP-sorted, so once the bound starting at j fails, later j fail too
+                bound = tables[code][j, r, :budget_left + 1] + after
+                if value + np.max(bound) <= state["best"] + self.EPS:
+                    break
+                chosen.append(i)
+                clubs[team_l[i]] += 1
+                search(k, j + 1, r - 1, budget_left - c, value + ep_l[i])
+                clubs[team_l[i]] -= 1
+                chosen.pop()
+
+        search(0, 0, quotas[order[0]], remaining, float(ep[locked_idx].sum()))
+
+        if state["squad"] is None:
+            raise ValueError("No squad satisfies the budget, position and club constraints")
+
+        squad = locked_idx + state["squad"]
+        return self._build_result(
+            squad, ep, cost, horizon, budget,
+            optimal=state["nodes"] < self.MAX_NODES, nodes=state["nodes"],
+        )
+
+    def _prune_dominated(self, idx: np.ndarray, ep: np.ndarray, cost: np.ndarray, team: np.ndarray, quota: int) -> np.ndarray:
+        """
+        Drop players that can never be in an optimal squad. q dominates p when it is at
+        least as good and no more expensive (ties broken by index). If p has >= quota
+        dominators at its own club, or dominators spread over more clubs than the squad
+        could possibly block (quota - 1 same-position slots + MAX_FULL_CLUBS full clubs),
+        some dominator can always replace p without breaking any constraint.
+        """
+        if len(idx) <= quota:
+            return idx
+        e, c, t = ep[idx], cost[idx], team[idx]
+        ties = (e[None, :] == e[:, None]) & (c[None, :] == c[:, None])
+        earlier = idx[None, :] < idx[:, None]
+        # dom[p, q]: q dominates p
+        dom = (e[None, :] >= e[:, None]) & (c[None, :] <= c[:, None])
+        dom &= ~ties | earlier
+        np.fill_diagonal(dom, False)
+
+        same_club = dom & (t[None, :] == t[:, None])
+        enough_same_club = same_club.sum(axis=1) >= quota
+
+        other_club = dom & ~(t[None, :] == t[:, None])
+        n_teams = int(team.max()) + 1 if len(team) else 1
+        club_hits = np.zeros((len(idx), n_teams), dtype=bool)
+        rows, cols = np.nonzero(other_club)
+        club_hits[rows, t[cols]] = True
+        enough_clubs = club_hits.sum(axis=1) >= quota + self.MAX_FULL_CLUBS
+
+        return idx[~(enough_same_club | enough_clubs)]
+
+    @staticmethod
+    def _knapsack_tables(ep: np.ndarray, cost: np.ndarray, r_max: int, budget: int) -> np.ndarray:
+        """
+        tables[s, r, b]: max EP choosing exactly r of items[s:] with total cost <= b (-inf if impossible).
+        Built backwards so every suffix of the sorted candidate list has its own bound.
+        """
+        n = len(ep)
+        tables = np.full((n + 1, r_max + 1, budget + 1), -np.inf)
+        tables[n, 0, :] = 0.0
+        for s in range(n - 1, -1, -1):
+            t = tables[s + 1].copy()
+            c = int(cost[s])
+            if r_max > 0 and c <= budget:
+                t[1:, c:] = np.maximum(t[1:, c:], tables[s + 1, :-1, :budget + 1 - c] + ep[s])
+            tables[s] = t
+        return tables
+
+    @staticmethod
+    def _max_plus(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """(a (+) b)[x] = max over y <= x of a[y] + b[x - y]."""
+        size = len(a)
+        out = np.full(size, -np.inf)
+        for y in np.flatnonzero(np.isfinite(a)).tolist():
+            out[y:] = np.maximum(out[y:], a[y] + b[:size - y])
+        return out
+
+    # ------------------------
+    # Starting XI + payload
+    # ------------------------
+    def _build_result(
+        self, squad: List[int], ep: np.ndarray, cost: np.ndarray, horizon: int, budget: int, optimal: bool, nodes: int
+    ) -> Dict[str, Any]:
+        proj = self.projections
+        pos = proj.player_pos
+        by_pos: Dict[int, List[int]] = {code: [] for code in self.QUOTAS}
+        for i in squad:
+            by_pos[int(pos[i])].append(i)
+        for code in by_pos:
+            by_pos[code].sort(key=lambda i: ep[i], reverse=True)
+
+        best_xi: List[int] = []
+        best_formation = None
+        best_value = -np.inf
+        for d, m, f in self.FORMATIONS:
+            xi = by_pos[1][:1] + by_pos[2][:d] + by_pos[3][:m] + by_pos[4][:f]
+            value = float(ep[xi].sum())
+            if value > best_value:
+                best_xi, best_formation, best_value = xi, (d, m, f), value
+
+        captain = max(best_xi, key=lambda i: ep[i])
+        starting = set(best_xi)
+        teams = proj.model.teams
+        players = []
+        for code in (1, 2, 3, 4):
+            for i in by_pos[code]:
+                p = proj.players[i]
+                players.append({
+                    "id": p.get("id"),
+                    "web_name": p.get("web_name"),
+                    "team": teams.get(p.get("team"), {}).get("name", "Unknown"),
+                    "team_id": p.get("team"),
+                    "position": self.POSITIONS[code],
+                    "now_cost": p.get("now_cost", 0) / 10,
+                    "expected_points": round(float(ep[i]), 2),
+                    "starting": i in starting,
+                    "captain": i == captain,
+                })
+
+        squad_cost = int(cost[squad].sum())
+        return {
+            "horizon": horizon,
+            "budget": budget / 10,
+            "cost": squad_cost / 10,
+            "bank": (budget - squad_cost) / 10,
+            "expected_points": round(float(ep[squad].sum()), 2),
+            "xi_expected_points": round(best_value, 2),
+            "formation": "-".join(str(n) for n in best_formation),
+            "optimal": optimal,
+            "nodes": nodes,
+            "squad": players,
+        }
@@ -16,14 +16,31 @@ class FantasyPlayerModelService:
         self.fantasy = FantasyService(team_id=0)
         self.fixture_service = FixtureDifficultyService(league=league, season=season)
 
+        self.bootstrap: Dict[str, Any] = {}
+        self.fixtures: List[Dict[str, Any]] = []
+        self.refresh_fpl(force=False)
+
+    # ------------------------
+    # FPL data
+    # ------------------------
+    def refresh_fpl(self, force: bool = True) -> None:
+        """
+        (Re)load bootstrap + fixtures from FPL and rebuild the lookups derived from them.
+        A failed fetch keeps the previous copy rather than emptying the model.
+        """
+        bootstrap = self.fantasy.get_bootstrap(force=force) or self.bootstrap
+        fixtures = self.fantasy.get_fixtures() or self.fixtures
+
         # Bootstrap data
-        self.bootstrap = self.fantasy.get_bootstrap()
-        self.players = {p["id"]: p for p in self.bootstrap.get("elements", [])}
-        self.teams = {t["id"]: t for t in self.bootstrap.get("teams", [])}
-        self.element_types = {et["id"]: et for et in self.bootstrap.get("element_types", [])}
+        self.bootstrap = bootstrap
+        self.players = {p["id"]: p for p in bootstrap.get("elements", [])}
+        self.teams = {t["id"]: t for t in bootstrap.get("teams", [])}
+        self.element_types = {et["id"]: et for et in bootstrap.get("element_types", [])}
 
         # Fixtures
-        self.fixtures = self.fantasy.get_fixtures()
+        self.fixtures = fixtures
+        self._next_fixtures = self._index_next_fixtures()
+        self.fixture_service.set_fixtures(self.teams, self.fixtures)
 
     # ------------------------
     # Player enrichment
@@ -67,22 +84,31 @@ class FantasyPlayerModelService:
     # ------------------------
     # Next fixture
     # ------------------------
+    def _index_next_fixtures(self) -> Dict[int, Dict[str, Any]]:
+        """Next unfinished fixture per team, computed in one pass over the fixture list."""
+        upcoming = sorted(
+            (f for f in self.fixtures if not f.get("finished")),
+            key=lambda x: x.get("event") or 9999
+        )
+        next_by_team: Dict[int, Dict[str, Any]] = {}
+        for f in upcoming:
+            for team_id in (f.get("team_h"), f.get("team_a")):
+                next_by_team.setdefault(team_id, f)
+        return next_by_team
+
     def get_next_fixture(self, team_id: int) -> Optional[Dict[str, Any]]:
         """Return the next upcoming fixture for a team"""
-        upcoming = [
-            f for f in self.fixtures
-            if not f.get("finished") and team_id in (f.get("team_h"), f.get("team_a"))
-        ]
-        if not upcoming:
+        next_match = self._next_fixtures.get(team_id)
+        if not next_match:
             return None
 
-        next_match = sorted(upcoming, key=lambda x: x.get("event", 9999))[0]
         opponent_id = next_match.get("team_a") if next_match.get("team_h") == team_id else next_match.get("team_h")
         return {
             "opponent": opponent_id,
             "opponent_name": self.teams.get(opponent_id, {}).get("name", "Unknown"),
             "home": next_match.get("team_h") == team_id,
-            "kickoff_time": next_match.get("kickoff_time")
+            "kickoff_time": next_match.get("kickoff_time"),
+            "event": next_match.get("event"),
         }
 
     # ------------------------
@@ -105,15 +131,19 @@ class FantasyPlayerModelService:
             breakdown.append({"source": "home_away", "value": round(form * (home_mod - 1), 2),
                               "explanation": f"{'Home advantage' if home else 'Away disadvantage'} applied."})
 
-            # Fixture difficulty modifier
-            opponent_name = next_fixture.get("opponent_name", "Unknown")
-            fixture_mod = self.fixture_service.get_fixture_modifier(opponent_name, position_short)
-            difficulty_text = (
-                "easier opponent" if fixture_mod > 0 else
-                "tougher opponent" if fixture_mod < 0 else
-                "neutral opponent"
-            )
-            breakdown.append({"source": "fixture_difficulty", "value": fixture_mod,
-                              "explanation": f"Fixture difficulty vs {opponent_name}: {difficulty_text}."})
+            # Fixture difficulty modifier: one line per fixture in the gameweek (two in a double),
+            # from the precomputed grid
+            for fixture in self.fixture_service.get_fixture_difficulties(
+                player.get("team"), next_fixture.get("event") or 0, position_short
+            ):
+                fixture_mod = fixture["difficulty"]
+                difficulty_text = (
+                    "easier opponent" if fixture_mod > 0 else
+                    "tougher opponent" if fixture_mod < 0 else
+                    "neutral opponent"
+                )
+                venue = "H" if fixture["home"] else "A"
+                breakdown.append({"source": "fixture_difficulty", "value": fixture_mod,
+                                  "explanation": f"Fixture difficulty vs {fixture['opponent_name']} ({venue}): {difficulty_text}."})
 
         return breakdown
@@ -0,0 +1,206 @@
+# services/fantasy/fantasy_projection_service.py
+from typing import Any, Dict, List, Optional
+import numpy as np
+from services.fantasy.fantasy_player_model_service import FantasyPlayerModelService
+from services.fantasy.fantasy_xg_model_service import FantasyXGModelService
+
+
+class FantasyProjectionService:
+    """
+    Multi-gameweek expected points for every FPL player in one NumPy pass.
+
+    Matrices are built once from the player model's bootstrap + fixtures:
+      - players:  team index, position, per-90 involvement         (P,)
+      - fixtures: opponent index / home flag per team, gameweek
+                  and fixture slot                                 (T, G, S)
+    S is the max number of fixtures a team has in one gameweek, so double
+    gameweeks fill two slots and blank gameweeks leave every slot empty (-1).
+    Scoring is delegated to the batch Poisson model (FantasyXGModelService).
+    """
+
+    POSITIONS = {1: "GKP", 2: "DEF", 3: "MID", 4: "FWD"}
+    DEFAULT_LEAGUE_XG = 1.35  # used until FBref xG is available
+
+    def __init__(self, model: FantasyPlayerModelService):
+        self.model = model
+        self._arrays: Dict[int, Dict[str, np.ndarray]] = {}
+        self._payloads: Dict[int, Dict[str, Any]] = {}
+        self.version = 0  # bumped on every rebuild so downstream caches can key on it
+        self.build()
+
+    # ------------------------
+    # Matrix construction
+    # ------------------------
+    def build(self) -> None:
+        """(Re)build player and fixture matrices and drop cached projections."""
+        team_ids = sorted(self.model.teams.keys()) or [0]
+        self.team_ids = np.array(team_ids, dtype=np.int64)
+        team_idx = {tid: i for i, tid in enumerate(team_ids)}
+
+        players = list(self.model.players.values())
+        self.players = players
+        self.player_team = np.array([team_idx.get(p.get("team"), 0) for p in players], dtype=np.int64)
+        self.player_pos = np.array([p.get("element_type", 0) for p in players], dtype=np.int64)
+
+        upcoming = [
+            f for f in self.model.fixtures
+            if not f.get("finished") and f.get("event") and f.get("team_h") in team_idx and f.get("team_a") in team_idx
+        ]
+        gameweeks = sorted({f["event"] for f in upcoming})
+        self.gameweeks = np.array(gameweeks, dtype=np.int64)
+        gw_idx = {gw: i for i, gw in enumerate(gameweeks)}
+
+        # Slot count = busiest team-gameweek (2 for a double gameweek)
+        slots: Dict[tuple, int] = {}
+        for f in upcoming:
+            for tid in (f["team_h"], f["team_a"]):
+                key = (team_idx[tid], gw_idx[f["event"]])
+                slots[key] = slots.get(key, 0) + 1
+        n_slots = max(slots.values(), default=1)
+
+        shape = (len(team_ids), len(gameweeks), n_slots)
+        self.opponent = np.full(shape, -1, dtype=np.int64)
+        self.is_home = np.zeros(shape, dtype=bool)
+        self.kickoff: Dict[tuple, Optional[str]] = {}
+
+        filled: Dict[tuple, int] = {}
+        for f in sorted(upcoming, key=lambda x: x.get("kickoff_time") or ""):
+            g = gw_idx[f["event"]]
+            h, a = team_idx[f["team_h"]], team_idx[f["team_a"]]
+            for t, opp, home in ((h, a, True), (a, h, False)):
+                s = filled.get((t, g), 0)
+                filled[(t, g)] = s + 1
+                self.opponent[t, g, s] = opp
+                self.is_home[t, g, s] = home
+                self.kickoff[(t, g, s)] = f.get("kickoff_time")
+
+        self.xg_model = self._build_xg_model(team_ids)
+
+        team_games = np.zeros(len(team_ids), dtype=np.float64)
+        for f in self.model.fixtures:
+            if f.get("finished"):
+                for tid in (f.get("team_h"), f.get("team_a")):
+                    if tid in team_idx:
+                        team_games[team_idx[tid]] += 1
+        self.player_inputs = FantasyXGModelService.player_inputs(players, team_games, self.player_team)
+
+        self._arrays.clear()
+        self._payloads.clear()
+        self.version += 1
+
+    def _build_xg_model(self, team_ids: List[int]) -> FantasyXGModelService:
+        """Team strengths from FBref xG (neutral 1.0 for anything FBref doesn't know)."""
+        attack = np.ones(len(team_ids), dtype=np.float64)
+        defence = np.ones(len(team_ids), dtype=np.float64)
+        for i, tid in enumerate(team_ids):
+            strength = self.model.fixture_service.get_team_strength(self.model.teams.get(tid, {}).get("name", "Unknown"))
+            if strength:
+                attack[i], defence[i] = strength["attack"], strength["defence"]
+        league_xg = self.model.fixture_service.league_xg_per90 or self.DEFAULT_LEAGUE_XG
+        return FantasyXGModelService(attack, defence, league_xg)
+
+    def refresh(self) -> None:
+        """
+        Re-score after a gameweek: FBref strengths, FPL fixtures (kickoffs move, doubles
+        and blanks appear) and bootstrap (prices, transfers) all change, so reload the
+        FPL data and rebuild every matrix.
+        """
+        self.model.refresh_fpl()
+        self.build()
+
+    # ------------------------
+    # Vectorized scoring
+    # ------------------------
+    def compute(self, horizon: int) -> Dict[str, np.ndarray]:
+        """
+        Component arrays of shape (P, H, S) plus per-gameweek (P, H) and total (P,) sums.
+        Empty slots (blank gameweeks / single fixture in a DGW column) score 0.
+        """
+        horizon = max(0, min(horizon, len(self.gameweeks)))
+        if horizon in self._arrays:
+            return self._arrays[horizon]
+
+        opp = self.opponent[self.player_team, :horizon, :]             # (P, H, S)
+        home = self.is_home[self.player_team, :horizon, :]
+        arrays = self.xg_model.expected_points(self.player_pos, self.player_team, self.player_inputs, opp, home)
+
+        per_gw = arrays["total"].sum(axis=2)
+        arrays.update({
+            "opponent": opp,
+            "home": home,
+            "slot_total": arrays["total"],
+            "per_gameweek": per_gw,
+            "total": per_gw.sum(axis=1),
+        })
+        self._arrays[horizon] = arrays
+        return arrays
+
+    # ------------------------
+    # API payload
+    # ------------------------
+    def get_projections(self, horizon: int, position_code: Optional[int] = None) -> Dict[str, Any]:
+        """Whole-league projection over `horizon` gameweeks, sorted by expected points."""
+        horizon = max(0, min(horizon, len(self.gameweeks)))
+        if horizon not in self._payloads:
+            self._payloads[horizon] = self._build_payload(horizon)
+        payload = self._payloads[horizon]
+        if position_code:
+            short = self.POSITIONS.get(position_code)
+            return {**payload, "players": [p for p in payload["players"] if p["position"] == short]}
+        return payload
+
+    def _build_payload(self, horizon: int) -> Dict[str, Any]:
+        arrays = self.compute(horizon)
+        gws = self.gameweeks[:horizon].tolist()
+        teams = self.model.teams
+        team_ids = self.team_ids.tolist()
+
+        # Round once in NumPy, then hand plain Python lists to the dict building loop
+        opp = arrays["opponent"].tolist()
+        home = arrays["home"].tolist()
+        components = {name: np.round(arrays[name], 2).tolist() for name in FantasyXGModelService.COMPONENTS}
+        clean_sheet_prob = np.round(arrays["clean_sheet_prob"], 3).tolist()
+        lambda_for = np.round(arrays["lambda_for"], 2).tolist()
+        lambda_against = np.round(arrays["lambda_against"], 2).tolist()
+        slot_total = np.round(arrays["slot_total"], 2).tolist()
+        per_gw = np.round(arrays["per_gameweek"], 2).tolist()
+        totals = np.round(arrays["total"], 2).tolist()
+        player_team = self.player_team.tolist()
+
+        out: List[Dict[str, Any]] = []
+        for i in np.argsort(-arrays["total"], kind="stable").tolist():
+            p = self.players[i]
+            t = player_team[i]
+            gameweeks = []
+            for g, gw in enumerate(gws):
+                fixtures = []
+                for s, o in enumerate(opp[i][g]):
+                    if o < 0:
+                        continue
+                    opponent_id = team_ids[o]
+                    fixtures.append({
+                        "opponent": opponent_id,
+                        "opponent_name": teams.get(opponent_id, {}).get("name", "Unknown"),
+                        "home": home[i][g][s],
+                        "kickoff_time": self.kickoff.get((t, g, s)),
+                        "expected_points": slot_total[i][g][s],
+                        "expected_goals_for": lambda_for[i][g][s],
+                        "expected_goals_against": lambda_against[i][g][s],
+                        "clean_sheet_prob": clean_sheet_prob[i][g][s],
+                        "breakdown": {name: values[i][g][s] for name, values in components.items()},
+                    })
+                gameweeks.append({"event": gw, "expected_points": per_gw[i][g], "fixtures": fixtures})
+
+            team_id = p.get("team")
+            out.append({
+                "id": p.get("id"),
+                "web_name": p.get("web_name"),
+                "team": teams.get(team_id, {}).get("name", "Unknown"),
+                "team_id": team_id,
+                "position": self.POSITIONS.get(p.get("element_type"), "UNK"),
+                "now_cost": p.get("now_cost", 0) / 10,
+                "expected_points_total": totals[i],
+                "gameweeks": gameweeks,
+            })
+
+        return {"horizon": horizon, "gameweeks": gws, "players": out}
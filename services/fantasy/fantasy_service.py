@@ -14,6 +14,7 @@ from requests.utils import dict_from_cookiejar, cookiejar_from_dict
 # - Supports importing a browser cookie string (paste from DevTools)
 # - Persists cookies to disk (encrypted storage recommended in prod)
 # - Exposes fallback-safe _safe_get_json for all endpoints
+# - Caches bootstrap-static process-wide (shared by every instance)
 # ---------------------------------------------------------------------
 
 
@@ -29,6 +30,10 @@ class FantasyService:
         "Origin": "https://fantasy.premierleague.com",
         "Referer": "https://fantasy.premierleague.com",
     }
+    BOOTSTRAP_TTL = 300  # seconds
+
+    # Process-wide bootstrap cache: raw payload + player summaries keyed by element id
+    _bootstrap_cache: Dict[str, Any] = {"data": None, "fetched_at": 0.0, "players": {}}
 
     def __init__(self, team_id: int, cache_dir: str = "data/fpl", session_file: Optional[Path] = None):
         self.team_id = team_id
@@ -37,7 +42,6 @@ class FantasyService:
 
         # Session file where cookies are persisted
         self.session_file = Path(session_file) if session_file else self.SESSION_FILE_DEFAULT
-        self.wishlist_file = self.cache_dir / f"wishlist_{self.team_id}.json"
 
         # requests session
         self.session = requests.Session()
@@ -181,9 +185,52 @@ class FantasyService:
     # ------------------------
     # Public API wrappers
     # ------------------------
-    def get_bootstrap(self) -> Dict[str, Any]:
+    def get_bootstrap(self, force: bool = False) -> Dict[str, Any]:
+        """bootstrap-static, served from the process-wide cache while fresh (``force`` refetches)."""
+        cache = FantasyService._bootstrap_cache
+        if not force and cache["data"] and time.time() - cache["fetched_at"] < self.BOOTSTRAP_TTL:
+            return cache["data"]
+
         url = f"{self.BASE_URL}/bootstrap-static/"
-        return self._safe_get_json(url)
+        data = self._safe_get_json(url)
+        if not data:
+            # Keep serving the stale copy rather than nothing
+            return cache["data"] or {}
+
+        teams = {t["id"]: t for t in data.get("teams", [])}
+        element_types = {et["id"]: et for et in data.get("element_types", [])}
+        players = {p["id"]: self._player_summary(p, teams, element_types) for p in data.get("elements", [])}
+        FantasyService._bootstrap_cache = {"data": data, "fetched_at": time.time(), "players": players}
+        return data
+
+    @staticmethod
+    def bootstrap_version() -> float:
+        """When the cached bootstrap was fetched; changes only when its content may have."""
+        return FantasyService._bootstrap_cache["fetched_at"]
+
+    def get_player_index(self) -> Dict[int, Dict[str, Any]]:
+        """Player summaries keyed by element id, built once per bootstrap fetch."""
+        self.get_bootstrap()
+        return FantasyService._bootstrap_cache["players"]
+
+    @staticmethod
+    def _player_summary(
+        player: Dict[str, Any], teams: Dict[int, Dict[str, Any]], element_types: Dict[int, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return {
+            "id": player["id"],
+            "web_name": player.get("web_name"),
+            "first_name": player.get("first_name"),
+            "second_name": player.get("second_name"),
+            "team": teams.get(player.get("team"), {}).get("name", "Unknown"),
+            "position": element_types.get(player.get("element_type"), {}).get("singular_name_short", "Unknown"),
+            "now_cost": player.get("now_cost", 0) / 10,
+            "selected_by_percent": player.get("selected_by_percent", 0),
+            "total_points": player.get("total_points", 0),
+            "form": player.get("form", 0),
+            "event_points": player.get("event_points", 0),
+            "minutes": player.get("minutes", 0),
+        }
 
     def get_fixtures(self) -> List[Dict[str, Any]]:
         url = f"{self.BASE_URL}/fixtures/"
@@ -199,29 +246,13 @@ class FantasyService:
         url = f"{self.BASE_URL}/entry/{self.team_id}/event/{gw}/picks/"
         picks = self._safe_get_json(url)
         # Best-effort: enrich picks using bootstrap if possible
-        bootstrap = self.get_bootstrap()
-        players = {p["id"]: p for p in bootstrap.get("elements", [])} if bootstrap else {}
-        teams = {t["id"]: t for t in bootstrap.get("teams", [])} if bootstrap else {}
-        element_types = {et["id"]: et for et in bootstrap.get("element_types", [])} if bootstrap else {}
+        players = self.get_player_index()
 
         enriched_picks = []
         for pick in picks.get("picks", []):
             player = players.get(pick.get("element"))
             if player:
-                pick["player"] = {
-                    "id": player["id"],
-                    "web_name": player.get("web_name"),
-                    "first_name": player.get("first_name"),
-                    "second_name": player.get("second_name"),
-                    "team": teams.get(player.get("team"), {}).get("name", "Unknown"),
-                    "position": element_types.get(player.get("element_type"), {}).get("singular_name_short", "Unknown"),
-                    "now_cost": player.get("now_cost", 0) / 10,
-                    "selected_by_percent": player.get("selected_by_percent", 0),
-                    "total_points": player.get("total_points", 0),
-                    "form": player.get("form", 0),
-                    "event_points": player.get("event_points", 0),
-                    "minutes": player.get("minutes", 0),
-                }
+                pick["player"] = dict(player)
             enriched_picks.append(pick)
         picks["picks"] = enriched_picks
         return picks
@@ -251,37 +282,6 @@ class FantasyService:
             print(f"[ERROR] can_access_entry request failed: {e}")
             return False
 
-    # ------------------------
-    # Wishlist persistence (unchanged)
-    # ------------------------
-    def _load_wishlist(self) -> List[int]:
-        if not self.wishlist_file.exists():
-            return []
-        try:
-            return json.loads(self.wishlist_file.read_text())
-        except json.JSONDecodeError:
-            print("[WARN] Wishlist file corrupted, resetting")
-            return []
-
-    def _save_wishlist(self, wishlist: List[int]):
-        self.wishlist_file.write_text(json.dumps(wishlist))
-
-    def add_to_wishlist(self, player_id: int):
-        wishlist = self._load_wishlist()
-        if player_id not in wishlist:
-            wishlist.append(player_id)
-        self._save_wishlist(wishlist)
-        return wishlist
-
-    def remove_from_wishlist(self, player_id: int):
-        wishlist = self._load_wishlist()
-        wishlist = [pid for pid in wishlist if pid != player_id]
-        self._save_wishlist(wishlist)
-        return wishlist
-
-    def get_wishlist(self) -> List[int]:
-        return self._load_wishlist()
-
     # ------------------------
     # Player utilities
     # ------------------------
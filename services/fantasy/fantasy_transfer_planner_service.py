@@ -0,0 +1,216 @@
+# services/fantasy/fantasy_transfer_planner_service.py
+from typing import Any, Dict, List, Optional
+import numpy as np
+from services.fantasy.fantasy_projection_service import FantasyProjectionService
+from services.fantasy.fantasy_service import FantasyService
+
+
+class FantasyTransferPlannerService:
+    """
+    Suggest 0, 1 or 2 transfers (with hits) for an FPL team over the next N gameweeks.
+
+    Incoming candidates are pruned per position to what the squad could afford (bank plus
+    the priciest squad player, or plus the two priciest less the cheapest other buy,
+    whichever is higher) and then to the top
+    CANDIDATES_PER_BAND by projected points in every PRICE_BAND, so cheap options a
+    budget squad can actually buy survive next to the premiums. Every (out, in) and
+    (out pair, in pair) combination is then scored with broadcast arrays: EP delta,
+    budget check and club-limit check all happen as matrix operations, so 2-transfer
+    plans never go through nested Python loops.
+    Selling price is approximated by current price (picks don't expose purchase price).
+    """
+
+    POSITIONS = {1: "GKP", 2: "DEF", 3: "MID", 4: "FWD"}
+    PRICE_BAND = 5  # tenths of a million
+    CANDIDATES_PER_BAND = 5
+    HIT_COST = 4
+    MAX_PER_CLUB = 3
+
+    def __init__(self, projections: FantasyProjectionService):
+        self.projections = projections
+
+    def plan(self, team_id: int, gw: int, horizon: int = 5, free_transfers: int = 1, top_k: int = 10) -> Dict[str, Any]:
+        """
+        Top-K transfer plans for `team_id`'s squad as picked in gameweek `gw`.
+        Raises ValueError if the picks can't be loaded.
+        """
+        picks = FantasyService(team_id).get_team_picks(gw)
+        elements = [p.get("element") for p in picks.get("picks", [])]
+        if len(elements) != 15:
+            raise ValueError(f"Could not load a 15-player squad for team {team_id} in GW {gw}")
+        bank = int((picks.get("entry_history") or {}).get("bank", 0))
+        return self.plan_for_squad(elements, bank, horizon, free_transfers, top_k)
+
+    def plan_for_squad(
+        self, elements: List[int], bank: int, horizon: int = 5, free_transfers: int = 1, top_k: int = 10
+    ) -> Dict[str, Any]:
+        """Same as plan(), from a list of 15 element ids and bank in tenths of a million."""
+        proj = self.projections
+        ep = proj.compute(horizon)["total"]
+        ids = np.array([p.get("id") for p in proj.players], dtype=np.int64)
+        cost = np.array([int(p.get("now_cost") or 0) for p in proj.players], dtype=np.int64)
+        pos, team = proj.player_pos, proj.player_team
+
+        row_of = {pid: i for i, pid in enumerate(ids.tolist())}
+        missing = [e for e in elements if e not in row_of]
+        if missing:
+            raise ValueError(f"Unknown squad player ids: {missing}")
+        squad = np.array([row_of[e] for e in elements], dtype=np.int64)
+
+        club_counts = np.bincount(team[squad], minlength=len(proj.team_ids))
+        in_squad = np.zeros(len(ids), dtype=bool)
+        in_squad[squad] = True
+
+        # Incoming candidates per position: not already owned, affordable in some plan,
+        # best projected within each price band
+        available = ~in_squad
+        # Dearest buy any plan can afford: a straight swap for the priciest player, or the
+        # pricier half of a double whose other half is the cheapest player on offer.
+        # Cutting at this bound keeps unaffordable players from crowding out price bands.
+        priciest = np.sort(cost[squad])
+        cheapest = int(cost[available].min()) if available.any() else 0
+        ceiling = bank + max(int(priciest[-1]), int(priciest[-2:].sum()) - cheapest)
+        cands: Dict[int, np.ndarray] = {}
+        for code in self.POSITIONS:
+            idx = np.flatnonzero((pos == code) & available & (cost <= ceiling))
+            idx = idx[np.argsort(-ep[idx], kind="stable")]
+            band = cost[idx] // self.PRICE_BAND
+            rank = np.zeros(len(idx), dtype=np.int64)
+            for b in np.unique(band):
+                rank[band == b] = np.arange(int((band == b).sum()))
+            cands[code] = idx[rank < self.CANDIDATES_PER_BAND]
+
+        plans: List[Dict[str, Any]] = [self._plan_payload([], [], 0.0, 0, bank, free_transfers, horizon, ep, cost)]
+        plans += self._single_transfers(squad, cands, ep, cost, team, club_counts, bank, free_transfers, horizon, top_k)
+        plans += self._double_transfers(squad, cands, ep, cost, team, club_counts, bank, free_transfers, horizon, top_k)
+
+        plans.sort(key=lambda p: p["net_gain"], reverse=True)
+        best_by_count: Dict[str, Optional[Dict[str, Any]]] = {}
+        for n in (0, 1, 2):
+            best_by_count[str(n)] = next((p for p in plans if len(p["transfers"]) == n), None)
+
+        return {
+            "horizon": horizon,
+            "bank": bank / 10,
+            "free_transfers": free_transfers,
+            "squad_expected_points": round(float(ep[squad].sum()), 2),
+            "plans": plans[:top_k],
+            "best_by_transfers": best_by_count,
+        }
+
+    # ------------------------
+    # Vectorized enumeration
+    # ------------------------
+    def _single_transfers(self, squad, cands, ep, cost, team, club_counts, bank, free_transfers, horizon, top_k):
+        out_rows, in_rows, gains = [], [], []
+        pos = self.projections.player_pos
+        for code, c_in in cands.items():
+            c_out = squad[pos[squad] == code]
+            if not len(c_out) or not len(c_in):
+                continue
+            o, i = c_out[:, None], c_in[None, :]
+            gain = ep[i] - ep[o]                                               # (n_out, n_in)
+            ok = cost[i] <= bank + cost[o]
+            ok &= club_counts[team[i]] - (team[i] == team[o]) + 1 <= self.MAX_PER_CLUB
+            oo, ii = np.nonzero(ok)
+            out_rows.append(c_out[oo])
+            in_rows.append(c_in[ii])
+            gains.append(gain[oo, ii])
+        return self._top_plans(out_rows, in_rows, gains, 1, bank, free_transfers, horizon, ep, cost, top_k)
+
+    def _double_transfers(self, squad, cands, ep, cost, team, club_counts, bank, free_transfers, horizon, top_k):
+        pos = self.projections.player_pos
+        a, b = np.triu_indices(len(squad), k=1)
+        o1, o2 = squad[a], squad[b]
+
+        out_rows, in_rows, gains = [], [], []
+        for p1 in self.POSITIONS:
+            for p2 in self.POSITIONS:
+                if p2 < p1:
+                    continue
+                sel = ((pos[o1] == p1) & (pos[o2] == p2)) | ((pos[o1] == p2) & (pos[o2] == p1))
+                if not sel.any():
+                    continue
+                # Orient every out pair so the first player is position p1
+                x1 = np.where(pos[o1[sel]] == p1, o1[sel], o2[sel])
+                x2 = np.where(pos[o1[sel]] == p1, o2[sel], o1[sel])
+                c1, c2 = cands[p1], cands[p2]
+                if not len(c1) or not len(c2):
+                    continue
+
+                # Shapes: out pairs (K, 1, 1) x incoming (1, M1, 1) x incoming (1, 1, M2)
+                X1, X2 = x1[:, None, None], x2[:, None, None]
+                J1, J2 = c1[None, :, None], c2[None, None, :]
+                gain = ep[J1] + ep[J2] - ep[X1] - ep[X2]
+                ok = cost[J1] + cost[J2] <= bank + cost[X1] + cost[X2]
+                if p1 == p2:
+                    ok = ok & (J1 < J2)  # unordered incoming pair
+
+                # Club counts after both sales, then both purchases
+                t1, t2 = team[J1], team[J2]
+                base1 = club_counts[t1] - (team[X1] == t1) - (team[X2] == t1)
+                base2 = club_counts[t2] - (team[X1] == t2) - (team[X2] == t2)
+                same = t1 == t2
+                ok &= base1 + 1 + same <= self.MAX_PER_CLUB
+                ok &= base2 + 1 + same <= self.MAX_PER_CLUB
+
+                kk, jj1, jj2 = np.nonzero(ok)
+                out_rows.append(np.stack([x1[kk], x2[kk]], axis=1))
+                in_rows.append(np.stack([c1[jj1], c2[jj2]], axis=1))
+                gains.append(gain[kk, jj1, jj2])
+        return self._top_plans(out_rows, in_rows, gains, 2, bank, free_transfers, horizon, ep, cost, top_k)
+
+    def _top_plans(self, out_rows, in_rows, gains, n, bank, free_transfers, horizon, ep, cost, top_k):
+        if not gains:
+            return []
+        gain = np.concatenate(gains)
+        if not len(gain):
+            return []
+        outs = np.concatenate(out_rows).reshape(len(gain), n)
+        ins = np.concatenate(in_rows).reshape(len(gain), n)
+        best = np.argsort(-gain, kind="stable")[:top_k]
+        return [
+            self._plan_payload(outs[k].tolist(), ins[k].tolist(), float(gain[k]), n, bank, free_transfers, horizon, ep, cost)
+            for k in best.tolist()
+        ]
+
+    # ------------------------
+    # Payload + reasoning
+    # ------------------------
+    def _plan_payload(self, outs, ins, gain, n, bank, free_transfers, horizon, ep, cost) -> Dict[str, Any]:
+        hits = max(0, n - free_transfers)
+        hit_cost = hits * self.HIT_COST
+        bank_after = bank + int(cost[outs].sum()) - int(cost[ins].sum()) if n else bank
+
+        transfers, reasons = [], []
+        for o, i in zip(outs, ins):
+            out_p, in_p = self._player(o, ep), self._player(i, ep)
+            transfers.append({"out": out_p, "in": in_p})
+            reasons.append(
+                f"Sell {out_p['web_name']} ({out_p['expected_points']} xP) for "
+                f"{in_p['web_name']} ({in_p['expected_points']} xP): {ep[i] - ep[o]:+.2f} over {horizon} GW."
+            )
+        if not n:
+            reasons.append(f"Hold: keep the current squad and bank {bank / 10:.1f}m.")
+        if hits:
+            reasons.append(f"{hits} extra transfer(s) cost -{hit_cost} points.")
+
+        return {
+            "transfers": transfers,
+            "hits": hits,
+            "expected_gain": round(gain, 2),
+            "net_gain": round(gain - hit_cost, 2),
+            "bank_after": bank_after / 10,
+            "reasoning": reasons,
+        }
+
+    def _player(self, i: int, ep: np.ndarray) -> Dict[str, Any]:
+        p = self.projections.players[i]
+        return {
+            "id": p.get("id"),
+            "web_name": p.get("web_name"),
+            "team": self.projections.model.teams.get(p.get("team"), {}).get("name", "Unknown"),
+            "position": self.POSITIONS.get(p.get("element_type"), "UNK"),
+            "now_cost": p.get("now_cost", 0) / 10,
+            "expected_points": round(float(ep[i]), 2),
+        }
@@ -0,0 +1,96 @@
+# services/fantasy/fantasy_wishlist_service.py
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+from db.mongo_client import wishlist_collection
+from services.fantasy.fantasy_service import FantasyService
+
+
+class FantasyWishlistService:
+    """
+    Wishlists live in Mongo, one document per FPL team:
+        { "team_id": 123, "player_ids": [ ... ] }
+
+    team_id carries a unique index, and add/remove are single atomic
+    $addToSet / $pull updates, so concurrent requests never drop each other's changes.
+    Wishlists from the old per-team files (data/fpl/wishlist_<id>.json) are merged in
+    on first use and the files renamed to .imported, so they're only read once.
+    """
+
+    LEGACY_DIR = Path("data/fpl")
+    _index_ready = False
+
+    @classmethod
+    async def _ensure_index(cls) -> None:
+        if cls._index_ready:
+            return
+        await wishlist_collection.create_index("team_id", unique=True)
+        await cls._import_legacy_files()
+        cls._index_ready = True
+
+    @classmethod
+    async def _import_legacy_files(cls) -> None:
+        for path in sorted(cls.LEGACY_DIR.glob("wishlist_*.json")):
+            try:
+                team_id = int(path.stem.split("_", 1)[1])
+                player_ids = [int(pid) for pid in json.loads(path.read_text())]
+            except (OSError, TypeError, ValueError) as e:
+                print(f"[WARN] Skipping wishlist file {path.name}: {e}")
+                continue
+            await wishlist_collection.update_one(
+                {"team_id": team_id},
+                {"$addToSet": {"player_ids": {"$each": player_ids}}},
+                upsert=True
+            )
+            try:
+                path.rename(path.with_suffix(".imported"))
+            except OSError:
+                pass  # another worker imported it first; $addToSet made that harmless
+            print(f"[INFO] Imported {len(player_ids)} wishlist players for team {team_id}")
+
+    @staticmethod
+    async def get_wishlist(team_id: int) -> List[int]:
+        await FantasyWishlistService._ensure_index()
+        doc = await wishlist_collection.find_one({"team_id": team_id}, {"_id": 0, "player_ids": 1})
+        return doc.get("player_ids", []) if doc else []
+
+    @staticmethod
+    async def add_to_wishlist(team_id: int, player_id: int) -> List[int]:
+        """
+        Add a player (no-op if already present). Creates the team's wishlist on first add.
+        """
+        await FantasyWishlistService._ensure_index()
+        doc = await wishlist_collection.find_one_and_update(
+            {"team_id": team_id},
+            {"$addToSet": {"player_ids": player_id}},
+            projection={"_id": 0, "player_ids": 1},
+            upsert=True,
+            return_document=True
+        )
+        return doc.get("player_ids", []) if doc else []
+
+    @staticmethod
+    async def remove_from_wishlist(team_id: int, player_id: int) -> List[int]:
+        """
+        Remove a player (no-op if absent).
+        """
+        await FantasyWishlistService._ensure_index()
+        doc = await wishlist_collection.find_one_and_update(
+            {"team_id": team_id},
+            {"$pull": {"player_ids": player_id}},
+            projection={"_id": 0, "player_ids": 1},
+            return_document=True
+        )
+        return doc.get("player_ids", []) if doc else []
+
+    @staticmethod
+    async def get_wishlist_players(team_id: int) -> List[Dict[str, Any]]:
+        """
+        Wishlist joined with player details from the cached bootstrap:
+        one Mongo read plus one dict lookup per player.
+        Ids no longer present in bootstrap are returned with player=None.
+        """
+        player_ids = await FantasyWishlistService.get_wishlist(team_id)
+        players = await asyncio.to_thread(lambda: FantasyService(team_id).get_player_index())
+        return [{"id": pid, "player": players.get(pid)} for pid in player_ids]
@@ -0,0 +1,122 @@
+# services/fantasy/fantasy_xg_model_service.py
+from typing import Any, Dict, List
+import numpy as np
+
+
+class FantasyXGModelService:
+    """
+    Batch Poisson expected-points model.
+
+    Team goal expectancy for a fixture is league xG/90 x own attack x opponent defence
+    (x home advantage), so clean-sheet and goals-conceded probabilities come straight
+    from the opponent's Poisson rate. Player goals/assists scale the player's FPL xG/xA
+    per 90 by how much easier or harder the fixture is than the team's average.
+    Every input is an array and every output is an array: no per-player Python.
+    """
+
+    HOME_ADVANTAGE = 1.1
+    # Indexed by FPL element_type (1=GKP, 2=DEF, 3=MID, 4=FWD); index 0 unused
+    GOAL_POINTS = np.array([0.0, 10.0, 6.0, 5.0, 4.0])
+    CLEAN_SHEET_POINTS = np.array([0.0, 4.0, 4.0, 1.0, 0.0])
+    CONCEDED_PENALTY = np.array([0.0, 1.0, 1.0, 0.0, 0.0])  # -1 per 2 goals conceded
+    ASSIST_POINTS = 3.0
+    MAX_GOALS = 12  # Poisson tail cut-off for goals-conceded expectation
+
+    COMPONENTS = ("appearance", "goals", "assists", "clean_sheet", "goals_conceded")
+
+    def __init__(self, attack: np.ndarray, defence: np.ndarray, league_xg_per90: float):
+        """
+        attack / defence: (T,) team strengths relative to league average (1.0 = average).
+        """
+        self.attack = attack
+        self.defence = defence
+        self.mu = league_xg_per90
+
+    # ------------------------
+    # Player inputs
+    # ------------------------
+    @staticmethod
+    def player_inputs(players: List[Dict[str, Any]], team_games: np.ndarray, player_team: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Per-90 involvement and playing-time probabilities from FPL bootstrap elements.
+        team_games: (T,) finished matches per team, used to turn season totals into rates.
+        """
+        def col(key: str) -> np.ndarray:
+            return np.array([float(p.get(key) or 0) for p in players], dtype=np.float64)
+
+        games = np.maximum(team_games[player_team], 1.0)
+        minutes, starts = col("minutes"), col("starts")
+
+        p60 = np.clip(starts / games, 0.0, 1.0)
+        # Sub appearances: minutes beyond ~85 per start, spread over games not started
+        bench_minutes = np.maximum(minutes - 85.0 * starts, 0.0)
+        bench_games = np.maximum(games - starts, 1.0)
+        p_play = p60 + (1.0 - p60) * np.clip(bench_minutes / (25.0 * bench_games), 0.0, 1.0)
+
+        chance = np.array([
+            100.0 if p.get("chance_of_playing_next_round") is None else float(p["chance_of_playing_next_round"])
+            for p in players
+        ]) / 100.0
+
+        return {
+            "xg90": col("expected_goals_per_90"),
+            "xa90": col("expected_assists_per_90"),
+            "minutes_share": np.clip(minutes / (90.0 * games), 0.0, 1.0) * chance,
+            "p60": p60 * chance,
+            "p_play": p_play * chance,
+        }
+
+    # ------------------------
+    # Batch scoring
+    # ------------------------
+    def expected_points(
+        self,
+        player_pos: np.ndarray,
+        player_team: np.ndarray,
+        inputs: Dict[str, np.ndarray],
+        opponent: np.ndarray,
+        home: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """
+        opponent / home: (P, H, S) fixture tensors (opponent -1 = empty slot).
+        Returns each component and `total` as (P, H, S) arrays; empty slots are 0.
+        """
+        has_fixture = opponent >= 0
+        opp = np.maximum(opponent, 0)
+        team = player_team[:, None, None]
+        venue = np.where(home, self.HOME_ADVANTAGE, 1.0 / self.HOME_ADVANTAGE)
+
+        # Fixture goal expectancy, for and against
+        lam_for = self.mu * self.attack[team] * self.defence[opp] * venue
+        lam_against = self.mu * self.attack[opp] * self.defence[team] / venue
+        # Relative to the team's average output, so per-90 rates stay calibrated
+        fixture_ratio = self.defence[opp] * venue
+
+        p_cs = np.exp(-lam_against)
+        # E[floor(G / 2)] = sum_k P(G >= 2k) for a Poisson(lam_against)
+        k = np.arange(self.MAX_GOALS + 1)
+        log_fact = np.cumsum(np.log(np.maximum(k, 1)))
+        lam = np.maximum(lam_against, 1e-9)[..., None]
+        pmf = np.exp(k * np.log(lam) - lam - log_fact)
+        survival = 1.0 - np.cumsum(pmf, axis=-1)  # P(G > n)
+        conceded_pairs = survival[..., 1::2].sum(axis=-1)  # P(G >= 2), P(G >= 4), ...
+
+        # Anything outside GKP..FWD (e.g. manager elements) maps to the zero row
+        pos = np.where((player_pos >= 1) & (player_pos <= 4), player_pos, 0)[:, None, None]
+        minutes_share = inputs["minutes_share"][:, None, None]
+        p60 = inputs["p60"][:, None, None]
+        p_play = inputs["p_play"][:, None, None]
+
+        components = {
+            "appearance": p_play + p60,  # 1 for playing, +1 for 60 minutes
+            "goals": self.GOAL_POINTS[pos] * inputs["xg90"][:, None, None] * minutes_share * fixture_ratio,
+            "assists": self.ASSIST_POINTS * inputs["xa90"][:, None, None] * minutes_share * fixture_ratio,
+            "clean_sheet": self.CLEAN_SHEET_POINTS[pos] * p_cs * p60,
+            "goals_conceded": -self.CONCEDED_PENALTY[pos] * conceded_pairs * p60,
+        }
+        components = {name: np.where(has_fixture, arr, 0.0) for name, arr in components.items()}
+        components["total"] = sum(components[name] for name in self.COMPONENTS)
+        components["lambda_for"] = np.where(has_fixture, lam_for, 0.0)
+        components["lambda_against"] = np.where(has_fixture, lam_against, 0.0)
+        components["clean_sheet_prob"] = np.where(has_fixture, p_cs, 0.0)
+        return components
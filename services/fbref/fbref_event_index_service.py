@@ -0,0 +1,249 @@
+import bisect
+import hashlib
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from services.fbref.fbref_fixture_store_service import FBrefFixtureStore
+from services.utils.search_index_service import PrefixSearchIndex, fold
+from services.utils.team_registry_service import team_registry
+
+logger = logging.getLogger(__name__)
+
+
+class FBrefEventIndexService:
+    """
+    Inverted index over the events of every enriched FBref fixture in a league season.
+
+    Each event gets an id "<game_id>:<n>" and is posted under its primary player
+    (scorer / booked / subbed-on player), secondary player (assist / subbed-off),
+    canonical team id, event type and round; a (minute, id) list kept sorted serves
+    minute ranges with bisect. Queries intersect the posting sets smallest-first, so
+    they cost O(hits), not O(fixtures). The index follows the fixture store: only games
+    whose events sidecar was written since the last look are re-read and re-posted.
+    """
+
+    # Convenience groups accepted wherever an event type is. Own goals are kept out of
+    # "goals": FBref lists the defender who put it in as player1, so they'd count as his
+    TYPE_GROUPS = {
+        "goals": ("goal", "penalty_goal"),
+        "own_goals": ("own_goal",),
+        "cards": ("yellow_card", "red_card", "yellow_red_card"),
+        "red_cards": ("red_card", "yellow_red_card"),
+        "subs": ("substitute_in",),
+    }
+
+    _instances: Dict[Tuple[str, str], "FBrefEventIndexService"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, league: str, season: str):
+        self.league = league
+        self.season = str(season)
+        self.fixture_store = FBrefFixtureStore.for_league(league, self.season)
+        self._lock = threading.RLock()
+        self._mtime: Optional[float] = None
+        self._game_hashes: Dict[str, str] = {}
+        self._game_events: Dict[str, List[str]] = {}
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self._by_player: Dict[str, Set[str]] = {}
+        self._by_secondary: Dict[str, Set[str]] = {}
+        self._by_team: Dict[str, Set[str]] = {}
+        self._by_type: Dict[str, Set[str]] = {}
+        self._by_round: Dict[int, Set[str]] = {}
+        self._by_minute: List[Tuple[float, str]] = []
+        # Name search over the player / secondary keys, rebuilt lazily after re-indexing
+        self._name_indexes: Dict[str, PrefixSearchIndex] = {}
+
+    @classmethod
+    def for_league(cls, league: str, season: Any) -> "FBrefEventIndexService":
+        key = (league, str(season))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(league, str(season))
+            return cls._instances[key]
+
+    # ------------------------
+    # Indexing
+    # ------------------------
+    @staticmethod
+    def minute_value(minute: Any) -> Optional[float]:
+        """"90+4" → 90.04 (stoppage time sorts after the minute it extends); None if unparsable."""
+        m = re.match(r"^\s*(\d+)(?:\s*\+\s*(\d+))?", str(minute or ""))
+        if not m:
+            return None
+        return int(m.group(1)) + int(m.group(2) or 0) / 100
+
+    def _post(self, event_id: str, event: Dict[str, Any]) -> None:
+        self._events[event_id] = event
+        for index, key in (
+            (self._by_player, event["player_key"]),
+            (self._by_secondary, event["secondary_key"]),
+            (self._by_team, event["team_id"]),
+            (self._by_type, event["event_type"]),
+            (self._by_round, event["week"]),
+        ):
+            if key is not None and key != "":
+                index.setdefault(key, set()).add(event_id)
+        if event["minute_value"] is not None:
+            bisect.insort(self._by_minute, (event["minute_value"], event_id))
+
+    def _unpost(self, event_id: str) -> None:
+        event = self._events.pop(event_id, None)
+        if event is None:
+            return
+        for index, key in (
+            (self._by_player, event["player_key"]),
+            (self._by_secondary, event["secondary_key"]),
+            (self._by_team, event["team_id"]),
+            (self._by_type, event["event_type"]),
+            (self._by_round, event["week"]),
+        ):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(event_id)
+                if not ids:
+                    del index[key]
+        if event["minute_value"] is not None:
+            i = bisect.bisect_left(self._by_minute, (event["minute_value"], event_id))
+            if i < len(self._by_minute) and self._by_minute[i][1] == event_id:
+                del self._by_minute[i]
+
+    def update_fixtures(self, fixtures: Iterable[Dict[str, Any]]) -> int:
+        """(Re)post the events of fixtures whose events changed. Returns the number of games re-indexed."""
+        touched = 0
+        with self._lock:
+            for fixture in fixtures:
+                game_id = fixture.get("game_id")
+                if not game_id:
+                    continue
+                game_id = str(game_id)
+                events = fixture.get("events") or []
+                digest = hashlib.sha1(json.dumps(events, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+                if self._game_hashes.get(game_id) == digest:
+                    continue
+
+                for event_id in self._game_events.pop(game_id, []):
+                    self._unpost(event_id)
+                ids = []
+                for n, raw in enumerate(events):
+                    event_id = f"{game_id}:{n}"
+                    self._post(event_id, {
+                        **raw,
+                        "event_id": event_id,
+                        "game_id": game_id,
+                        "week": fixture.get("week"),
+                        "date": fixture.get("date"),
+                        "home_team": fixture.get("home_team"),
+                        "away_team": fixture.get("away_team"),
+                        "team_id": team_registry.resolve(raw.get("team")),
+                        "player_key": fold(raw.get("player1")) if raw.get("player1") else None,
+                        "secondary_key": fold(raw.get("player2")) if raw.get("player2") else None,
+                        "minute_value": self.minute_value(raw.get("minute")),
+                    })
+                    ids.append(event_id)
+                self._game_events[game_id] = ids
+                self._game_hashes[game_id] = digest
+                touched += 1
+            if touched:
+                self._name_indexes = {}
+        if touched:
+            logger.info(f"FBref events {self.league} {self.season}: re-indexed {touched} games, {len(self._events)} events")
+        return touched
+
+    def refresh_if_changed(self) -> None:
+        """Catch up with the fixture store (written by an update here or in another process)."""
+        version = self.fixture_store.version()
+        if version is None or version == self._mtime:
+            return
+        changed = self.fixture_store.events_changed_since(self._mtime)
+        if changed:
+            rows = [r for r in self.fixture_store.read_all() if str(r.get("game_id")) in changed]
+            self.update_fixtures(self.fixture_store.with_events(rows))
+        self._mtime = version
+
+    # ------------------------
+    # Queries
+    # ------------------------
+    def _player_ids(self, index: Dict[str, Set[str]], kind: str, name: str) -> Set[str]:
+        """
+        Events posted under the players `name` refers to: the exact folded name if a
+        player has it, otherwise every player whose name words prefix-match the query
+        ("saka" → Bukayo Saka, "b fern" → Bruno Fernandes).
+        """
+        key = fold(name)
+        if key in index:
+            return index[key]
+        search = self._name_indexes.get(kind)
+        if search is None:
+            search = PrefixSearchIndex([{"key": k} for k in index], name=lambda item: item["key"])
+            self._name_indexes[kind] = search
+        return set().union(*(index[item["key"]] for item in search.match_all(key)))
+
+    def event_types(self, event_type: Optional[str]) -> Optional[Tuple[str, ...]]:
+        if not event_type:
+            return None
+        return self.TYPE_GROUPS.get(event_type, (event_type,))
+
+    def query(
+        self,
+        player: Optional[str] = None,
+        secondary: Optional[str] = None,
+        team: Optional[str] = None,
+        event_type: Optional[str] = None,
+        minute_from: Optional[int] = None,
+        minute_to: Optional[int] = None,
+        week: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Events matching every given filter, in match then minute order.
+        `player` matches the primary player (scorer, booked player), `secondary` the
+        assist / player subbed off, each by full name or name prefix ("Saka", "b fern");
+        `team` takes any known team name or id; `event_type` is an FBref type or a
+        TYPE_GROUPS name; minute bounds are inclusive and include that minute's
+        stoppage time.
+        """
+        self.refresh_if_changed()
+        with self._lock:
+            sets: List[Set[str]] = []
+            if player:
+                sets.append(self._player_ids(self._by_player, "player", player))
+            if secondary:
+                sets.append(self._player_ids(self._by_secondary, "secondary", secondary))
+            if team:
+                sets.append(self._by_team.get(team_registry.resolve(team) or team, set()))
+            types = self.event_types(event_type)
+            if types:
+                sets.append(set().union(*(self._by_type.get(t, set()) for t in types)))
+            if week is not None:
+                sets.append(self._by_round.get(week, set()))
+            if minute_from is not None or minute_to is not None:
+                lo = bisect.bisect_left(self._by_minute, (minute_from if minute_from is not None else float("-inf"), ""))
+                hi = bisect.bisect_left(self._by_minute, ((minute_to + 1) if minute_to is not None else float("inf"), ""))
+                sets.append({event_id for _, event_id in self._by_minute[lo:hi]})
+
+            if sets:
+                sets.sort(key=len)
+                hits = set(sets[0])
+                for s in sets[1:]:
+                    hits &= s
+                    if not hits:
+                        break
+            else:
+                hits = set(self._events)
+            events = [self._events[event_id] for event_id in hits]
+
+        events.sort(key=lambda e: (str(e.get("date") or ""), e["game_id"], e["minute_value"] or 0))
+        return events[:limit] if limit else events
+
+    def counts(self, by: str = "player", **filters: Any) -> List[Dict[str, Any]]:
+        """Leaderboard of query(**filters) grouped by "player", "secondary" or "team", most first."""
+        field = {"player": "player1", "secondary": "player2", "team": "team"}[by]
+        totals: Dict[str, int] = {}
+        for event in self.query(**filters):
+            key = event.get(field)
+            if key:
+                totals[key] = totals.get(key, 0) + 1
+        return [{by: k, "count": v} for k, v in sorted(totals.items(), key=lambda kv: (-kv[1], kv[0]))]
@@ -1,8 +1,14 @@
-from typing import Optional, Dict
+from datetime import datetime, timedelta, timezone
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Callable, Iterable, List, Optional, Dict
+import numpy as np
 import pandas as pd
 import soccerdata as sd
 import logging
-import re
+from services.utils.team_registry_service import team_registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -11,94 +17,485 @@ class FixtureDifficultyService:
     """
     Provides numeric fixture difficulty modifiers for FPL players
     based on FBref team stats.
+
+    Everything derived from FBref (lookup, modifiers, strengths, grid) lives in one
+    state dict. Refreshes build a new state off to the side and swap it in with a
+    single assignment, keeping the previous one for rollback. The computed state is
+    persisted to disk so a restart doesn't have to wait on soccerdata.
     """
 
-    # Mapping FPL short names → FBref official names
-    NAME_MAP = {
-        "Man City": "Manchester City",
-        "Man Utd": "Manchester United",
-        "Spurs": "Tottenham",
-        "Newcastle": "Newcastle United",
-        "Brighton": "Brighton",
-        "West Ham": "West Ham",
-        "Wolves": "Wolves",
-        "Nott'm Forest": "Nottingham Forest",
-        "Leeds": "Leeds United",
-        "Sheffield Utd": "Sheffield United",
-        "Bournemouth": "Bournemouth",
-        "Brentford": "Brentford",
-        "Burnley": "Burnley",
-        "Chelsea": "Chelsea",
-        "Crystal Palace": "Crystal Palace",
-        "Everton": "Everton",
-        "Fulham": "Fulham",
-        "Liverpool": "Liverpool",
-        "Arsenal": "Arsenal",
-        "Leicester": "Leicester City",
-        "Southampton": "Southampton",
-        "Sunderland": "Sunderland"
-    }
+    # Early-season shrinkage: strengths are blended with this many matches of league average
+    STRENGTH_PRIOR_MATCHES = 5
+
+    # Difficulty grid position classes (matches get_fixture_modifier: GKP vs outfield)
+    POSITION_CLASSES = ("GKP", "OUT")
+
+    SNAPSHOT_DIR = Path("data/fbref/team_stats")
+    # Bumped when the snapshot layout changes; older snapshots are ignored
+    SNAPSHOT_VERSION = 3
+    # Refresh this long after the last kickoff of a gameweek (match + FBref publishing lag)
+    REFRESH_DELAY = timedelta(hours=3)
 
     def __init__(self, league: str, season: Optional[str] = None):
         self.league = league
         self.season = [season] if season else ["2526"]
         self.fbref = sd.FBref(leagues=[league], seasons=self.season)
-        self._team_lookup: Dict[str, Dict] = {}
-        self._load_team_stats()
+        self.snapshot_file = self.SNAPSHOT_DIR / f"{league}_{self.season[0]}.json"
 
-    def _load_team_stats(self):
-        """
-        Load all opponent stats once and cache them.
-        Flatten multi-level columns and normalize names.
-        """
-        logger.info("Loading FBref team stats...")
-        stats = self.fbref.read_team_season_stats(stat_type="standard", opponent_stats=True)
+        # FPL teams/fixtures the difficulty grid is laid out on (see set_fixtures)
+        self._fpl_teams: Dict[int, Dict[str, Any]] = {}
+        self._fpl_fixtures: List[Dict[str, Any]] = []
+
+        self._state: Dict[str, Any] = {}
+        self._previous_state: Optional[Dict[str, Any]] = None
+        self._listeners: List[Callable[[], None]] = []
+        self._refresh_lock = threading.Lock()
+        self._snapshot_mtime: Optional[float] = None
+
+        if not self._load_snapshot():
+            self._state = self._load_team_stats(self.fbref)
+            self._save_snapshot(self._state)
+
+    # ------------------------
+    # Current state accessors
+    # ------------------------
+    @property
+    def league_xg_per90(self) -> float:
+        return self._state.get("league_xg_per90", 0.0)
+
+    @property
+    def grid(self) -> Dict[str, Any]:
+        return self._state.get("grid", {})
+
+    @property
+    def loaded_at(self) -> Optional[str]:
+        return self._state.get("loaded_at")
+
+    @staticmethod
+    def _prepare_stats(stats: pd.DataFrame) -> pd.DataFrame:
+        """Flatten multi-level columns and resolve FBref team names to canonical ids in `team_name`."""
         stats = stats.reset_index()
         stats.columns = ["_".join([str(c) for c in col if c]) for col in stats.columns.values]
 
-        # Normalize FBref team names
-        stats["team_name"] = stats["team"].str.replace(" Utd", " United", regex=False)
-        stats["team_name"] = stats["team_name"].str.replace("Nott'ham Forest", "Nottingham Forest", regex=False)
-        stats["team_name"] = stats["team_name"].str.replace("Wolves", "Wolverhampton", regex=False)
+        # Canonical team id ("vs Arsenal" / "Nott'ham Forest" / "Wolves" all resolve via the registry)
+        stats["team_name"] = stats["team"].map(team_registry.resolve)
+        unknown = stats["team_name"].isna()
+        if unknown.any():
+            logger.warning(f"Dropping FBref rows for unknown teams: {stats.loc[unknown, 'team'].unique().tolist()}")
+        return stats[~unknown]
 
-        # Strip any "vs " prefix if exists
-        stats["team_name"] = stats["team_name"].apply(lambda x: re.sub(r"^vs\s+", "", x))
+    def _load_team_stats(self, reader: sd.FBref) -> Dict[str, Any]:
+        """
+        Load opponent + own team stats and build a complete new state.
+        Nothing on self is touched, so the current state keeps serving meanwhile.
+        """
+        logger.info("Loading FBref team stats...")
+        stats = reader.read_team_season_stats(stat_type="standard", opponent_stats=True)
+        stats = self._prepare_stats(stats)
+        own = self._prepare_stats(reader.read_team_season_stats(stat_type="standard", opponent_stats=False))
 
         # Build team lookup
-        self._team_lookup = {row["team_name"]: row.to_dict() for _, row in stats.iterrows()}
-        logger.info(f"Loaded {len(self._team_lookup)} teams into team lookup: {list(self._team_lookup.keys())}")
+        lookup = stats.drop_duplicates("team_name").set_index("team_name", drop=False).to_dict(orient="index")
+        logger.info(f"Loaded {len(lookup)} teams into team lookup: {list(lookup.keys())}")
+
+        state: Dict[str, Any] = {
+            "lookup": lookup,
+            "modifiers": self._compute_modifiers(stats),
+            **self._compute_team_strengths(own, stats),
+            "loaded_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        state["grid"] = self._build_grid(state)
+        return state
+
+    def _compute_modifiers(self, stats: pd.DataFrame) -> Dict[str, List[float]]:
+        """
+        Fixture modifier per opponent for both position classes, computed column-wise.
+        Sign convention (everywhere: grid, ticker, player model): the modifier is added to
+        a player's expected points, so positive = easier opponent, negative = tougher,
+        0 = league average. GKP = opponent's xG conceded per 90 minus the league mean;
+        outfield = the mean of xG and goals conceded per 90, minus its league mean.
+        """
+        def column(name: str) -> pd.Series:
+            if name not in stats.columns:
+                return pd.Series(0.0, index=stats.index)
+            return pd.to_numeric(stats[name], errors="coerce").fillna(0.0)
+
+        xg_conceded = column("Per 90 Minutes_xG")
+        goals_conceded = column("Per 90 Minutes_Gls")
+        outfield = (xg_conceded + goals_conceded) / 2
+        gkp = (xg_conceded - xg_conceded.mean()).round(2).tolist()
+        outfield = (outfield - outfield.mean()).round(2).tolist()
+        return {name: [g, o] for name, g, o in zip(stats["team_name"], gkp, outfield)}
+
+    def _compute_team_strengths(self, own: pd.DataFrame, opponent_stats: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Attack/defence strength per team from FBref xG, relative to the league average:
+        attack = xG for per 90 / avg, defence = xG against per 90 / avg (higher = leakier).
+        Computed column-wise for all teams at once.
+        """
+        own = own.drop_duplicates("team_name").set_index("team_name")
+        against = opponent_stats.drop_duplicates("team_name").set_index("team_name")
+
+        played_col = "Playing Time_90s" if "Playing Time_90s" in own.columns else "Playing Time_MP"
+        played = pd.to_numeric(own[played_col], errors="coerce").fillna(0.0)
+        xg_for = pd.to_numeric(own["Per 90 Minutes_xG"], errors="coerce")
+        xg_against = pd.to_numeric(against["Per 90 Minutes_xG"], errors="coerce").reindex(own.index)
+
+        mu = float(xg_for.mean())
+        if not mu or pd.isna(mu):
+            logger.warning("FBref xG unavailable; team strengths left neutral.")
+            return {"strength": {}, "league_xg_per90": 0.0}
+
+        k = self.STRENGTH_PRIOR_MATCHES
+        attack = (xg_for.fillna(mu) * played + mu * k) / (played + k) / mu
+        defence = (xg_against.fillna(mu) * played + mu * k) / (played + k) / mu
+
+        strength = {
+            name: {"attack": round(float(a), 4), "defence": round(float(d), 4)}
+            for name, a, d in zip(own.index, attack.to_numpy(), defence.to_numpy())
+        }
+        logger.info(f"Computed xG strengths for {len(strength)} teams (league xG/90 {mu:.2f})")
+        return {"strength": strength, "league_xg_per90": mu}
+
+    # ------------------------
+    # Snapshot persistence
+    # ------------------------
+    def _save_snapshot(self, state: Dict[str, Any]) -> None:
+        """Persist the computed state (minus the FPL-dependent grid) atomically."""
+        payload = {
+            "meta": {
+                "league": self.league,
+                "season": self.season[0],
+                "loaded_at": state.get("loaded_at"),
+                "version": self.SNAPSHOT_VERSION,
+            },
+            **{k: v for k, v in state.items() if k not in ("grid", "loaded_at")},
+        }
+        try:
+            self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.snapshot_file.with_suffix(".json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, default=lambda o: o.item() if hasattr(o, "item") else str(o))
+            os.replace(tmp, self.snapshot_file)
+            self._snapshot_mtime = self.snapshot_file.stat().st_mtime
+        except Exception as e:
+            logger.error(f"Saving FBref team stats snapshot failed: {e}")
+
+    def _load_snapshot(self) -> bool:
+        """Load the last persisted state. Returns True if one was usable."""
+        if not self.snapshot_file.exists():
+            return False
+        try:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable FBref team stats snapshot: {e}")
+            return False
+        if not payload.get("lookup") or payload.get("meta", {}).get("version") != self.SNAPSHOT_VERSION:
+            return False
+
+        state = {k: v for k, v in payload.items() if k != "meta"}
+        state["loaded_at"] = payload.get("meta", {}).get("loaded_at")
+        state["grid"] = self._build_grid(state)
+        self._state = state
+        self._snapshot_mtime = self.snapshot_file.stat().st_mtime
+        logger.info(f"Loaded FBref team stats snapshot from {self.snapshot_file} (loaded_at {state['loaded_at']})")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Pick up a snapshot refreshed by another process (the scheduling leader)."""
+        try:
+            mtime = self.snapshot_file.stat().st_mtime
+        except OSError:
+            return False
+        if mtime == self._snapshot_mtime:
+            return False
+        if not self._load_snapshot():
+            return False
+        self._notify()
+        return True
+
+    # ------------------------
+    # Refresh / rollback
+    # ------------------------
+    def add_refresh_listener(self, callback: Callable[[], None]) -> None:
+        """Called (in the refreshing thread) after every successful swap or rollback."""
+        self._listeners.append(callback)
+
+    def _notify(self) -> None:
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Refresh listener {callback} failed: {e}")
+
+    def refresh(self) -> bool:
+        """
+        Reload FBref stats bypassing the soccerdata cache, build the new state off to the
+        side and swap it in. On any failure the current state keeps serving.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            logger.info("FBref team stats refresh already running, skipping")
+            return False
+        try:
+            reader = sd.FBref(leagues=[self.league], seasons=self.season, no_cache=True)
+            new_state = self._load_team_stats(reader)
+            if not new_state["lookup"]:
+                logger.warning("FBref returned no team stats; keeping current state")
+                return False
+
+            self._previous_state, self._state = self._state, new_state
+            self._save_snapshot(new_state)
+            logger.info(f"FBref team stats refreshed (loaded_at {new_state['loaded_at']})")
+            self._notify()
+            return True
+        except Exception as e:
+            logger.error(f"FBref team stats refresh failed, keeping current state: {e}")
+            return False
+        finally:
+            self._refresh_lock.release()
+
+    def rollback(self) -> bool:
+        """Swap the previous state back in. Returns False if there is nothing to roll back to."""
+        if self._previous_state is None:
+            return False
+        self._state, self._previous_state = self._previous_state, self._state
+        self._save_snapshot(self._state)
+        logger.info(f"FBref team stats rolled back to loaded_at {self._state.get('loaded_at')}")
+        self._notify()
+        return True
+
+    # ------------------------
+    # Gameweek-end refresh schedule
+    # ------------------------
+    def gameweek_refresh_times(self, matches: Optional[Iterable[Dict[str, Any]]] = None) -> Dict[int, datetime]:
+        """
+        Per gameweek: last kickoff + REFRESH_DELAY (UTC). Taken from `matches` (match
+        store records: "round", "kickoff") when given, so a rescheduled match moves its
+        round's refresh; from the FPL fixtures otherwise.
+        """
+        if matches is not None:
+            rows = [(m.get("round"), m.get("kickoff")) for m in matches]
+        else:
+            rows = [(f.get("event"), f.get("kickoff_time")) for f in self._fpl_fixtures]
+        last_kickoff: Dict[int, datetime] = {}
+        for gw, kickoff_time in rows:
+            if not gw or not kickoff_time:
+                continue
+            try:
+                kickoff = datetime.fromisoformat(str(kickoff_time).replace("Z", "+00:00"))
+            except ValueError:
+                continue
+            if kickoff.tzinfo is None:
+                kickoff = kickoff.replace(tzinfo=timezone.utc)
+            if gw not in last_kickoff or kickoff > last_kickoff[gw]:
+                last_kickoff[gw] = kickoff
+        return {gw: ko + self.REFRESH_DELAY for gw, ko in last_kickoff.items()}
+
+    def schedule_refreshes(
+        self,
+        scheduler,
+        refresh: Optional[Callable[[], Any]] = None,
+        matches: Optional[Iterable[Dict[str, Any]]] = None,
+    ) -> int:
+        """
+        Put one `refresh` job (self.refresh by default) per upcoming gameweek end on
+        `scheduler`, replacing every job an earlier call scheduled, so calling this again
+        after fixtures move reschedules. Also queues an immediate catch-up refresh if the
+        current stats predate the most recent gameweek end.
+        Returns the number of gameweek jobs scheduled.
+        """
+        refresh = refresh or self.refresh
+        prefix = f"fbref-team-stats-{self.league}-"
+        for job in scheduler.get_jobs():
+            if job.id.startswith(prefix):
+                job.remove()
+
+        now = datetime.now(timezone.utc)
+        times = self.gameweek_refresh_times(matches)
+        scheduled = 0
+        for gw, run_at in times.items():
+            if run_at <= now:
+                continue
+            scheduler.add_job(refresh, "date", run_date=run_at, id=f"{prefix}gw{gw}", replace_existing=True)
+            scheduled += 1
+
+        past = [t for t in times.values() if t <= now]
+        loaded_at = self.loaded_at
+        if past and (not loaded_at or datetime.fromisoformat(loaded_at.replace("Z", "+00:00")) < max(past)):
+            scheduler.add_job(refresh, id=f"{prefix}catchup", replace_existing=True)
+
+        logger.info(f"Scheduled {scheduled} FBref team stats refreshes for {self.league}")
+        return scheduled
+
+    @staticmethod
+    def _resolve_name(team_name: str) -> Optional[str]:
+        """FPL / FBref / fixture-style name ("vs Arsenal") → canonical team id."""
+        return team_registry.resolve(team_name)
+
+    def get_team_strength(self, team_name: str) -> Optional[Dict[str, float]]:
+        """
+        {"attack": ..., "defence": ...} for an FPL or FBref team name, or None if unknown.
+        """
+        return self._state.get("strength", {}).get(self._resolve_name(team_name))
 
     def get_fixture_modifier(self, fixture_name: str, player_position: str) -> float:
         """
-        Returns a numeric fixture difficulty modifier.
-        Higher modifier → tougher opponent → negative impact on expected points.
+        Returns a numeric fixture difficulty modifier, added to expected points:
+        positive → easier opponent, negative → tougher, 0.0 → league average / unknown.
 
         fixture_name: e.g. "vs Arsenal" or "Arsenal"
         player_position: "GKP" or outfield
         """
-        # Remove "vs " prefix if present
-        opponent = fixture_name.replace("vs ", "").strip()
-
-        # Map FPL name → FBref official name
-        lookup_name = self.NAME_MAP.get(opponent, opponent)
-        row = self._team_lookup.get(lookup_name)
+        lookup_name = self._resolve_name(fixture_name)
+        modifiers = self._state.get("modifiers", {}).get(lookup_name) if lookup_name else None
 
-        if row is None:
-            logger.warning(f"FBref stats not found for opponent '{opponent}' (lookup '{lookup_name}'). Returning neutral 0.0.")
+        if modifiers is None:
+            logger.warning(f"FBref stats not found for opponent '{fixture_name}' (lookup '{lookup_name}'). Returning neutral 0.0.")
             return 0.0  # neutral
 
-        # Calculate modifier
-        try:
-            if player_position == "GKP":
-                xg_conceded = float(row.get("Per 90 Minutes_xG", 0.0))
-                modifier = -xg_conceded
-            else:
-                xg_conceded = float(row.get("Per 90 Minutes_xG", 0.0))
-                goals_conceded = float(row.get("Performance_Gls", 0.0))
-                modifier = -(xg_conceded + goals_conceded) / 2
-            logger.debug(f"Fixture modifier for '{opponent}' ({player_position}): {modifier}")
-        except Exception as e:
-            logger.error(f"Error computing modifier for {lookup_name}: {e}")
-            modifier = 0.0
+        return float(modifiers[0 if player_position == "GKP" else 1])
+
+    # ------------------------
+    # Difficulty grid (team x gameweek x position class)
+    # ------------------------
+    def set_fixtures(self, teams: Dict[int, Dict[str, Any]], fixtures: List[Dict[str, Any]]) -> None:
+        """
+        Register the FPL teams/fixtures to lay the grid out on and build it.
+        The grid is rebuilt automatically whenever team stats reload.
+        """
+        self._fpl_teams = teams
+        self._fpl_fixtures = fixtures
+        state = self._state
+        self._state = {**state, "grid": self._build_grid(state)}
+
+    def _build_grid(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        values[t, gw - 1, c]: summed fixture modifier for FPL team t in gameweek gw for position class c
+        (0 with counts == 0 for a blank, two fixtures summed for a double).
+        """
+        team_ids = sorted(self._fpl_teams)
+        team_index = {tid: i for i, tid in enumerate(team_ids)}
+        fixtures = [
+            f for f in self._fpl_fixtures
+            if f.get("event") and f.get("team_h") in team_index and f.get("team_a") in team_index
+        ]
+        n_gw = max((f["event"] for f in fixtures), default=38)
+
+        if not team_ids:
+            return {}
+
+        # Opponent modifier per FPL team, resolved once
+        modifiers = state.get("modifiers", {})
+        neutral = [0.0] * len(self.POSITION_CLASSES)
+        team_mod = np.array(
+            [modifiers.get(self._resolve_name(self._fpl_teams[tid].get("name", "")), neutral) for tid in team_ids],
+            dtype=np.float64,
+        )
+
+        h = np.array([team_index[f["team_h"]] for f in fixtures], dtype=np.int64)
+        a = np.array([team_index[f["team_a"]] for f in fixtures], dtype=np.int64)
+        g = np.array([f["event"] - 1 for f in fixtures], dtype=np.int64)
+
+        values = np.zeros((len(team_ids), n_gw, len(self.POSITION_CLASSES)))
+        counts = np.zeros((len(team_ids), n_gw), dtype=np.int64)
+        np.add.at(values, (h, g), team_mod[a])
+        np.add.at(values, (a, g), team_mod[h])
+        np.add.at(counts, (h, g), 1)
+        np.add.at(counts, (a, g), 1)
+
+        # Per-fixture entries (opponent, venue, that fixture's own modifier) behind each cell
+        opponents: List[List[List[Dict[str, Any]]]] = [[[] for _ in range(n_gw)] for _ in team_ids]
+        for f, hi, ai, gi in zip(fixtures, h.tolist(), a.tolist(), g.tolist()):
+            for t, o, home in ((hi, ai, True), (ai, hi, False)):
+                opponents[t][gi].append({
+                    "opponent": team_ids[o],
+                    "home": home,
+                    "difficulty": dict(zip(self.POSITION_CLASSES, np.round(team_mod[o], 2).tolist())),
+                })
+
+        unfinished = [f["event"] for f in fixtures if not f.get("finished")]
+        logger.info(f"Built fixture difficulty grid: {len(team_ids)} teams x {n_gw} gameweeks")
+        return {
+            "team_ids": team_ids,
+            "team_index": team_index,
+            "values": np.round(values, 2),
+            "counts": counts,
+            "opponents": opponents,
+            "next_event": min(unfinished) if unfinished else n_gw,
+        }
+
+    def get_difficulty(self, team_id: int, gw: int, player_position: str) -> float:
+        """Constant-time grid lookup of the gameweek total; 0.0 (neutral) for unknown teams/gameweeks."""
+        grid = self.grid
+        t = grid.get("team_index", {}).get(team_id) if grid else None
+        if t is None or not 1 <= gw <= grid["values"].shape[1]:
+            return 0.0
+        return float(grid["values"][t, gw - 1, 0 if player_position == "GKP" else 1])
+
+    def get_fixture_difficulties(self, team_id: int, gw: int, player_position: str) -> List[Dict[str, Any]]:
+        """
+        One entry per fixture of `team_id` in `gw` (two in a double, none in a blank):
+        {"opponent", "opponent_name", "home", "difficulty"} for the player's position class.
+        """
+        grid = self.grid
+        t = grid.get("team_index", {}).get(team_id) if grid else None
+        if t is None or not 1 <= gw <= grid["values"].shape[1]:
+            return []
+        position_class = "GKP" if player_position == "GKP" else "OUT"
+        return [
+            {
+                "opponent": o["opponent"],
+                "opponent_name": self._fpl_teams.get(o["opponent"], {}).get("name", "Unknown"),
+                "home": o["home"],
+                "difficulty": o["difficulty"][position_class],
+            }
+            for o in grid["opponents"][t][gw - 1]
+        ]
+
+    def get_fixture_ticker(self, horizon: int = 5, start_gw: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Next `horizon` gameweeks per team, easiest run first: ranked by average outfield
+        modifier per fixture played (higher = easier), so a blank (no fixture) neither
+        helps nor hurts and a double counts as two games rather than one summed cell.
+        Teams with no fixture at all in the window come last.
+        """
+        grid = self.grid
+        if not grid:
+            return {"gameweeks": [], "teams": []}
+        start = start_gw or grid["next_event"]
+        lo, hi = max(start, 1) - 1, min(start - 1 + horizon, grid["values"].shape[1])
+        window = grid["values"][:, lo:hi, :]
+        counts = grid["counts"][:, lo:hi]
+        run_totals = window.sum(axis=1)  # (T, C)
+        played = counts.sum(axis=1)      # (T,)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            run_avg = np.where(played[:, None] > 0, run_totals / played[:, None], np.nan)
 
-        return round(modifier, 2)
+        rank_key = np.where(np.isnan(run_avg[:, 1]), -np.inf, run_avg[:, 1])
+        teams = []
+        for t in np.argsort(-rank_key, kind="stable").tolist():
+            tid = grid["team_ids"][t]
+            teams.append({
+                "team_id": tid,
+                "team": self._fpl_teams.get(tid, {}).get("name", "Unknown"),
+                "fixtures": int(played[t]),
+                "difficulty_avg": dict(zip(
+                    self.POSITION_CLASSES,
+                    [None if np.isnan(v) else round(float(v), 2) for v in run_avg[t]],
+                )),
+                "difficulty_total": dict(zip(self.POSITION_CLASSES, run_totals[t].round(2).tolist())),
+                "gameweeks": [
+                    {
+                        "event": lo + i + 1,
+                        "fixture_count": int(counts[t, i]),  # 0 = blank, 2 = double
+                        "fixtures": [
+                            {**o, "opponent_name": self._fpl_teams.get(o["opponent"], {}).get("name", "Unknown")}
+                            for o in grid["opponents"][t][lo + i]
+                        ],
+                        "difficulty": dict(zip(self.POSITION_CLASSES, window[t, i].tolist())),
+                    }
+                    for i in range(hi - lo)
+                ],
+            })
+        return {"gameweeks": list(range(lo + 1, hi + 1)), "teams": teams}
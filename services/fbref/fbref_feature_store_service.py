@@ -0,0 +1,200 @@
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import soccerdata as sd
+from pyarrow import feather
+
+from services.utils.search_index_service import fold
+from services.utils.team_registry_service import team_registry
+
+logger = logging.getLogger(__name__)
+
+
+class FBrefFeatureStoreService:
+    """
+    Wide per-player feature table for one league season.
+
+    Several FBref player season stat tables are read concurrently (one reader per
+    thread), their column levels flattened into snake_case names prefixed by stat type
+    ("shooting_standard_sh", "passing_total_cmp_pct"), and outer-joined on
+    (team, player). Every counting stat also gets a "<col>_p90" column divided by
+    minutes / 90. The frame is written as Feather (Arrow IPC, via pyarrow), so loading
+    it is a memory map rather than a parse. The scheduling leader builds it at startup
+    when there is no file yet, and rebuilds it whenever a round finishes.
+    """
+
+    FEATURE_DIR = Path("data/fbref/features")
+    STAT_TYPES: Tuple[str, ...] = ("standard", "shooting", "passing", "defense", "possession")
+    KEYS = ["team", "player"]
+    # Bio columns every stat table repeats: kept once, from the first table
+    SHARED = {"league", "season", "nation", "pos", "age", "born", "90s"}
+    NINETIES = "standard_playing_time_90s"
+    # Already rates / ratios / ages: no per-90 version
+    NOT_COUNTS = re.compile(r"(pct|per_90|90s|avg|dist|g_sh$|g_sot$|_mp$|_min$|^age$|^born$)")
+
+    _instances: Dict[Tuple[str, str], "FBrefFeatureStoreService"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, league: str, season: str, feature_dir: Optional[Path] = None):
+        self.league = league
+        self.season = str(season)
+        self.feature_file = Path(feature_dir or self.FEATURE_DIR) / f"{league}_{self.season}.feather"
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._frame: Optional[pd.DataFrame] = None
+        self._mtime: Optional[float] = None
+
+    @classmethod
+    def for_league(cls, league: str, season: Any) -> "FBrefFeatureStoreService":
+        key = (league, str(season))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(league, str(season))
+            return cls._instances[key]
+
+    @property
+    def ready(self) -> bool:
+        return self.feature_file.exists()
+
+    # ------------------------
+    # Build
+    # ------------------------
+    @staticmethod
+    def column_name(stat_type: str, col: Any) -> str:
+        """("Expected", "npxG+xAG") → "<stat_type>_expected_npxg_xag"; "%" reads as "pct"."""
+        parts = col if isinstance(col, tuple) else (col,)
+        text = "_".join(str(p) for p in parts if p is not None and str(p) and not str(p).startswith("Unnamed"))
+        text = re.sub(r"[^a-z0-9]+", "_", text.replace("%", "pct").replace("+", "_").casefold()).strip("_")
+        return f"{stat_type}_{text}" if text else stat_type
+
+    def _read(self, stat_type: str) -> pd.DataFrame:
+        # soccerdata readers keep per-instance session state: one per thread
+        fbref = sd.FBref(leagues=self.league, seasons=self.season)
+        df = fbref.read_player_season_stats(stat_type)
+        index = df.index.to_frame(index=False)[self.KEYS]
+        df = df.reset_index(drop=True)
+
+        out: Dict[str, Any] = {}
+        for col in df.columns:
+            parts = [str(p) for p in (col if isinstance(col, tuple) else (col,)) if p and not str(p).startswith("Unnamed")]
+            leaf = parts[-1].casefold() if parts else ""
+            if leaf in self.SHARED:
+                if stat_type != self.STAT_TYPES[0]:
+                    continue
+                if len(parts) == 1 and leaf != "90s":
+                    out[leaf] = df[col]
+                    continue
+            out[self.column_name(stat_type, col)] = df[col]
+        frame = pd.DataFrame(out)
+        frame.insert(0, "team", index["team"].astype(str).values)
+        frame.insert(1, "player", index["player"].astype(str).values)
+        return frame
+
+    @classmethod
+    def _to_numeric(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """Stat columns to float where every value parses (Arrow needs one type per column)."""
+        for col in df.columns:
+            if col in cls.KEYS or df[col].dtype.kind in "fiub":
+                continue
+            numeric = pd.to_numeric(df[col], errors="coerce")
+            if numeric.notna().sum() == df[col].notna().sum():
+                df[col] = numeric.astype("float64")
+            else:
+                df[col] = df[col].astype("string")
+        return df
+
+    @classmethod
+    def add_per90(cls, df: pd.DataFrame) -> pd.DataFrame:
+        if cls.NINETIES not in df.columns:
+            return df
+        nineties = df[cls.NINETIES].to_numpy(dtype="float64")
+        nineties = np.where(nineties > 0, nineties, np.nan)
+        counts = [
+            c for c in df.columns
+            if c not in cls.KEYS and df[c].dtype.kind in "fi" and not cls.NOT_COUNTS.search(c)
+        ]
+        per90 = pd.DataFrame(
+            df[counts].to_numpy(dtype="float64") / nineties[:, None],
+            columns=[f"{c}_p90" for c in counts],
+            index=df.index,
+        )
+        return pd.concat([df, per90], axis=1)
+
+    def ensure_ready(self) -> None:
+        """Build the feature store if there is none yet; concurrent callers wait for one build."""
+        if self.ready:
+            return
+        with self._build_lock:
+            if not self.ready:
+                self._build()
+
+    def build(self, stat_types: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Read every stat type in parallel, join into one wide frame and persist it. Blocking."""
+        with self._build_lock:
+            return self._build(stat_types)
+
+    def _build(self, stat_types: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        stat_types = tuple(stat_types or self.STAT_TYPES)
+        with ThreadPoolExecutor(max_workers=len(stat_types)) as pool:
+            frames = list(pool.map(self._read, stat_types))
+
+        wide = frames[0]
+        for frame in frames[1:]:
+            wide = wide.merge(frame, on=self.KEYS, how="outer")
+        wide = self._to_numeric(wide)
+        wide.insert(0, "team_id", wide["team"].map({t: team_registry.resolve(t) for t in wide["team"].unique()}))
+        wide = self.add_per90(wide).sort_values(self.KEYS, ignore_index=True)
+
+        self._save(wide)
+        logger.info(f"FBref features {self.league} {self.season}: {wide.shape[0]} players x {wide.shape[1]} columns")
+        return wide
+
+    # ------------------------
+    # Persistence
+    # ------------------------
+    def _save(self, df: pd.DataFrame) -> None:
+        self.feature_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.feature_file.with_suffix(".feather.tmp")
+        df.to_feather(tmp)
+        os.replace(tmp, self.feature_file)
+        with self._lock:
+            self._frame = df
+            self._mtime = self.feature_file.stat().st_mtime
+
+    def frame(self) -> pd.DataFrame:
+        """The feature frame, memory-mapped from disk and reloaded only when the file changed."""
+        try:
+            mtime = self.feature_file.stat().st_mtime
+        except OSError:
+            raise FileNotFoundError(f"Feature store for {self.league} {self.season} is still being built")
+        with self._lock:
+            if self._frame is None or mtime != self._mtime:
+                # pandas' read_feather can't memory-map: go through pyarrow directly
+                self._frame = feather.read_feather(self.feature_file, memory_map=True)
+                self._mtime = mtime
+            return self._frame
+
+    # ------------------------
+    # Queries
+    # ------------------------
+    def columns(self) -> List[str]:
+        return list(self.frame().columns)
+
+    def players(self, names: Iterable[str], columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Rows for the given player names (case / accent-insensitive), optionally only some columns."""
+        df = self.frame()
+        wanted = {fold(n) for n in names}
+        rows = df[df["player"].map(fold).isin(wanted)]
+        if columns:
+            unknown = [c for c in columns if c not in df.columns]
+            if unknown:
+                raise ValueError(f"Unknown feature columns: {unknown}")
+            rows = rows[["team_id", *self.KEYS, *[c for c in columns if c not in self.KEYS and c != "team_id"]]]
+        return rows
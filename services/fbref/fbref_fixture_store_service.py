@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.config import fixtures_path
+from services.utils.serialization_service import serializer
+
+logger = logging.getLogger(__name__)
+
+
+class FBrefFixtureStore:
+    """
+    Split on-disk layout for one league season of FBref fixtures:
+
+      data/fbref/fixtures/<league>_<season>/
+        meta.json             {"meta": {...}, "weeks": [1, 2, ...]}
+        weeks/<week>.json     compact fixture rows of that week, no events
+        events/<game_id>.json events of one enriched match
+
+    Reading a week touches one small file; events are loaded only when asked for.
+    Every file is written atomically (temp file + rename) and only when its content
+    changed, so enriching a match rewrites that match's sidecar and its week, nothing
+    else. Rows keep "enriched" and "event_count" so callers know what a sidecar holds.
+
+    The old single-file layout (<league>_<season>.json) is split into this one the
+    first time the store is opened, and left in place untouched.
+    """
+
+    NO_WEEK = "none"
+
+    _instances: Dict[Tuple[str, str], "FBrefFixtureStore"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, league: str, season: str, root: Optional[Path] = None):
+        self.league = league
+        self.season = str(season)
+        self.legacy_file = fixtures_path("fbref", league, self.season)
+        self.root = Path(root) if root else self.legacy_file.with_suffix("")
+        self.meta_file = self.root / "meta.json"
+        self.weeks_dir = self.root / "weeks"
+        self.events_dir = self.root / "events"
+        self._lock = threading.Lock()
+        self._week_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        if not self.meta_file.exists() and self.legacy_file.exists():
+            self.migrate_legacy()
+
+    @classmethod
+    def for_league(cls, league: str, season: Any) -> "FBrefFixtureStore":
+        key = (league, str(season))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(league, str(season))
+            return cls._instances[key]
+
+    # ------------------------
+    # Files
+    # ------------------------
+    @staticmethod
+    def _read_json(path: Path, default: Any) -> Any:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"FBref fixtures: ignoring unreadable {path}: {e}")
+            return default
+
+    @staticmethod
+    def _write_json(path: Path, payload: Any) -> bool:
+        """Atomic write, skipped when the file already holds exactly this. Returns True if written."""
+        data = serializer.dumps(payload)
+        try:
+            if path.read_bytes() == data:
+                return False
+        except OSError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return True
+
+    def _week_key(self, week: Any) -> str:
+        return self.NO_WEEK if week is None or week == "" else str(week)
+
+    def _week_file(self, week: Any) -> Path:
+        return self.weeks_dir / f"{self._week_key(week)}.json"
+
+    def _events_file(self, game_id: str) -> Path:
+        return self.events_dir / f"{game_id}.json"
+
+    @staticmethod
+    def row_key(fixture: Dict[str, Any]) -> Optional[str]:
+        key = fixture.get("game_id") or fixture.get("temp_id")
+        return str(key) if key else None
+
+    # ------------------------
+    # Reads
+    # ------------------------
+    def exists(self) -> bool:
+        return self.meta_file.exists()
+
+    def meta(self) -> Dict[str, Any]:
+        return self._read_json(self.meta_file, {}).get("meta", {})
+
+    def weeks(self) -> List[Any]:
+        return self._read_json(self.meta_file, {}).get("weeks", [])
+
+    def read_week(self, week: Any) -> List[Dict[str, Any]]:
+        """Rows of one week (no events), cached until that week's file changes."""
+        path = self._week_file(week)
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return []
+        key = self._week_key(week)
+        cached = self._week_cache.get(key)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, self._read_json(path, []))
+            self._week_cache[key] = cached
+        return [dict(row) for row in cached[1]]
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        for week in self.weeks():
+            rows.extend(self.read_week(week))
+        return rows
+
+    def read_events(self, game_id: Any) -> List[Dict[str, Any]]:
+        return self._read_json(self._events_file(str(game_id)), []) if game_id else []
+
+    def with_events(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rows with their "events" loaded from the sidecars (empty for unenriched matches)."""
+        return [
+            {**row, "events": self.read_events(row.get("game_id")) if row.get("enriched") else []}
+            for row in rows
+        ]
+
+    def version(self) -> Optional[float]:
+        """Changes whenever a week or an events sidecar is (re)written."""
+        stamps = []
+        for path in (self.meta_file, self.weeks_dir, self.events_dir):
+            try:
+                stamps.append(path.stat().st_mtime)
+            except OSError:
+                pass
+        return max(stamps) if stamps else None
+
+    def events_changed_since(self, since: Optional[float]) -> Set[str]:
+        """Game ids whose events sidecar was written at or after `since` (all if None)."""
+        if not self.events_dir.exists():
+            return set()
+        return {
+            entry.name[: -len(".json")]
+            for entry in os.scandir(self.events_dir)
+            if entry.name.endswith(".json") and (since is None or entry.stat().st_mtime >= since)
+        }
+
+    # ------------------------
+    # Writes
+    # ------------------------
+    def write_events(self, game_id: Any, events: List[Dict[str, Any]]) -> bool:
+        """Persist one match's events on their own, right after it was enriched."""
+        return self._write_json(self._events_file(str(game_id)), events)
+
+    def write_fixtures(self, meta: Dict[str, Any], fixtures: List[Dict[str, Any]], complete: bool = False) -> List[Any]:
+        """
+        Store fixture rows, split by week. A fixture carrying "events" has them written to
+        its sidecar; without the key the stored sidecar and event_count are kept. Weeks
+        not in `fixtures` are left alone unless `complete` (the whole season was passed),
+        in which case they are dropped. Returns the weeks whose file changed.
+        """
+        by_week: Dict[str, List[Dict[str, Any]]] = {}
+        week_values: Dict[str, Any] = {}
+        with self._lock:
+            for fixture in fixtures:
+                row = {k: v for k, v in fixture.items() if k != "events"}
+                game_id = fixture.get("game_id")
+                if "events" in fixture and game_id:
+                    self.write_events(game_id, fixture["events"] or [])
+                    row["event_count"] = len(fixture["events"] or [])
+                key = self._week_key(fixture.get("week"))
+                by_week.setdefault(key, []).append(row)
+                week_values[key] = fixture.get("week")
+
+            changed = []
+            for key, rows in by_week.items():
+                old = {self.row_key(r): r for r in self._read_json(self._week_file(week_values[key]), [])}
+                for row in rows:
+                    if "event_count" not in row:
+                        row["event_count"] = old.get(self.row_key(row), {}).get("event_count", 0)
+                if self._write_json(self._week_file(week_values[key]), rows):
+                    changed.append(week_values[key])
+
+            weeks = {} if complete else {self._week_key(w): w for w in self.weeks()}
+            weeks.update(week_values)
+            if complete:
+                for path in self.weeks_dir.glob("*.json"):
+                    if path.stem not in weeks:
+                        path.unlink(missing_ok=True)
+            ordered = sorted(weeks.values(), key=lambda w: (w is None, w if isinstance(w, (int, float)) else 0, str(w)))
+            self._write_json(self.meta_file, {"meta": meta, "weeks": ordered})
+        return changed
+
+    def migrate_legacy(self) -> int:
+        """Split the old single JSON file into this layout. Returns the number of fixtures moved."""
+        data = self._read_json(self.legacy_file, {})
+        fixtures = data.get("fixtures", [])
+        for fixture in fixtures:
+            if not fixture.get("enriched"):
+                fixture.pop("events", None)  # nothing to keep: don't create empty sidecars
+        self.write_fixtures(data.get("meta", {}), fixtures, complete=True)
+        logger.info(f"FBref fixtures: split {self.legacy_file} into {self.root} ({len(fixtures)} fixtures)")
+        return len(fixtures)
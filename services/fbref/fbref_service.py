@@ -1,18 +1,23 @@
 from datetime import datetime, timezone
-import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 import pandas as pd
 import soccerdata as sd
+from core.config import settings
+from services.utils.match_store_service import MatchStoreService
+from services.fbref.fbref_event_index_service import FBrefEventIndexService
+from services.fbref.fbref_fixture_store_service import FBrefFixtureStore
+from services.utils.artifact_store_service import artifact_store
+from services.utils.serialization_service import serializer
 
 
 class FBREFService:
     def __init__(self, league: str, seasons: Optional[str] = None):
         self.league = league
-        self.seasons = [seasons] if seasons else [2526]
+        self.seasons = [seasons] if seasons else [settings.SEASON]
         self.fbref = sd.FBref(leagues=[league], seasons=self.seasons)
-        self.fixtures_file = Path("data/fbref/fixtures") / f"{self.league}_{self.seasons[0]}.json"
-        self.fixtures_file.parent.mkdir(parents=True, exist_ok=True)
+        self.fixture_store = FBrefFixtureStore.for_league(self.league, self.seasons[0])
+        self.match_store = MatchStoreService.for_league(self.league, self.seasons[0])
 
     def add_temp_ids(self, fixtures: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Assign a unique temp_id to every fixture based on week + teams + date"""
@@ -28,108 +33,92 @@ class FBREFService:
     # -------------------------
 
 
-    def get_fixtures(self, week: Optional[int] = None) -> Dict[str, Any]:
-        if not self.fixtures_file.exists():
+    def get_fixtures(self, week: Optional[int] = None, include_events: bool = True) -> Dict[str, Any]:
+        """One week's fixtures (the next round by default); events are read from their sidecars only if asked."""
+        if not self.fixture_store.exists():
             return {"meta": {}, "fixtures": []}
 
-        with open(self.fixtures_file, "r", encoding="utf-8") as f:
-            fixtures_data = json.load(f)
+        if week is None:
+            # Next round to kick off (or the last one once the season is over), from the match store
+            week = self.match_store.next_round()
 
-        fixtures = fixtures_data.get("fixtures", [])
+        fixtures = self.fixture_store.read_week(week)
 
         # Add temp_id to matches without a valid game_id
         for idx, f in enumerate(fixtures):
             if not f.get("game_id"):
                 fixtures[idx] = self.add_temp_ids([f])[0]
 
-        if week is not None:
-            fixtures_data["fixtures"] = [f for f in fixtures if f.get("week") == week]
-        else:
-            # --- Find the next round (gameweek) ---
-            now = datetime.now()
-            next_fixture_dt = None
-            next_week = None
-
-            for f in fixtures:
-                date_str = f.get("date")
-                time_str = f.get("time")
-
-                if not date_str or not time_str:
-                    continue
-
-                try:
-                    fixture_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-                except ValueError:
-                    continue
-
-                if fixture_dt > now:
-                    if next_fixture_dt is None or fixture_dt < next_fixture_dt:
-                        next_fixture_dt = fixture_dt
-                        next_week = f.get("week")
-
-            if next_week is not None:
-                fixtures_data["fixtures"] = [f for f in fixtures if f.get("week") == next_week]
-            else:
-                # fallback: return last available week if season is over
-                last_week = max((f.get("week") for f in fixtures if f.get("week")), default=None)
-                fixtures_data["fixtures"] = [f for f in fixtures if f.get("week") == last_week]
+        if include_events:
+            fixtures = self.fixture_store.with_events(fixtures)
 
-        return fixtures_data
+        return {
+            "meta": self.fixture_store.meta(),
+            "fixtures": [
+                {**f, "match": self.match_store.find(f.get("home_team") or "", f.get("away_team") or "")}
+                for f in fixtures
+            ],
+        }
+
+    def get_events(self, game_id: str) -> List[Dict[str, Any]]:
+        return self.fixture_store.read_events(game_id)
+
+    def fixtures_artifact(self, week: Optional[int], include_events: bool = True) -> str:
+        """Artifact name of the pre-rendered get_fixtures(week, include_events) response."""
+        key = FBrefFixtureStore.NO_WEEK if week is None else str(week)
+        return f"fbref/fixtures/{self.league}_{self.seasons[0]}/{key}{'' if include_events else '.lite'}"
+
+    def publish_fixtures(self, weeks: Optional[Iterable[Any]] = None) -> int:
+        """Pre-render the fixtures responses of `weeks` (all stored weeks by default). Returns how many changed."""
+        if weeks is None:
+            weeks = self.fixture_store.weeks()
+        changed = 0
+        for week in weeks:
+            for include_events in (True, False):
+                changed += artifact_store.publish(
+                    self.fixtures_artifact(week, include_events), self.get_fixtures(week, include_events=include_events)
+                )
+        return changed
 
 
     # -------------------------
     # UPDATE JSON + ENRICH MATCHES
     # -------------------------
-    def update_json(self, week: Optional[int] = None) -> Dict[str, Any]:
+    def update_json(
+        self, week: Optional[int] = None, progress: Optional[Callable[..., None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-read the FBref schedule, enrich newly played matches and rewrite the JSON.
+        `progress(stage, done=None, total=None)` is called as the update moves through
+        its stages (see JobQueueService).
+        """
+        report = progress or (lambda *args, **kwargs: None)
+
         # Read schedule from FBref
+        report("read schedule")
         df: pd.DataFrame = self.fbref.read_schedule()
         if df is None or df.empty:
             return {"meta": {}, "fixtures": []}
         df = df.fillna(0)
 
-        # Flatten nested dicts/lists
-        def flatten_dict(d: dict) -> dict:
-            flat = {}
-            for k, v in d.items():
-                if isinstance(v, dict):
-                    for subk, subv in v.items():
-                        flat[f"{k}_{subk}"] = subv
-                elif isinstance(v, list):
-                    flat[k] = json.dumps(v, ensure_ascii=False)
-                else:
-                    flat[k] = v
-            return flat
-
-        df_copy = df.copy()
-        for col in df_copy.select_dtypes(include=["datetime", "datetimetz"]):
-            df_copy[col] = df_copy[col].astype(str)
-
-        fixtures_list = [flatten_dict(row) for row in df_copy.to_dict(orient="records")]
+        # Flatten nested dicts/lists (vectorized, shared with the other scrapers)
+        fixtures_list = serializer.frame_records(df)
 
         # -------------------------
         # PRESERVE EXISTING ENRICHED FLAGS
         # -------------------------
+        report("merge")
+        # Only the compact rows are read: stored events stay in their sidecars untouched
         existing_data = {}
-        if self.fixtures_file.exists():
-            with open(self.fixtures_file, "r", encoding="utf-8") as f:
-                old_data = json.load(f)
-                for f_old in old_data.get("fixtures", []):
-                    key = f_old.get("game_id") or f_old.get("temp_id")
-                    if key:
-                        existing_data[str(key)] = {
-                            "enriched": f_old.get("enriched", False),
-                            "events": f_old.get("events", []),
-                        }
+        for f_old in self.fixture_store.read_all():
+            key = FBrefFixtureStore.row_key(f_old)
+            if key:
+                existing_data[key] = f_old.get("enriched", False)
 
         # Assign preserved data back
         for f in fixtures_list:
-            key = f.get("game_id") or f.get("temp_id")
-            if key and str(key) in existing_data:
-                f["enriched"] = existing_data[str(key)]["enriched"]
-                f["events"] = existing_data[str(key)]["events"]
-            else:
-                f["enriched"] = False
-                f["events"] = []
+            key = FBrefFixtureStore.row_key(f)
+            f["enriched"] = bool(key and existing_data.get(key, False))
 
         # Filter by week if specified
         if week is not None:
@@ -147,40 +136,58 @@ class FBREFService:
         # -------------------------
         # ENRICH ONLY UNENRICHED MATCHES
         # -------------------------
-        fixtures_data = self.enrich_completed_fixtures_incremental(fixtures_data)
+        fixtures_data = self.enrich_completed_fixtures_incremental(fixtures_data, progress=report)
+
+        # Write the week files (newly enriched matches already have their sidecars)
+        report("write")
+        self.fixture_store.write_fixtures(fixtures_data["meta"], fixtures_data["fixtures"], complete=week is None)
 
-        # Write JSON
-        with open(self.fixtures_file, "w", encoding="utf-8") as f:
-            json.dump(fixtures_data, f, ensure_ascii=False, indent=2)
+        self.match_store.update_source("fbref", fixtures_data["fixtures"])
+        # Only newly enriched fixtures carry "events"
+        FBrefEventIndexService.for_league(self.league, self.seasons[0]).update_fixtures(
+            [f for f in fixtures_data["fixtures"] if "events" in f]
+        )
 
+        # meta.last_updated moved, so every week's response did
+        report("publish")
+        self.publish_fixtures()
         return fixtures_data
 
     # -------------------------
     # INCREMENTAL ENRICHMENT
     # -------------------------
-    def enrich_completed_fixtures_incremental(self, fixtures_data: dict) -> dict:
+    def enrich_completed_fixtures_incremental(
+        self, fixtures_data: dict, progress: Optional[Callable[..., None]] = None
+    ) -> dict:
+        report = progress or (lambda *args, **kwargs: None)
+        pending = sum(1 for f in fixtures_data.get("fixtures", []) if not f.get("enriched", False))
+        done = 0
+        report("enrich", done, pending)
         for fixture in fixtures_data.get("fixtures", []):
             game_id = fixture.get("game_id")
             if fixture.get("enriched", False):
                 print(f"ℹ️ Match {game_id} already enriched, skipping")
                 continue
 
+            done += 1
             if not game_id:
                 print(f"⚠️ Match {game_id} invalid, skipping enrichment")
-                fixture["events"] = []
                 fixture["enriched"] = False
+                report("enrich", done, pending)
                 continue
 
             # Enrich match
             print(f"[1/1] Retrieving game with id={game_id}")
             try:
                 events_df = self.fbref.read_events(match_id=game_id)
-                fixture["events"] = events_df.to_dict(orient="records") if events_df is not None else []
+                fixture["events"] = serializer.records(events_df) if events_df is not None else []
                 fixture["enriched"] = True
+                # Saved per match right away, so an interrupted update keeps what it enriched
+                self.fixture_store.write_events(game_id, fixture["events"])
                 print(f"✅ Enriched match {game_id}: {len(fixture['events'])} events")
             except Exception as e:
-                fixture["events"] = []
                 fixture["enriched"] = False
                 print(f"⚠️ Failed to enrich match {game_id}: {e}")
+            report("enrich", done, pending)
 
         return fixtures_data
@@ -0,0 +1,242 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import soccerdata as sd
+
+from routes.fbref.utils import detect_columns, flatten_columns
+from services.utils.search_index_service import PrefixSearchIndex
+from services.utils.serialization_service import serializer
+from services.utils.team_registry_service import team_registry
+
+logger = logging.getLogger(__name__)
+
+
+class FBrefSnapshotService:
+    """
+    Precomputed FBref season player / team lists for the prediction dropdowns.
+
+    refresh() reads the standard player season stats once and builds both lists; the
+    result is persisted to SNAPSHOT_DIR and serialized straight away into response-ready
+    JSON bytes. Filtered responses (team / position) are serialized on first use and
+    cached until the next refresh, so serving is a dict lookup. Prefix search indexes
+    over both lists are rebuilt with every snapshot.
+    """
+
+    SNAPSHOT_DIR = Path("data/fbref/snapshots")
+    STAT_COLUMNS = {
+        "starts": "Playing Time_Starts",
+        "goals": "Performance_Gls",
+        "assists": "Performance_Ast",
+        "xG": "Expected_xG",
+        "xGA": "Expected_xAG",
+    }
+
+    _instances: Dict[Tuple[str, str], "FBrefSnapshotService"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, league: str, season: str, snapshot_dir: Optional[Path] = None):
+        self.league = league
+        self.season = str(season)
+        self.snapshot_file = Path(snapshot_dir or self.SNAPSHOT_DIR) / f"{league}_{self.season}.json"
+        self._refresh_lock = threading.Lock()
+        self.meta: Dict[str, Any] = {}
+        self.players: List[Dict[str, Any]] = []
+        self.teams: List[Dict[str, Any]] = []
+        self._by_team: Dict[str, List[int]] = {}
+        self._by_position: Dict[str, List[int]] = {}
+        self._players_bytes: Dict[Tuple[Optional[str], Optional[str]], bytes] = {}
+        self._teams_bytes: bytes = b"[]"
+        self.player_index = PrefixSearchIndex([], name=lambda p: p["label"])
+        self.team_index = PrefixSearchIndex([], name=lambda t: t["label"])
+        self._mtime: Optional[float] = None
+        self._load()
+
+    @classmethod
+    def for_league(cls, league: str, season: Any) -> "FBrefSnapshotService":
+        key = (league, str(season))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(league, str(season))
+            return cls._instances[key]
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.players)
+
+    # ------------------------
+    # Build
+    # ------------------------
+    def _build(self, df: pd.DataFrame) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        df = flatten_columns(df.reset_index())
+        col_map = detect_columns(df)
+        missing = [k for k in ("player", "team", "pos") if k not in col_map]
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+
+        labels = df[col_map["player"]].astype(str)
+        team_names = df[col_map["team"]].astype(str)
+        team_ids = {t: team_registry.resolve(t) for t in team_names.unique()}
+        players = pd.DataFrame({
+            "label": labels,
+            "team": team_names,
+            "team_id": team_names.map(team_ids),
+            "position": df[col_map["pos"]].astype(str),
+            "value": labels.str.lower().str.replace(" ", "_", regex=False),
+        })
+        for key, col in self.STAT_COLUMNS.items():
+            players[key] = df[col] if col in df.columns else None
+        players = players.astype(object).where(players.notna(), None)
+
+        teams = [
+            {"label": t, "value": t.lower().replace(" ", "_"), "team_id": team_ids[t]}
+            for t in sorted(team_ids)
+        ]
+        return players.to_dict(orient="records"), teams
+
+    def ensure_ready(self) -> None:
+        """Build the snapshot if there is none yet; concurrent callers wait for one build."""
+        if self.ready:
+            return
+        with self._refresh_lock:
+            if not self.ready:
+                self._refresh()
+
+    def refresh(self) -> Dict[str, Any]:
+        """Re-read FBref season stats and rebuild / persist the snapshot. Blocking."""
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> Dict[str, Any]:
+        fbref = sd.FBref(leagues=self.league, seasons=self.season)
+        players, teams = self._build(fbref.read_player_season_stats("standard"))
+        meta = {
+            "league": self.league,
+            "season": self.season,
+            "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "players": len(players),
+            "teams": len(teams),
+        }
+        self._save({"meta": meta, "players": players, "teams": teams})
+        self._apply(meta, players, teams)
+        logger.info(f"FBref snapshot {self.league} {self.season}: {len(players)} players, {len(teams)} teams")
+        return meta
+
+    def _apply(self, meta: Dict[str, Any], players: List[Dict[str, Any]], teams: List[Dict[str, Any]]) -> None:
+        by_team: Dict[str, List[int]] = {}
+        by_position: Dict[str, List[int]] = {}
+        for i, p in enumerate(players):
+            if p.get("team_id"):
+                by_team.setdefault(p["team_id"], []).append(i)
+            # FBref lists dual roles as "DF,MF": index under each
+            for pos in str(p.get("position") or "").split(","):
+                if pos.strip():
+                    by_position.setdefault(pos.strip().upper(), []).append(i)
+
+        # Swap everything in at once; readers never see a half-built snapshot
+        self.meta, self.players, self.teams = meta, players, teams
+        self._by_team, self._by_position = by_team, by_position
+        self._players_bytes = {(None, None): self._dumps(players)}
+        self._teams_bytes = self._dumps(teams)
+        self.player_index = PrefixSearchIndex(players, name=lambda p: p["label"], score=self._relevance)
+        # Teams are also found by nickname / short name ("spurs", "man utd")
+        self.team_index = PrefixSearchIndex(
+            teams, name=lambda t: " ".join([t["label"], *team_registry.aliases(t.get("team_id"))])
+        )
+
+    @staticmethod
+    def _relevance(player: Dict[str, Any]) -> float:
+        """Search ranking: goal involvements first, starts as the tie-breaker."""
+        def num(key: str) -> float:
+            try:
+                return float(player.get(key) or 0)
+            except (TypeError, ValueError):
+                return 0.0
+        return num("goals") + num("assists") + num("starts") / 100
+
+    # ------------------------
+    # Persistence
+    # ------------------------
+    def _save(self, payload: Dict[str, Any]) -> None:
+        self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot_file.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, self.snapshot_file)
+        self._mtime = self.snapshot_file.stat().st_mtime
+
+    def _load(self) -> bool:
+        if not self.snapshot_file.exists():
+            return False
+        try:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"FBref snapshot: ignoring unreadable {self.snapshot_file}: {e}")
+            return False
+        self._apply(payload.get("meta", {}), payload.get("players", []), payload.get("teams", []))
+        self._mtime = self.snapshot_file.stat().st_mtime
+        return self.ready
+
+    def reload_if_changed(self) -> bool:
+        """Pick up a snapshot refreshed by another process."""
+        try:
+            mtime = self.snapshot_file.stat().st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        return self._load()
+
+    # ------------------------
+    # Serving
+    # ------------------------
+    @staticmethod
+    def _dumps(obj: Any) -> bytes:
+        return serializer.dumps(obj)
+
+    def players_bytes(self, team: Optional[str] = None, position: Optional[str] = None) -> bytes:
+        """Serialized player list, optionally filtered by team (any known name or id) and position."""
+        team_id = (team_registry.resolve(team) or team) if team else None
+        pos = position.strip().upper() if position else None
+        key = (team_id, pos)
+        # Work off one snapshot even if a refresh swaps it in meanwhile
+        cache, players, by_team, by_position = self._players_bytes, self.players, self._by_team, self._by_position
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        indices: Optional[set] = None
+        if team_id is not None:
+            indices = set(by_team.get(team_id, []))
+        if pos is not None:
+            by_pos = set(by_position.get(pos, []))
+            indices = by_pos if indices is None else indices & by_pos
+        data = self._dumps([players[i] for i in sorted(indices or ())])
+        # Only cache filters that matched something, so junk query strings can't grow the cache
+        if indices:
+            cache[key] = data
+        return data
+
+    def teams_bytes(self) -> bytes:
+        return self._teams_bytes
+
+    def search_players(self, query: str, limit: int = 10, team: Optional[str] = None,
+                       position: Optional[str] = None) -> List[Dict[str, Any]]:
+        team_id = (team_registry.resolve(team) or team) if team else None
+        pos = position.strip().upper() if position else None
+
+        def where(p: Dict[str, Any]) -> bool:
+            if team_id and p.get("team_id") != team_id:
+                return False
+            return not pos or pos in str(p.get("position") or "").upper().split(",")
+
+        return self.player_index.search(query, limit, where if team_id or pos else None)
+
+    def search_teams(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return self.team_index.search(query, limit)
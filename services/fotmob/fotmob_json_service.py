@@ -1,10 +1,11 @@
 import json
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Optional, Tuple, Dict
 from datetime import datetime
+from core.config import settings, fixtures_path, table_path
 from models.fotmob.fixture import FotMobFixture
-
-CORE_PATH = 'data/fotmob/fixtures/ENG-Premier League_2526.json'
+from services.utils.team_registry_service import team_registry
+from services.utils.table_store_service import table_store
 
 class FotMobJSONService:
     """
@@ -12,14 +13,25 @@ class FotMobJSONService:
     including access to the meta information.
     """
 
-    def __init__(self):
-        self.json_file = Path(CORE_PATH)
+    def __init__(self, league: Optional[str] = None, season: Optional[str] = None):
+        self.league = league or settings.DEFAULT_LEAGUE
+        self.season = season or settings.SEASON
+        # Parquet table, or the JSON file written before the switch
+        self.json_file = table_path("fotmob", "fixtures", self.league, self.season)
+        if not self.json_file.exists():
+            self.json_file = fixtures_path("fotmob", self.league, self.season)
         if not self.json_file.exists():
-            raise FileNotFoundError(f"Fixture file not found: {CORE_PATH}")
+            raise FileNotFoundError(f"Fixture file not found: {self.json_file}")
         self.fixtures: List[FotMobFixture] = self._load_fixtures()
         self.meta: Dict = self._load_meta()
 
     def _load_json_file(self) -> dict:
+        if self.json_file.suffix == ".parquet":
+            df = table_store.read(self.json_file)
+            return {
+                "meta": dict(df.attrs.get("meta", {})),
+                "fixtures": table_store.to_records(df.drop(columns=["_hash"], errors="ignore")),
+            }
         with open(self.json_file, "r", encoding="utf-8") as f:
             return json.load(f)
 
@@ -53,9 +65,13 @@ class FotMobJSONService:
         return [f for f in self.fixtures if f.status == status]
 
     def get_by_team(self, team_name: str) -> List[FotMobFixture]:
+        """Fixtures for a team given any known spelling (FPL, FBref, FotMob, WhoScored)."""
+        team_id = team_registry.resolve(team_name)
+        if team_id is None:
+            return []
         return [
             f for f in self.fixtures
-            if f.home_team.lower() == team_name.lower() or f.away_team.lower() == team_name.lower()
+            if team_registry.resolve(f.home_team) == team_id or team_registry.resolve(f.away_team) == team_id
         ]
 
     def get_by_date(self, date: datetime) -> List[FotMobFixture]:
@@ -1,51 +1,49 @@
-import json
 import pandas as pd
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime, timezone
 import soccerdata as sd
+from core.config import settings, table_path
+from services.utils.fixture_sync_service import FixtureSyncService
+from services.utils.artifact_store_service import artifact_store
+from services.utils.match_store_service import MatchStoreService
+from services.utils.serialization_service import serializer
+from services.utils.table_store_service import table_store
 
 
 class FotMobService:
     def __init__(self, league: str, seasons: Optional[str] = None):
         self.league = league
-        self.seasons = [seasons] if seasons else [2526]  # ✅ list not int
+        self.seasons = [seasons] if seasons else [settings.SEASON]  # ✅ list not int
         self.fotmob = sd.FotMob(leagues=[league], seasons=self.seasons, no_cache=False)
         
+    def table_artifact(self) -> str:
+        """Artifact name of the pre-rendered /table response."""
+        return f"fotmob/table/{self.league}_{self.seasons[0]}"
+
     def get_table(self) -> List[dict]:
+        """Scrape the current league table; persisted as Parquet and pre-rendered for /table."""
         df: pd.DataFrame = self.fotmob.read_league_table()
         df = df.fillna(0)
 
-        # Flatten any nested dicts or lists to prevent pd.DataFrame issues
-        def flatten_dict(d):
-            flat = {}
-            for k, v in d.items():
-                if isinstance(v, dict):
-                    for subk, subv in v.items():
-                        flat[f"{k}_{subk}"] = subv
-                elif isinstance(v, list):
-                    # convert lists to JSON string
-                    flat[k] = json.dumps(v, ensure_ascii=False)
-                else:
-                    flat[k] = v
-            return flat
-
-        df_copy = df.copy()
-        for col in df_copy.select_dtypes(include=["datetime", "datetimetz"]):
-            df_copy[col] = df_copy[col].astype(str)
+        # Nested dicts → "<col>_<key>" columns, lists → JSON strings (vectorized)
+        flat_records = serializer.frame_records(df)
 
-        # Flatten each row
-        flat_records = [flatten_dict(row) for row in df_copy.to_dict(orient="records")]
+        # Keep the last table on disk (typed, columnar) next to the fixtures
+        table_store.write(
+            table_path("fotmob", "table", self.league, self.seasons[0]),
+            pd.DataFrame(flat_records),
+            meta={"league": self.league, "season": self.seasons[0],
+                  "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")},
+        )
+        artifact_store.publish(self.table_artifact(), flat_records)
         return flat_records
     
-    def get_fixtures(self) -> dict:
+    def get_fixtures(self, update_store: bool = True) -> dict:
         """
-        Fetch fixtures from FotMob and save with metadata.
-        JSON structure:
-        {
-          "meta": { "last_updated": "...", "league": "...", "season": 2526 },
-          "fixtures": [ ... ]
-        }
+        Fetch fixtures from FotMob and save them as a Parquet table (meta in the file),
+        rewriting it (atomically) only when fixtures changed.
+        Returns {"meta", "fixtures", "changes"} (see FixtureSyncService).
         """
         df: pd.DataFrame = self.fotmob.read_schedule()
         if df is None or df.empty:
@@ -53,43 +51,19 @@ class FotMobService:
 
         df = df.fillna(0)
 
-        # Flatten any nested dicts or lists to prevent pd.DataFrame issues
-        def flatten_dict(d):
-            flat = {}
-            for k, v in d.items():
-                if isinstance(v, dict):
-                    for subk, subv in v.items():
-                        flat[f"{k}_{subk}"] = subv
-                elif isinstance(v, list):
-                    # convert lists to JSON string
-                    flat[k] = json.dumps(v, ensure_ascii=False)
-                else:
-                    flat[k] = v
-            return flat
-
-        df_copy = df.copy()
-        for col in df_copy.select_dtypes(include=["datetime", "datetimetz"]):
-            df_copy[col] = df_copy[col].astype(str)
-
-        # Flatten each row
-        flat_records = [flatten_dict(row) for row in df_copy.to_dict(orient="records")]
-
-        file_path = Path("data/fotmob/fixtures") / f"{self.league}_{self.seasons[0]}.json"
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+        # Nested dicts → "<col>_<key>" columns, lists → JSON strings (vectorized)
+        flat_records = serializer.frame_records(df)
 
-        # Prepare output with meta
-        output = {
-            "meta": {
-                "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "league": self.league,
-                "season": self.seasons[0],
-            },
-            "fixtures": flat_records,
-        }
+        file_path = table_path("fotmob", "fixtures", self.league, self.seasons[0])
 
-        # Save to file
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(output, f, ensure_ascii=False, indent=2)
+        # Only rewrite the file when fixtures changed; the change list drives downstream updates
+        output = FixtureSyncService.for_file("fotmob", self.league, self.seasons[0], file_path).sync(flat_records)
 
-        print(f"✅ FotMob fixtures updated: {file_path}")
+        if output["changes"]:
+            print(f"✅ FotMob fixtures updated: {file_path} ({len(output['changes'])} changed)")
+            if update_store:
+                changed = [c["fixture"] for c in output["changes"] if c["fixture"] is not None]
+                MatchStoreService.for_league(self.league, self.seasons[0]).update_source("fotmob", changed)
+        else:
+            print(f"ℹ️ FotMob fixtures unchanged: {file_path}")
         return output
@@ -0,0 +1,33 @@
+from typing import Any, Dict, List
+
+
+def ingest_fixtures(source: str, league: str, season: str) -> List[Dict[str, Any]]:
+    """
+    Scrape one (source, league) pair in a worker process.
+
+    The child only scrapes, diffs and writes the source file; it returns the changed
+    fixtures so the parent process applies them to its in-memory match store (which
+    fires the points-resolution listeners there). Kept in its own light module so
+    spawning workers doesn't import the app or its scheduler.
+    """
+    if source == "fotmob":
+        from services.fotmob.fotmob_service import FotMobService
+        from services.utils.artifact_store_service import artifact_store
+
+        fotmob = FotMobService(league, season)
+        output = fotmob.get_fixtures(update_store=False)
+        # The table only moves when results do: re-render it then (or if it was never rendered)
+        if output.get("changes") or artifact_store.etag(fotmob.table_artifact()) is None:
+            try:
+                fotmob.get_table()
+            except Exception as e:
+                # Never lose the fixture changes over the table
+                print(f"⚠️ FotMob table for {league} failed: {e}")
+    elif source == "whoscored":
+        from services.whoscored.whoscored_service import WhoScoredService
+
+        output = WhoScoredService(league, season).get_fixtures(update_store=False)
+    else:
+        raise ValueError(f"Unknown ingest source '{source}'")
+
+    return [c["fixture"] for c in output.get("changes", []) if c["fixture"] is not None]
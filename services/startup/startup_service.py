@@ -1,35 +1,301 @@
-from services.fotmob.fotmob_service import FotMobService
-from apscheduler.schedulers.background import BackgroundScheduler
+import asyncio
+import functools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from services.whoscored.whoscored_service import WhoScoredService
+from services.startup.ingest_worker import ingest_fixtures
+from services.fbref.fbref_fantasy_fixture_data import FixtureDifficultyService
+from services.fbref.fbref_service import FBREFService
+from services.fbref.fbref_snapshot_service import FBrefSnapshotService
+from services.fbref.fbref_feature_store_service import FBrefFeatureStoreService
+from services.utils.match_store_service import MatchStoreService
+from services.utils.points_resolver_service import PointsResolverService
+from services.utils.lease_service import lease_service
+from core.config import settings
 
 class StartupService:
+    """
+    Keeps FotMob / WhoScored fixtures fresh, polling hard only while matches are on.
+
+    The poll job reschedules itself: every LIVE_INTERVAL inside a match window
+    (kickoff → kickoff + MATCH_WINDOW, read from the match store), otherwise it sleeps
+    until the next kickoff (at most IDLE_INTERVAL). When a poll turns matches final,
+    only their rounds are re-resolved for points.
+
+    Runs on an asyncio scheduler started from the FastAPI lifespan. Every configured
+    (league, source) pair is scraped in parallel on a process pool, throttled by a
+    per-source semaphore (settings.SOURCE_CONCURRENCY), so the server serves the last
+    on-disk snapshots from the first request while ingestion catches up.
+
+    With several workers / instances every process runs this scheduler, but only the
+    holder of the POLL_JOB_ID lease scrapes; the others just reload what the leader
+    wrote. The leader keeps the lease alive while scraping and extends it to cover the
+    gap until its next poll, so if it dies a follower takes over at its next poll.
+    """
+
+    SOURCES = ("fotmob", "whoscored")
+    MATCH_WINDOW = timedelta(hours=2, minutes=15)
+    LIVE_INTERVAL = timedelta(minutes=5)
+    IDLE_INTERVAL = timedelta(hours=24)
+    POLL_JOB_ID = "fixtures-adaptive-poll"
+    LEASE_TTL = timedelta(minutes=2)     # renewed every LEASE_TTL / 3 while scraping
+    LEASE_GRACE = timedelta(minutes=2)   # slack past the leader's next poll before failover
+
     def __init__(self):
-        self.scheduler = BackgroundScheduler()
+        self.scheduler = AsyncIOScheduler(timezone="UTC")
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.lease = lease_service(settings.SCHEDULER_LEASE_BACKEND)
+        self.is_leader = False
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.semaphores = {
+            source: asyncio.Semaphore(max(1, settings.SOURCE_CONCURRENCY.get(source, 1))) for source in self.SOURCES
+        }
+        self.stores = {league: MatchStoreService.for_league(league, settings.SEASON) for league in settings.LEAGUES}
+        self.fbref_services: Dict[str, FBREFService] = {}  # renders fixtures artifacts, created on first use
+        self.team_stats: List[FixtureDifficultyService] = []  # gameweek-end FBref team stats refreshes
+        for store in self.stores.values():
+            store.add_listener(lambda changed, store=store: self._on_matches_changed(store, changed))
 
-    def update_fotmob_fixtures(self):
-        leagues = ["ENG-Premier League"]  # 🔧 extend later
-        for league in leagues:
-            FotMobService(league).get_fixtures()
+    async def ingest(self, source: str, league: str):
+        """Scrape one (source, league) in the process pool, then merge its changes into the match store."""
+        async with self.semaphores[source]:
+            changed = await asyncio.get_running_loop().run_in_executor(
+                self.pool, ingest_fixtures, source, league, settings.SEASON
+            )
+        if changed:
+            await asyncio.to_thread(self.stores[league].update_source, source, changed)
 
-    def update_whoscored_fixtures(self):
-        leagues = ["ENG-Premier League"]  # 🔧 extend later
-        for league in leagues:
-            WhoScoredService(league).get_fixtures()
+    # ------------------------
+    # Match windows
+    # ------------------------
+    def live_matches(self, now: datetime) -> List[dict]:
+        """Matches with kickoff <= now < kickoff + MATCH_WINDOW that aren't final yet."""
+        live = []
+        for store in self.stores.values():
+            live += [m for m in store.between(now - self.MATCH_WINDOW, now) if m.get("status") != "finished"]
+        return live
 
-    async def start(self):
-        # Run immediately on startup
-        self.update_fotmob_fixtures()
-        self.update_whoscored_fixtures()
+    def next_kickoff(self, now: datetime) -> Optional[datetime]:
+        kickoffs = []
+        for store in self.stores.values():
+            upcoming = store.between(now)
+            if upcoming:
+                kickoffs.append(datetime.fromisoformat(upcoming[0]["kickoff"].replace("Z", "+00:00")))
+        return min(kickoffs) if kickoffs else None
+
+    def next_poll_time(self, now: datetime) -> datetime:
+        if self.live_matches(now):
+            return now + self.LIVE_INTERVAL
+        next_kickoff = self.next_kickoff(now)
+        if next_kickoff is not None:
+            return min(max(next_kickoff, now + self.LIVE_INTERVAL), now + self.IDLE_INTERVAL)
+        return now + self.IDLE_INTERVAL
+
+    # ------------------------
+    # Job status
+    # ------------------------
+    async def _run_tracked(self, name: str, job: Callable[[], Awaitable[Any]]) -> bool:
+        """Await a job, recording last run, duration and outcome."""
+        started = time.perf_counter()
+        status = self.jobs.setdefault(name, {"runs": 0, "failures": 0})
+        status["last_run"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        status["running"] = True
+        try:
+            await job()
+            status.update(outcome="success", error=None)
+            return True
+        except Exception as e:
+            status["failures"] += 1
+            status.update(outcome="error", error=str(e))
+            print(f"⚠️ StartupService: {name} failed: {e}")
+            return False
+        finally:
+            status["runs"] += 1
+            status["running"] = False
+            status["duration_s"] = round(time.perf_counter() - started, 3)
+
+    def status(self) -> Dict[str, Any]:
+        job = self.scheduler.get_job(self.POLL_JOB_ID) if self.scheduler.running else None
+        next_run = job.next_run_time.isoformat() if job and job.next_run_time else None
+        return {
+            "running": self.scheduler.running,
+            "leader": self.is_leader,
+            "owner": self.lease.owner,
+            "next_poll": next_run,
+            "live_matches": len(self.live_matches(datetime.now(timezone.utc))),
+            "jobs": self.jobs,
+            "scheduled": [
+                {"id": job.id, "next_run": job.next_run_time.isoformat() if job.next_run_time else None}
+                for job in (self.scheduler.get_jobs() if self.scheduler.running else [])
+            ],
+        }
+
+    # ------------------------
+    # Adaptive poll
+    # ------------------------
+    async def _keep_lease(self):
+        while True:
+            await asyncio.sleep(self.LEASE_TTL.total_seconds() / 3)
+            await self._try_lease(self.LEASE_TTL)
+
+    async def poll(self):
+        now = datetime.now(timezone.utc)
+        self.is_leader = await self._try_lease(self.LEASE_TTL)
+        if self.is_leader:
+            live = self.live_matches(now)
+            print(f"⏱️ StartupService: polling fixtures ({len(live)} live matches)")
+            keep_alive = asyncio.create_task(self._keep_lease())
+            self._ensure_features()
+            try:
+                # (league, source) pairs are independent: scrape them all in parallel
+                await asyncio.gather(*[
+                    self._run_tracked(f"{source}:{league}", lambda s=source, l=league: self.ingest(s, l))
+                    for league in self.stores for source in self.SOURCES
+                ])
+            finally:
+                keep_alive.cancel()
+        else:
+            # Follower: the leader scrapes, we only pick up the data it wrote
+            for store in self.stores.values():
+                if store.reload_if_changed():
+                    print(f"🔄 StartupService: reloaded match store {store.league} {store.season}")
+                FBrefSnapshotService.for_league(store.league, store.season).reload_if_changed()
+            for service in self.team_stats:
+                if service.reload_if_changed():
+                    print(f"🔄 StartupService: reloaded FBref team stats {service.league}")
+
+        # Kickoffs may have moved: recompute the gameweek-end team stats refreshes
+        self._schedule_team_stats()
+
+        now = datetime.now(timezone.utc)
+        run_at = self.next_poll_time(now)
+        if self.is_leader:
+            await self._try_lease(run_at - now + self.LEASE_GRACE)
+        self._schedule_poll(run_at)
 
-        # Schedule daily jobs
-        self.scheduler.add_job(self.update_fotmob_fixtures, "cron", hour=0, minute=0, timezone="UTC")
-        self.scheduler.add_job(self.update_whoscored_fixtures, "cron", hour=0, minute=5, timezone="UTC")
-        # ^ small offset to avoid hammering both at exact same second
+    async def _try_lease(self, ttl: timedelta) -> bool:
+        try:
+            return await self.lease.acquire(self.POLL_JOB_ID, ttl)
+        except Exception as e:
+            print(f"⚠️ StartupService: lease check failed, skipping this poll: {e}")
+            return False
 
+    def _schedule_poll(self, run_at: datetime):
+        self.scheduler.add_job(self.poll, "date", run_date=run_at, id=self.POLL_JOB_ID, replace_existing=True)
+        print(f"🗓️ StartupService: next fixtures poll at {run_at.isoformat()}")
+
+    # ------------------------
+    # FBref team stats (fixture difficulty)
+    # ------------------------
+    def add_team_stats(self, service: FixtureDifficultyService) -> None:
+        """Refresh `service` after every gameweek, on this scheduler and only on the leader."""
+        self.team_stats.append(service)
+        if self.scheduler.running:
+            self._schedule_team_stats()
+
+    def _schedule_team_stats(self) -> None:
+        for service in self.team_stats:
+            store = self.stores.get(service.league)
+            service.schedule_refreshes(
+                self.scheduler,
+                refresh=functools.partial(self._refresh_team_stats, service),  # stays a coroutine job
+                matches=store.all() if store else None,
+            )
+
+    async def _refresh_team_stats(self, service: FixtureDifficultyService) -> None:
+        if not self.is_leader:
+            return  # the leader scrapes; followers reload its snapshot on their next poll
+        await self._run_tracked(f"team-stats:{service.league}", lambda: asyncio.to_thread(service.refresh))
+
+    def _ensure_features(self) -> None:
+        """
+        Build any feature store that has no file yet (fresh deploy) in the background, so
+        /players/compare doesn't wait for the first finished round. Leader only; followers
+        pick the file up when it appears.
+        """
+        for store in self.stores.values():
+            features = FBrefFeatureStoreService.for_league(store.league, store.season)
+            name = f"features:{store.league}"
+            if not features.ready and not self.jobs.get(name, {}).get("running"):
+                asyncio.create_task(
+                    self._run_tracked(name, lambda f=features: asyncio.to_thread(f.ensure_ready))
+                )
+
+    def _fbref(self, league: str) -> FBREFService:
+        if league not in self.fbref_services:
+            self.fbref_services[league] = FBREFService(league, settings.SEASON)
+        return self.fbref_services[league]
+
+    def _on_matches_changed(self, store: MatchStoreService, changed: List[str]):
+        """
+        Re-render the fixtures responses of the rounds that changed; where a changed
+        match is now final, re-resolve points and refresh season stats too.
+        """
+        touched: Set[int] = set()
+        rounds: Set[int] = set()
+        for match_id in changed:
+            match = store.get(match_id)
+            if match and match.get("round") is not None:
+                touched.add(match["round"])
+                if match.get("status") == "finished":
+                    rounds.add(match["round"])
+        if self.loop is None:
+            return
+
+        if touched:
+            fbs = self._fbref(store.league)
+            asyncio.run_coroutine_threadsafe(
+                self._run_tracked(
+                    f"artifacts:{store.league}", lambda: asyncio.to_thread(fbs.publish_fixtures, sorted(touched))
+                ),
+                self.loop,
+            )
+        if not rounds:
+            return
+
+        resolver = PointsResolverService(store.league, store.season)
+        # Mongo (motor) lives on the app's event loop, so hand the coroutine over to it
+        asyncio.run_coroutine_threadsafe(resolver.resolve_rounds(rounds), self.loop)
+
+        # Player / team season stats moved: rebuild the dropdown snapshot and feature store off the request path
+        snapshot = FBrefSnapshotService.for_league(store.league, store.season)
+        features = FBrefFeatureStoreService.for_league(store.league, store.season)
+        asyncio.run_coroutine_threadsafe(
+            self._run_tracked(f"snapshot:{store.league}", lambda: asyncio.to_thread(snapshot.refresh)), self.loop
+        )
+        asyncio.run_coroutine_threadsafe(
+            self._run_tracked(f"features:{store.league}", lambda: asyncio.to_thread(features.build)), self.loop
+        )
+
+    async def start(self):
+        """Start polling in the background; doesn't wait for the first scrape."""
+        self.loop = asyncio.get_running_loop()
+        # Spawn, not fork: forking this threaded process (event loop, scheduler, Mongo
+        # client threads) can copy held locks into children that then deadlock
+        self.pool = ProcessPoolExecutor(
+            max_workers=max(1, settings.INGEST_PROCESSES), mp_context=multiprocessing.get_context("spawn")
+        )
         self.scheduler.start()
+        # First poll right away (in the background), then adaptively
+        self.scheduler.add_job(self.poll, id=self.POLL_JOB_ID, replace_existing=True)
         print("🚀 StartupService: scheduler started")
 
     async def stop(self):
-        self.scheduler.shutdown()
-        print("🛑 StartupService: scheduler stopped")
\ No newline at end of file
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        if self.is_leader:
+            # Hand over right away instead of making followers wait out the lease
+            await self.lease.release(self.POLL_JOB_ID)
+            self.is_leader = False
+        print("🛑 StartupService: scheduler stopped")
+
+
+startup_service = StartupService()
@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+from services.utils.response_cache_service import brotli, response_cache
+from services.utils.serialization_service import serializer
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactStoreService:
+    """
+    Pre-rendered JSON responses, written when the data behind them changes (ingestion,
+    FBref updates, points resolution) instead of being rebuilt on every request.
+
+    An artifact named "fbref/fixtures/ENG-Premier League_2526/7" lives under ARTIFACT_DIR as
+
+      <name>.json      the response body
+      <name>.json.gz   gzip, max level (compressed once, so it can afford to)
+      <name>.json.br   brotli, max quality (only if brotli is installed)
+      <name>.etag      content hash of <name>.json; written last, so it names a complete set
+
+    publish() skips the write when the content hash is unchanged; serve() answers
+    If-None-Match with 304 from the .etag file alone and otherwise streams the best
+    encoding the client accepts as a FileResponse (sendfile / pathsend where the server
+    supports it). The ETag is the content hash ResponseCacheService.respond() gives the
+    same payload rendered live without a version, and the headers are its headers, so
+    clients can't tell a pre-rendered response from a live one. Artifacts are plain
+    files, so every worker process serves what the scheduling leader wrote.
+    """
+
+    ARTIFACT_DIR = Path("data/artifacts")
+    GZIP_LEVEL = 9
+    BROTLI_QUALITY = 11
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or self.ARTIFACT_DIR)
+        self._lock = threading.Lock()
+        self._etags: Dict[Path, Tuple[float, str]] = {}
+
+    # ------------------------
+    # Files
+    # ------------------------
+    def _path(self, name: str, suffix: str) -> Path:
+        return self.root / f"{name}{suffix}"
+
+    def _variant(self, name: str, encoding: str) -> Path:
+        return self._path(name, {"br": ".json.br", "gzip": ".json.gz"}.get(encoding, ".json"))
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def etag(self, name: str) -> Optional[str]:
+        """Current ETag of an artifact (None if it was never published), cached by mtime."""
+        path = self._path(name, ".etag")
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None
+        cached = self._etags.get(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                cached = (mtime, path.read_text(encoding="utf-8").strip())
+            except OSError:
+                return None
+            self._etags[path] = cached
+        return cached[1]
+
+    # ------------------------
+    # Writes
+    # ------------------------
+    def publish(self, name: str, payload: Any) -> bool:
+        """Render `payload` (JSON-able or bytes) into the artifact. Returns True if its content changed."""
+        data = payload if isinstance(payload, bytes) else serializer.dumps(payload)
+        etag = f'"{hashlib.sha1(data).hexdigest()[:32]}"'
+        with self._lock:
+            if self.etag(name) == etag:
+                return False
+            try:
+                self._write(self._variant(name, "gzip"), gzip.compress(data, compresslevel=self.GZIP_LEVEL, mtime=0))
+                if brotli is not None:
+                    self._write(self._variant(name, "br"), brotli.compress(data, quality=self.BROTLI_QUALITY))
+                self._write(self._variant(name, "identity"), data)
+                self._write(self._path(name, ".etag"), etag.encode("utf-8"))
+            except OSError as e:
+                logger.error(f"Artifacts: writing {name} failed: {e}")
+                return False
+        logger.info(f"Artifacts: published {name} ({len(data)} bytes)")
+        return True
+
+    # ------------------------
+    # Serving
+    # ------------------------
+    def serve(self, request: Request, name: str) -> Optional[Response]:
+        """304 or the pre-rendered file for `request`; None if the artifact doesn't exist."""
+        etag = self.etag(name)
+        if etag is None:
+            return None
+        encoding = response_cache.negotiate(request.headers.get("accept-encoding"))
+        if response_cache.matches(request, etag):
+            return Response(status_code=304, headers=response_cache.headers(etag, encoding))
+        path = self._variant(name, encoding)
+        if not path.exists():
+            encoding, path = "identity", self._variant(name, "identity")
+            if not path.exists():
+                return None
+        return FileResponse(path, media_type="application/json", headers=response_cache.headers(etag, encoding))
+
+
+artifact_store = ArtifactStoreService()
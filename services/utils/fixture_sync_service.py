@@ -0,0 +1,244 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from services.utils.table_store_service import table_store
+
+logger = logging.getLogger(__name__)
+
+
+class FixtureSyncService:
+    """
+    Diff-based fixture ingestion for one source file.
+
+    New fixtures are compared against the stored ones by id and a per-fixture field
+    hash; the file is only rewritten (atomically: temp file + rename) when something
+    changed. Each sync returns a change list, also pushed to registered listeners:
+      {"id", "changes": ["new" | "result" | "rescheduled" | "status" | "updated" | "removed"],
+       "fixture": <new fixture or None>, "before": {field: old value, ...}}
+
+    A ".parquet" file_path is stored through the table store (typed columns, kickoff
+    fields as timestamps) with each row's hash in a HASH_COLUMN, so diffs compare
+    against exactly what was hashed at write time; a JSON file next to it from before
+    the switch seeds the first diff. Kickoff fields are normalized to ISO-8601 UTC.
+    """
+
+    HASH_COLUMN = "_hash"
+
+    _listeners: List[Callable[[str, str, str, List[Dict[str, Any]]], None]] = []
+    _instances: Dict[str, "FixtureSyncService"] = {}
+
+    def __init__(
+        self,
+        source: str,
+        league: str,
+        season: Any,
+        file_path: Path,
+        key: str = "game_id",
+        result_fields: Sequence[str] = ("home_score", "away_score"),
+        kickoff_fields: Sequence[str] = ("date",),
+        status_fields: Sequence[str] = ("status",),
+    ):
+        self.source = source
+        self.league = league
+        self.season = season
+        self.file_path = Path(file_path)
+        self.key = key
+        self.result_fields = tuple(result_fields)
+        self.kickoff_fields = tuple(kickoff_fields)
+        self.status_fields = tuple(status_fields)
+        self._fixtures: Optional[Dict[str, Dict[str, Any]]] = None
+        self._hashes: Dict[str, str] = {}
+        self._mtime: Optional[float] = None
+        self.meta: Dict[str, Any] = {}
+
+    @classmethod
+    def for_file(cls, source: str, league: str, season: Any, file_path: Path, **kwargs) -> "FixtureSyncService":
+        """One syncer per file, so stored hashes survive across short-lived service instances."""
+        key = str(Path(file_path))
+        if key not in cls._instances:
+            cls._instances[key] = cls(source, league, season, file_path, **kwargs)
+        return cls._instances[key]
+
+    # ------------------------
+    # Listeners
+    # ------------------------
+    @classmethod
+    def add_listener(cls, callback: Callable[[str, str, str, List[Dict[str, Any]]], None]) -> None:
+        """callback(source, league, season, changes) after every sync that changed something."""
+        cls._listeners.append(callback)
+
+    def _notify(self, changes: List[Dict[str, Any]]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(self.source, self.league, str(self.season), changes)
+            except Exception as e:
+                logger.error(f"Fixture sync listener {callback} failed: {e}")
+
+    # ------------------------
+    # Hashing / diffing
+    # ------------------------
+    @staticmethod
+    def _json_default(o: Any) -> Any:
+        return o.item() if hasattr(o, "item") else o.isoformat() if hasattr(o, "isoformat") else str(o)
+
+    @classmethod
+    def normalize(cls, fixtures: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """JSON round-trip, so freshly scraped rows (numpy / Timestamp values) compare equal to stored ones."""
+        return json.loads(json.dumps(fixtures, ensure_ascii=False, default=cls._json_default))
+
+    def canonical_kickoffs(self, fixtures: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Kickoff fields as ISO-8601 UTC strings, whatever format the scraper produced."""
+        for fixture in fixtures:
+            for field in self.kickoff_fields:
+                value = fixture.get(field)
+                if not value:
+                    continue
+                try:
+                    ts = pd.Timestamp(value)
+                except (TypeError, ValueError):
+                    continue
+                fixture[field] = (ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")).isoformat()
+        return fixtures
+
+    @staticmethod
+    def fixture_hash(fixture: Dict[str, Any]) -> str:
+        payload = json.dumps(fixture, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _load_stored(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Stored fixtures by id, kept in memory and only re-read when the file changed
+        underneath us (another ingest worker process wrote it).
+        """
+        mtime = self.file_path.stat().st_mtime if self.file_path.exists() else None
+        if self._fixtures is not None and mtime == self._mtime:
+            return self._fixtures
+        self._fixtures = {}
+        self._mtime = mtime
+        if self.file_path.suffix == ".parquet":
+            self._load_table()
+            return self._fixtures
+        if self.file_path.exists():
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.meta = data.get("meta", {})
+                for fixture in data.get("fixtures", []):
+                    self._fixtures[str(fixture.get(self.key))] = fixture
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"{self.source}: ignoring unreadable fixtures file {self.file_path}: {e}")
+        self._hashes = {fid: self.fixture_hash(f) for fid, f in self._fixtures.items()}
+        return self._fixtures
+
+    def _load_table(self) -> None:
+        legacy = self.file_path.with_suffix(".json")
+        if not self.file_path.exists():
+            if legacy.exists():
+                # First run after moving to Parquet: diff against the old JSON
+                try:
+                    with open(legacy, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    self.meta = data.get("meta", {})
+                    fixtures = self.canonical_kickoffs(self.normalize(data.get("fixtures", [])))
+                    self._fixtures = {str(f.get(self.key)): f for f in fixtures}
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning(f"{self.source}: ignoring unreadable fixtures file {legacy}: {e}")
+            self._hashes = {fid: self.fixture_hash(f) for fid, f in self._fixtures.items()}
+            return
+        try:
+            df = table_store.read(self.file_path)
+        except Exception as e:
+            logger.warning(f"{self.source}: ignoring unreadable fixtures table {self.file_path}: {e}")
+            self._hashes = {}
+            return
+        self.meta = dict(df.attrs.get("meta", {}))
+        hashes = df[self.HASH_COLUMN].tolist() if self.HASH_COLUMN in df.columns else None
+        records = self.normalize(table_store.to_records(df.drop(columns=[self.HASH_COLUMN], errors="ignore")))
+        self._fixtures = {str(f.get(self.key)): f for f in records}
+        self._hashes = (
+            {str(f.get(self.key)): h for f, h in zip(records, hashes)} if hashes is not None
+            else {fid: self.fixture_hash(f) for fid, f in self._fixtures.items()}
+        )
+
+    def diff(self, fixtures: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Change list of normalized `fixtures` against the stored set (unchanged hashes are skipped).
+        """
+        stored = self._load_stored()
+        changes: List[Dict[str, Any]] = []
+        seen = set()
+        for fixture in fixtures:
+            fid = str(fixture.get(self.key))
+            seen.add(fid)
+            old = stored.get(fid)
+            if old is None:
+                changes.append({"id": fid, "changes": ["new"], "fixture": fixture, "before": {}})
+                continue
+            if self._hashes.get(fid) == self.fixture_hash(fixture):
+                continue
+
+            before = {k: old.get(k) for k in set(old) | set(fixture) if old.get(k) != fixture.get(k)}
+            kinds = [
+                kind for kind, fields in (
+                    ("result", self.result_fields),
+                    ("rescheduled", self.kickoff_fields),
+                    ("status", self.status_fields),
+                )
+                if any(f in before for f in fields)
+            ]
+            changes.append({"id": fid, "changes": kinds or ["updated"], "fixture": fixture, "before": before})
+
+        for fid in stored.keys() - seen:
+            changes.append({"id": fid, "changes": ["removed"], "fixture": None, "before": stored[fid]})
+        return changes
+
+    # ------------------------
+    # Sync + atomic write
+    # ------------------------
+    def sync(self, fixtures: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Diff `fixtures` against the stored file and rewrite it only if something changed.
+        Returns {"meta", "fixtures", "changes"}.
+        """
+        fixtures = self.canonical_kickoffs(self.normalize(fixtures))
+        changes = self.diff(fixtures)
+        if changes:
+            self.meta = {
+                "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "league": self.league,
+                "season": self.season,
+            }
+            self._write({"meta": self.meta, "fixtures": fixtures})
+            self._fixtures = {str(f.get(self.key)): f for f in fixtures}
+            self._hashes = {fid: self.fixture_hash(f) for fid, f in self._fixtures.items()}
+            counts: Dict[str, int] = {}
+            for change in changes:
+                for kind in change["changes"]:
+                    counts[kind] = counts.get(kind, 0) + 1
+            logger.info(f"{self.source}: {len(changes)} fixtures changed {counts}, wrote {self.file_path}")
+            self._notify(changes)
+        else:
+            logger.info(f"{self.source}: fixtures unchanged, skipped write")
+        return {"meta": self.meta, "fixtures": fixtures, "changes": changes}
+
+    def _write(self, payload: Dict[str, Any]) -> None:
+        if self.file_path.suffix == ".parquet":
+            fixtures = payload["fixtures"]
+            df = pd.DataFrame(fixtures)
+            df[self.HASH_COLUMN] = [self.fixture_hash(f) for f in fixtures]
+            table_store.write(self.file_path, df, meta=payload["meta"], datetime_cols=self.kickoff_fields)
+            self._mtime = self.file_path.stat().st_mtime
+            return
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.file_path.with_suffix(self.file_path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.file_path)
+        self._mtime = self.file_path.stat().st_mtime
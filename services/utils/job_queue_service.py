@@ -0,0 +1,356 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from core.config import settings
+from db.mongo_client import db
+from services.utils.lease_service import lease_service, try_guard
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class Job:
+    """
+    One queued unit of work and its status.
+
+    The job function reports progress through report(stage, done, total); switching to
+    a new stage closes the previous one, so `stages` ends up with per-stage timings.
+    report() is safe to call from the worker thread the job offloads to.
+    """
+
+    def __init__(self, name: str, key: Hashable, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.key = key
+        self.params = params
+        self.status = "queued"
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.stage: Optional[str] = None
+        self.progress: Dict[str, Optional[int]] = {"done": None, "total": None}
+        self.stages: List[Dict[str, Any]] = []
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.waiters = 1  # requests coalesced into this job
+        self._stage_started: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def report(self, stage: str, done: Optional[int] = None, total: Optional[int] = None) -> None:
+        if stage != self.stage:
+            self._close_stage()
+            self.stage = stage
+            self._stage_started = time.perf_counter()
+        self.progress = {"done": done, "total": total}
+
+    def _close_stage(self) -> None:
+        if self.stage is not None and self._stage_started is not None:
+            self.stages.append({
+                "stage": self.stage,
+                "duration_s": round(time.perf_counter() - self._stage_started, 3),
+            })
+        self.stage = None
+        self._stage_started = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stage": self.stage,
+            "progress": self.progress,
+            "stages": list(self.stages),
+            "waiters": self.waiters,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def _digest(key: Hashable) -> str:
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+
+
+class MongoJobStore:
+    """
+    Job documents {_id: job id, ...Job.to_dict(), active_key, heartbeat_at}.
+
+    active_key (a digest of the dedupe key) is only set while a job is queued or
+    running and carries a partial unique index, so two processes submitting the same
+    job can't both insert it: the loser coalesces into the winner's document instead.
+    """
+
+    _PROJECTION = {"_id": 0, "active_key": 0, "heartbeat_at": 0}
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._indexed = False
+
+    async def _ensure_index(self) -> None:
+        if not self._indexed:
+            await self.collection.create_index(
+                "active_key", unique=True, partialFilterExpression={"active_key": {"$exists": True}}
+            )
+            await self.collection.create_index([("created_at", DESCENDING)])
+            self._indexed = True
+
+    async def claim(self, doc: Dict[str, Any], stale_before: float) -> Tuple[Dict[str, Any], bool]:
+        """Insert `doc` as the active job for its key, or count a waiter on the one already active."""
+        await self._ensure_index()
+        await self.collection.update_many(
+            {"active_key": doc["active_key"], "heartbeat_at": {"$lt": stale_before}},
+            {"$set": {"status": "error", "error": JobQueueService.LOST_ERROR}, "$unset": {"active_key": ""}},
+        )
+        while True:
+            try:
+                await self.collection.insert_one({"_id": doc["id"], **doc})
+                return self._public(doc), True
+            except DuplicateKeyError:
+                existing = await self.collection.find_one_and_update(
+                    {"active_key": doc["active_key"]},
+                    {"$inc": {"waiters": 1}},
+                    projection=self._PROJECTION,
+                    return_document=ReturnDocument.AFTER,
+                )
+                if existing is not None:
+                    return existing, False
+                # it finished in between: try to insert again
+
+    async def save(self, doc: Dict[str, Any], finished: bool = False) -> None:
+        fields = {k: v for k, v in doc.items() if k not in ("waiters", "active_key")}
+        update: Dict[str, Any] = {"$set": fields}
+        if finished:
+            update["$unset"] = {"active_key": ""}
+        await self.collection.update_one({"_id": doc["id"]}, update)
+        if finished:
+            old = self.collection.find({"active_key": {"$exists": False}}, {"_id": 1}).sort("created_at", DESCENDING)
+            old_ids = [d["_id"] async for d in old.skip(JobQueueService.MAX_FINISHED)]
+            if old_ids:
+                await self.collection.delete_many({"_id": {"$in": old_ids}})
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": job_id}, self._PROJECTION)
+
+    async def list(self) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({}, self._PROJECTION).sort("created_at", DESCENDING)
+        return [doc async for doc in cursor.limit(JobQueueService.MAX_FINISHED)]
+
+    @classmethod
+    def _public(cls, doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in doc.items() if k not in cls._PROJECTION}
+
+
+class FileJobStore:
+    """
+    Single-host job store: one JSON file per job under JOB_DIR. claim() scans for an
+    active job with the same key under a guard file, so workers of one host share jobs
+    the same way instances share the Mongo store.
+    """
+
+    JOB_DIR = Path("data/jobs")
+
+    def __init__(self, job_dir: Optional[Path] = None):
+        self.job_dir = Path(job_dir or self.JOB_DIR)
+
+    def _path(self, job_id: str) -> Path:
+        return self.job_dir / f"{job_id}.json"
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write(self, doc: Dict[str, Any]) -> None:
+        path = self._path(doc["id"])
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(doc, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _docs(self) -> List[Dict[str, Any]]:
+        docs = [self._read(path) for path in self.job_dir.glob("*.json")]
+        return sorted((d for d in docs if d), key=lambda d: d.get("created_at") or "", reverse=True)
+
+    async def _guarded(self, fn: Callable[[], Any]) -> Any:
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        guard = self.job_dir / "jobs.guard"
+        while not try_guard(guard):
+            await asyncio.sleep(0.01)
+        try:
+            return fn()
+        finally:
+            guard.unlink(missing_ok=True)
+
+    async def claim(self, doc: Dict[str, Any], stale_before: float) -> Tuple[Dict[str, Any], bool]:
+        """Write `doc` as the active job for its key, or count a waiter on the one already active."""
+        def claim():
+            for existing in self._docs():
+                if existing.get("active_key") != doc["active_key"]:
+                    continue
+                if existing.get("heartbeat_at", 0) < stale_before:
+                    existing.update(status="error", error=JobQueueService.LOST_ERROR, active_key=None)
+                    self._write(existing)
+                    continue
+                existing["waiters"] = existing.get("waiters", 1) + 1
+                self._write(existing)
+                return self._public(existing), False
+            self._write(doc)
+            return self._public(doc), True
+        return await self._guarded(claim)
+
+    async def save(self, doc: Dict[str, Any], finished: bool = False) -> None:
+        def save():
+            current = self._read(self._path(doc["id"])) or {}
+            current.update({k: v for k, v in doc.items() if k != "waiters"})
+            if finished:
+                current["active_key"] = None
+            self._write(current)
+            if finished:
+                done = [d for d in self._docs() if not d.get("active_key")]
+                for old in done[JobQueueService.MAX_FINISHED:]:
+                    self._path(old["id"]).unlink(missing_ok=True)
+        await self._guarded(save)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._read(self._path(job_id))
+        return self._public(doc) if doc else None
+
+    async def list(self) -> List[Dict[str, Any]]:
+        return [self._public(doc) for doc in self._docs()[:JobQueueService.MAX_FINISHED]]
+
+    @staticmethod
+    def _public(doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in doc.items() if k not in ("active_key", "heartbeat_at")}
+
+
+def job_store(backend: str):
+    """Job store backend, chosen like the scheduler lease: "mongo" across instances, files on one host."""
+    if backend == "mongo":
+        return MongoJobStore(db["admin_jobs"])
+    return FileJobStore()
+
+
+class JobQueueService:
+    """
+    Background jobs for slow admin actions, shared by every worker and instance.
+
+    submit() returns immediately with the job's status; an identical request (same key)
+    while that job is still queued or running, from any process, is coalesced into it
+    instead of starting a second run. Job state lives in the job store (Mongo or files,
+    per SCHEDULER_LEASE_BACKEND), so any process can answer a status lookup. The
+    submitting process runs the job and writes its progress back every
+    HEARTBEAT_SECONDS; a job whose heartbeat stops for STALE_AFTER_SECONDS (its process
+    died) is marked failed and no longer blocks new submissions. Jobs sharing a `lane`
+    (e.g. the same league's fixtures file) run one at a time across processes, by
+    holding a lease for the lane. The last MAX_FINISHED finished jobs are kept.
+    """
+
+    MAX_FINISHED = 50
+    HEARTBEAT_SECONDS = 2.0
+    STALE_AFTER_SECONDS = 60.0
+    LANE_TTL_SECONDS = 60.0
+    LOST_ERROR = "job's worker stopped responding"
+
+    def __init__(self, store, leases):
+        self.store = store
+        self.leases = leases
+        self._running: Dict[str, Job] = {}  # jobs this process is running, by id
+        self._lanes: Dict[Hashable, asyncio.Lock] = {}
+
+    async def submit(
+        self,
+        name: str,
+        func: Callable[[Job], Awaitable[Any]],
+        key: Hashable,
+        params: Optional[Dict[str, Any]] = None,
+        lane: Optional[Hashable] = None,
+    ) -> Dict[str, Any]:
+        """Queue `func(job)` unless a job with the same key is already pending; returns that job's status either way."""
+        job = Job(name, key, params or {})
+        doc = {**job.to_dict(), "active_key": _digest(key), "heartbeat_at": time.time()}
+        doc, created = await self.store.claim(doc, stale_before=time.time() - self.STALE_AFTER_SECONDS)
+        if created:
+            self._running[job.id] = job
+            job._task = asyncio.create_task(self._run(job, func, lane if lane is not None else key))
+        return doc
+
+    async def _run(self, job: Job, func: Callable[[Job], Awaitable[Any]], lane: Hashable) -> None:
+        lane_lease = f"job-lane-{_digest(lane)}"
+        heartbeat = asyncio.create_task(self._heartbeat(job, lane_lease))
+        try:
+            async with self._lanes.setdefault(lane, asyncio.Lock()):
+                ttl = timedelta(seconds=self.LANE_TTL_SECONDS)
+                while not await self.leases.acquire(lane_lease, ttl):
+                    await asyncio.sleep(self.HEARTBEAT_SECONDS)
+                job.status = "running"
+                job.started_at = _now()
+                try:
+                    job.result = await func(job)
+                    job.status = "success"
+                except Exception as e:
+                    job.status = "error"
+                    job.error = str(e)
+                    logger.error(f"Job {job.name} {job.id} failed: {e}")
+                finally:
+                    await self.leases.release(lane_lease)
+        finally:
+            # Stop the heartbeat before the final save so a late heartbeat can't overwrite it
+            heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await heartbeat
+            job._close_stage()
+            job.finished_at = _now()
+            try:
+                await self.store.save(job.to_dict(), finished=True)
+            except Exception as e:
+                logger.error(f"Job {job.name} {job.id}: saving final status failed: {e}")
+            self._running.pop(job.id, None)
+
+    async def _heartbeat(self, job: Job, lane_lease: str) -> None:
+        """Publish progress and keep the lane lease while the job is queued or running."""
+        ttl = timedelta(seconds=self.LANE_TTL_SECONDS)
+        while True:
+            try:
+                await self.store.save({**job.to_dict(), "heartbeat_at": time.time()})
+                if job.status == "running":
+                    await self.leases.acquire(lane_lease, ttl)
+            except Exception as e:
+                logger.warning(f"Job {job.name} {job.id}: heartbeat failed: {e}")
+            await asyncio.sleep(self.HEARTBEAT_SECONDS)
+
+    def _live(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Stored status, with progress straight from the job if this process runs it."""
+        job = self._running.get(doc.get("id"))
+        if job is None:
+            return doc
+        return {**job.to_dict(), "waiters": doc.get("waiters", job.waiters)}
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        doc = await self.store.get(job_id)
+        return self._live(doc) if doc else None
+
+    async def list(self) -> List[Dict[str, Any]]:
+        """Recent jobs, newest first."""
+        return [self._live(doc) for doc in await self.store.list()]
+
+
+job_queue = JobQueueService(job_store(settings.SCHEDULER_LEASE_BACKEND), lease_service(settings.SCHEDULER_LEASE_BACKEND))
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from db.mongo_client import db
+
+
+def try_guard(guard: Path, stale_seconds: float = 10.0) -> bool:
+    """
+    One non-blocking attempt at an O_EXCL guard file (works the same on every OS);
+    a guard older than `stale_seconds` was left by a crashed process and is broken.
+    The caller unlinks the guard when done.
+    """
+    for _ in range(2):
+        try:
+            os.close(os.open(guard, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - guard.stat().st_mtime <= stale_seconds:
+                    return False
+                guard.unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass  # released between our open and stat: try once more
+    return False
+
+
+async def wait_for_guard(guard: Path, timeout: float = 2.0, stale_seconds: float = 10.0) -> bool:
+    """try_guard() until it succeeds or `timeout` passes, yielding to the event loop in between."""
+    deadline = time.monotonic() + timeout
+    while not try_guard(guard, stale_seconds):
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+def _owner_id() -> str:
+    """Unique per process: host, pid and a random suffix (pids get reused across restarts)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class MongoLeaseService:
+    """
+    Named leases stored as Mongo documents {_id: name, owner, expires_at}.
+
+    acquire() takes a free or expired lease, or renews one we already hold, in a single
+    atomic find_one_and_update; losing the upsert race to another process surfaces as a
+    DuplicateKeyError and means "not leader". A TTL index removes long-dead leases.
+    """
+
+    def __init__(self, collection, owner: Optional[str] = None):
+        self.collection = collection
+        self.owner = owner or _owner_id()
+        self._indexed = False
+
+    async def _ensure_index(self) -> None:
+        if not self._indexed:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+
+    async def acquire(self, name: str, ttl: timedelta) -> bool:
+        """Take or renew `name` for `ttl`. Returns True if this process now holds it."""
+        await self._ensure_index()
+        now = datetime.now(timezone.utc)
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": name, "$or": [{"owner": self.owner}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"owner": self.owner, "expires_at": now + ttl, "renewed_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            return False  # held by someone else and not expired
+        return bool(doc) and doc.get("owner") == self.owner
+
+    async def release(self, name: str) -> None:
+        await self.collection.delete_one({"_id": name, "owner": self.owner})
+
+    async def holder(self, name: str) -> Optional[Dict[str, Any]]:
+        doc = await self.collection.find_one({"_id": name})
+        if not doc:
+            return None
+        expires_at = doc["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at <= datetime.now(timezone.utc):
+            return None
+        return {"owner": doc["owner"], "expires_at": expires_at.isoformat()}
+
+
+class FileLeaseService:
+    """
+    Single-host leases: one JSON file per lease {owner, expires_at}.
+
+    Read-modify-write of a lease file is guarded by an O_EXCL guard file, which works
+    the same on every OS; a guard left behind by a crashed process is broken after
+    GUARD_STALE_SECONDS.
+    """
+
+    LEASE_DIR = Path("data/leases")
+    GUARD_STALE_SECONDS = 10.0
+
+    def __init__(self, lease_dir: Optional[Path] = None, owner: Optional[str] = None):
+        self.lease_dir = Path(lease_dir or self.LEASE_DIR)
+        self.owner = owner or _owner_id()
+
+    def _paths(self, name: str):
+        self.lease_dir.mkdir(parents=True, exist_ok=True)
+        return self.lease_dir / f"{name}.json", self.lease_dir / f"{name}.guard"
+
+    async def _lock(self, guard: Path, timeout: float = 2.0) -> bool:
+        return await wait_for_guard(guard, timeout, self.GUARD_STALE_SECONDS)
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    async def acquire(self, name: str, ttl: timedelta) -> bool:
+        """Take or renew `name` for `ttl`. Returns True if this process now holds it."""
+        path, guard = self._paths(name)
+        if not await self._lock(guard):
+            return False
+        try:
+            now = time.time()
+            lease = self._read(path)
+            if lease and lease.get("owner") != self.owner and lease.get("expires_at", 0) > now:
+                return False
+            tmp = path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps({"owner": self.owner, "expires_at": now + ttl.total_seconds()}), encoding="utf-8")
+            os.replace(tmp, path)
+            return True
+        finally:
+            guard.unlink(missing_ok=True)
+
+    async def release(self, name: str) -> None:
+        path, guard = self._paths(name)
+        if not await self._lock(guard):
+            return
+        try:
+            lease = self._read(path)
+            if lease and lease.get("owner") == self.owner:
+                path.unlink(missing_ok=True)
+        finally:
+            guard.unlink(missing_ok=True)
+
+    async def holder(self, name: str) -> Optional[Dict[str, Any]]:
+        lease = self._read(self._paths(name)[0])
+        if not lease or lease.get("expires_at", 0) <= time.time():
+            return None
+        return {
+            "owner": lease["owner"],
+            "expires_at": datetime.fromtimestamp(lease["expires_at"], tz=timezone.utc).isoformat(),
+        }
+
+
+def lease_service(backend: str):
+    """Lease backend: "mongo" for multi-instance deployments, anything else → single-host files."""
+    if backend == "mongo":
+        return MongoLeaseService(db["scheduler_leases"])
+    return FileLeaseService()
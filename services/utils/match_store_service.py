@@ -0,0 +1,390 @@
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from core.config import fixtures_path, table_path
+from services.utils.team_registry_service import team_registry
+from services.utils.table_store_service import table_store
+
+logger = logging.getLogger(__name__)
+
+
+class MatchStoreService:
+    """
+    Canonical cross-source match table.
+
+    Every match is keyed by an internal id "<league>:<season>:<home_id>:<away_id>" built
+    from canonical team ids (each pairing happens once per league season), and holds the
+    FBref, FotMob and WhoScored ids, scores and statuses side by side. Sources push their
+    fixture lists through update_source(); only that source's slice of each record is
+    replaced and only touched matches are re-indexed, so an update costs O(changed).
+    Indexes: round, team, source id, and a kickoff-sorted list for range queries.
+    """
+
+    STORE_DIR = Path("data/matches")
+    SOURCES = ("fbref", "fotmob", "whoscored")
+    # Which source wins when several know the value (first match wins)
+    KICKOFF_PRECEDENCE = ("whoscored", "fotmob", "fbref")
+    SCORE_PRECEDENCE = ("fbref", "whoscored", "fotmob")
+    ROUND_PRECEDENCE = ("fbref", "fotmob")
+
+    FBREF_TZ = ZoneInfo("Europe/London")  # FBref schedule times are local kickoff times
+    FOTMOB_FINISHED = {"finished", "ft", "fulltime", "full-time", "aet", "ap", "pen", "after pen."}
+    WHOSCORED_FINISHED = {6}
+
+    _instances: Dict[Tuple[str, str], "MatchStoreService"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, league: str, season: str, store_dir: Optional[Path] = None):
+        self.league = league
+        self.season = str(season)
+        self.store_file = Path(store_dir or self.STORE_DIR) / f"{league}_{self.season}.json"
+        self._lock = threading.RLock()
+        self._matches: Dict[str, Dict[str, Any]] = {}
+        self._by_round: Dict[int, Set[str]] = {}
+        self._by_team: Dict[str, Set[str]] = {}
+        self._by_source_id: Dict[Tuple[str, str], str] = {}
+        self._by_kickoff: List[Tuple[str, str]] = []  # sorted (kickoff ISO UTC, match_id)
+        self._listeners: List[Callable[[List[str]], None]] = []
+        self.updated_at: Optional[str] = None
+        self._mtime: Optional[float] = None
+
+        if not self._load():
+            self.rebuild_from_files()
+
+    @classmethod
+    def for_league(cls, league: str, season: Any) -> "MatchStoreService":
+        """Shared store per (league, season), so every service and route sees one table."""
+        key = (league, str(season))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(league, str(season))
+            return cls._instances[key]
+
+    def match_id(self, home_id: str, away_id: str) -> str:
+        return f"{self.league}:{self.season}:{home_id}:{away_id}"
+
+    # ------------------------
+    # Source normalizers → (home, away, slice)
+    # ------------------------
+    @staticmethod
+    def _iso(ts: Any) -> Optional[str]:
+        if ts is None or ts == "" or ts == 0:
+            return None
+        try:
+            t = pd.Timestamp(ts)
+        except (ValueError, TypeError):
+            return None
+        if pd.isna(t):
+            return None
+        t = t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")
+        return t.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    @staticmethod
+    def _int_or_none(v: Any) -> Optional[int]:
+        try:
+            return None if v is None or pd.isna(v) else int(v)
+        except (ValueError, TypeError):
+            return None
+
+    def _from_fbref(self, f: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+        kickoff = None
+        if f.get("date") and f.get("time"):
+            try:
+                local = datetime.strptime(f"{f['date']} {f['time']}", "%Y-%m-%d %H:%M").replace(tzinfo=self.FBREF_TZ)
+                kickoff = self._iso(local)
+            except ValueError:
+                kickoff = None
+        # Scores look like "4–2" (en dash); empty / 0 when not played yet
+        m = re.match(r"^\s*(\d+)\s*[–-]\s*(\d+)", str(f.get("score") or ""))
+        home_score, away_score = (int(m.group(1)), int(m.group(2))) if m else (None, None)
+        return f.get("home_team"), f.get("away_team"), {
+            "id": f.get("game_id") or None,
+            "round": self._int_or_none(f.get("week")),
+            "kickoff": kickoff,
+            "home_score": home_score,
+            "away_score": away_score,
+            "status": "finished" if m else "scheduled",
+        }
+
+    def _from_fotmob(self, f: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+        status = f.get("status")
+        finished = str(status).strip().lower() in self.FOTMOB_FINISHED
+        return f.get("home_team"), f.get("away_team"), {
+            "id": str(f["game_id"]) if f.get("game_id") else None,
+            "round": self._int_or_none(f.get("round")),
+            "kickoff": self._iso(f.get("date")),
+            # FotMob fills unplayed scores with 0, so only trust them once finished
+            "home_score": self._int_or_none(f.get("home_score")) if finished else None,
+            "away_score": self._int_or_none(f.get("away_score")) if finished else None,
+            "status": "finished" if finished else status,
+        }
+
+    def _from_whoscored(self, f: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+        home_score, away_score = self._int_or_none(f.get("home_score")), self._int_or_none(f.get("away_score"))
+        finished = self._int_or_none(f.get("status")) in self.WHOSCORED_FINISHED
+        return f.get("home_team"), f.get("away_team"), {
+            "id": str(int(f["game_id"])) if self._int_or_none(f.get("game_id")) is not None else None,
+            "round": None,
+            "kickoff": self._iso(f.get("date")),
+            "home_score": home_score if finished else None,
+            "away_score": away_score if finished else None,
+            "status": "finished" if finished else f.get("status"),
+        }
+
+    # ------------------------
+    # Incremental updates
+    # ------------------------
+    def update_source(self, source: str, fixtures: Iterable[Dict[str, Any]], save: bool = True) -> List[str]:
+        """
+        Merge one source's fixture list into the table. Returns the ids of matches whose
+        record changed; only those are re-indexed (and passed to listeners).
+        """
+        if source not in self.SOURCES:
+            raise ValueError(f"Unknown match source '{source}'")
+        normalize = getattr(self, f"_from_{source}")
+
+        changed: List[str] = []
+        skipped = 0
+        with self._lock:
+            for f in fixtures:
+                home, away, data = normalize(f)
+                home_id, away_id = team_registry.resolve(home), team_registry.resolve(away)
+                if not (home_id and away_id):
+                    skipped += 1
+                    continue
+                mid = self.match_id(home_id, away_id)
+                old = self._matches.get(mid)
+                if old is not None and old["sources"].get(source) == data:
+                    continue
+                record = {
+                    "match_id": mid,
+                    "league": self.league,
+                    "season": self.season,
+                    "home_team_id": home_id,
+                    "away_team_id": away_id,
+                    "sources": {**(old["sources"] if old else {}), source: data},
+                }
+                self._merge(record)
+                self._reindex(old, record)
+                self._matches[mid] = record
+                changed.append(mid)
+
+            if changed:
+                self.updated_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+                if save:
+                    self._save()
+
+        if skipped:
+            logger.warning(f"MatchStore: skipped {skipped} {source} fixtures with unknown teams")
+        logger.info(f"MatchStore: {source} update changed {len(changed)} matches ({self.league} {self.season})")
+        if changed:
+            self._notify(changed)
+        return changed
+
+    def _merge(self, record: Dict[str, Any]) -> None:
+        """Fill the pre-joined top-level fields from the per-source slices."""
+        sources = record["sources"]
+
+        def first(field: str, order: Tuple[str, ...], only_finished: bool = False) -> Any:
+            for s in order:
+                d = sources.get(s)
+                if d and d.get(field) is not None and (not only_finished or d.get("status") == "finished"):
+                    return d[field]
+            return None
+
+        finished = any(d.get("status") == "finished" for d in sources.values())
+        record.update({
+            "home_team": team_registry.name(record["home_team_id"]),
+            "away_team": team_registry.name(record["away_team_id"]),
+            "round": first("round", self.ROUND_PRECEDENCE),
+            "kickoff": first("kickoff", self.KICKOFF_PRECEDENCE),
+            "status": "finished" if finished else "scheduled",
+            "home_score": first("home_score", self.SCORE_PRECEDENCE, only_finished=True),
+            "away_score": first("away_score", self.SCORE_PRECEDENCE, only_finished=True),
+            "ids": {s: d.get("id") for s, d in sources.items()},
+        })
+
+    def _reindex(self, old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> None:
+        mid = new["match_id"]
+        if old is not None:
+            if old.get("round") is not None:
+                self._by_round.get(old["round"], set()).discard(mid)
+            for tid in (old["home_team_id"], old["away_team_id"]):
+                self._by_team.get(tid, set()).discard(mid)
+            for s, sid in old.get("ids", {}).items():
+                if sid is not None and self._by_source_id.get((s, sid)) == mid:
+                    del self._by_source_id[(s, sid)]
+            if old.get("kickoff"):
+                i = bisect.bisect_left(self._by_kickoff, (old["kickoff"], mid))
+                if i < len(self._by_kickoff) and self._by_kickoff[i] == (old["kickoff"], mid):
+                    del self._by_kickoff[i]
+
+        if new.get("round") is not None:
+            self._by_round.setdefault(new["round"], set()).add(mid)
+        for tid in (new["home_team_id"], new["away_team_id"]):
+            self._by_team.setdefault(tid, set()).add(mid)
+        for s, sid in new.get("ids", {}).items():
+            if sid is not None:
+                self._by_source_id[(s, sid)] = mid
+        if new.get("kickoff"):
+            bisect.insort(self._by_kickoff, (new["kickoff"], mid))
+
+    def rebuild_from_files(self) -> int:
+        """Seed the table from whichever source files exist on disk (Parquet tables first, then JSON)."""
+        paths = {source: fixtures_path(source, self.league, self.season) for source in self.SOURCES}
+        changed = 0
+        for source, path in paths.items():
+            if source == "fbref":
+                # FBref fixtures live in a split per-week layout (see FBrefFixtureStore)
+                from services.fbref.fbref_fixture_store_service import FBrefFixtureStore
+
+                fixtures = FBrefFixtureStore.for_league(self.league, self.season).read_all()
+                changed += len(self.update_source(source, fixtures, save=False))
+                continue
+            table = table_path(source, "fixtures", self.league, self.season)
+            if table.exists():
+                try:
+                    fixtures = table_store.to_records(table_store.read(table))
+                except Exception as e:
+                    logger.warning(f"MatchStore: unreadable {source} fixtures {table}: {e}")
+                    continue
+                changed += len(self.update_source(source, fixtures, save=False))
+                continue
+            if not path.exists():
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    fixtures = json.load(f).get("fixtures", [])
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"MatchStore: unreadable {source} fixtures {path}: {e}")
+                continue
+            changed += len(self.update_source(source, fixtures, save=False))
+        if changed:
+            self._save()
+        return changed
+
+    # ------------------------
+    # Listeners
+    # ------------------------
+    def add_listener(self, callback: Callable[[List[str]], None]) -> None:
+        """Called with the changed match ids after every update that changed something."""
+        self._listeners.append(callback)
+
+    def _notify(self, changed: List[str]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(changed)
+            except Exception as e:
+                logger.error(f"MatchStore listener {callback} failed: {e}")
+
+    # ------------------------
+    # Persistence
+    # ------------------------
+    def _save(self) -> None:
+        payload = {
+            "meta": {"league": self.league, "season": self.season, "last_updated": self.updated_at},
+            "matches": sorted(self._matches.values(), key=lambda m: (m.get("kickoff") or "", m["match_id"])),
+        }
+        try:
+            self.store_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.store_file.with_suffix(".json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp, self.store_file)
+            self._mtime = self.store_file.stat().st_mtime
+        except OSError as e:
+            logger.error(f"MatchStore: saving {self.store_file} failed: {e}")
+
+    def _load(self) -> bool:
+        if not self.store_file.exists():
+            return False
+        try:
+            with open(self.store_file, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"MatchStore: ignoring unreadable {self.store_file}: {e}")
+            return False
+        with self._lock:
+            self._matches, self._by_round, self._by_team = {}, {}, {}
+            self._by_source_id, self._by_kickoff = {}, []
+            for record in payload.get("matches", []):
+                self._matches[record["match_id"]] = record
+                self._reindex(None, record)
+            self.updated_at = payload.get("meta", {}).get("last_updated")
+            self._mtime = self.store_file.stat().st_mtime
+        return bool(self._matches)
+
+    def version(self) -> Optional[float]:
+        """Changes whenever the table is saved (here or by another process)."""
+        try:
+            return self.store_file.stat().st_mtime
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """Pick up a table written by another process (e.g. the scheduling leader)."""
+        try:
+            mtime = self.store_file.stat().st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        return self._load()
+
+    # ------------------------
+    # Queries
+    # ------------------------
+    def _sorted(self, ids: Iterable[str]) -> List[Dict[str, Any]]:
+        return sorted((self._matches[i] for i in ids), key=lambda m: (m.get("kickoff") or "", m["match_id"]))
+
+    def all(self) -> List[Dict[str, Any]]:
+        return [self._matches[mid] for _, mid in self._by_kickoff] + [
+            m for m in self._matches.values() if not m.get("kickoff")
+        ]
+
+    def get(self, match_id: str) -> Optional[Dict[str, Any]]:
+        return self._matches.get(match_id)
+
+    def find(self, home_team: str, away_team: str) -> Optional[Dict[str, Any]]:
+        """Match by any spelling of its two teams."""
+        home_id, away_id = team_registry.resolve(home_team), team_registry.resolve(away_team)
+        return self._matches.get(self.match_id(home_id, away_id)) if home_id and away_id else None
+
+    def get_by_source_id(self, source: str, source_id: Any) -> Optional[Dict[str, Any]]:
+        mid = self._by_source_id.get((source, str(source_id)))
+        return self._matches.get(mid) if mid else None
+
+    def rounds(self) -> List[int]:
+        return sorted(r for r, ids in self._by_round.items() if ids)
+
+    def by_round(self, round_number: int) -> List[Dict[str, Any]]:
+        return self._sorted(self._by_round.get(round_number, ()))
+
+    def by_team(self, team: str) -> List[Dict[str, Any]]:
+        """Matches for a team given a canonical id or any known spelling."""
+        team_id = team if team in self._by_team else team_registry.resolve(team)
+        return self._sorted(self._by_team.get(team_id, ())) if team_id else []
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Matches kicking off in [start, end) via bisect on the kickoff index."""
+        lo = bisect.bisect_left(self._by_kickoff, (self._iso(start), "")) if start else 0
+        hi = bisect.bisect_left(self._by_kickoff, (self._iso(end), "")) if end else len(self._by_kickoff)
+        return [self._matches[mid] for _, mid in self._by_kickoff[lo:hi]]
+
+    def next_round(self, now: Optional[datetime] = None) -> Optional[int]:
+        """Round of the next match to kick off, or the last round once the season is over."""
+        for match in self.between(now or datetime.now(timezone.utc)):
+            if match.get("round") is not None:
+                return match["round"]
+        rounds = self.rounds()
+        return rounds[-1] if rounds else None
@@ -1,21 +1,25 @@
-from typing import Dict, List, Optional
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 from bson import ObjectId
 from db.mongo_client import collection, fix_id
+from models.user.leaderboard import LeaderboardSnapshot, UserLeaderboardStats
 from models.user.points import MatchPoints, Points, SeasonPoints
-from models.user.register_models import MatchPrediction
-from models.fotmob.fixture import FotMobFixture
-from services.fotmob.fotmob_json_service import FotMobJSONService
+from core.config import settings
+from services.utils.artifact_store_service import artifact_store
+from services.utils.match_store_service import MatchStoreService
 from services.users.update.user_service import UserUpdateService
 
 
 class PointsResolverService:
-    def __init__(self):
-        self.fixtures: List[FotMobFixture] = self._load_fixtures()
+    def __init__(self, league: Optional[str] = None, season: Optional[str] = None):
+        self.match_store = MatchStoreService.for_league(league or settings.DEFAULT_LEAGUE, season or settings.SEASON)
 
-    def _load_fixtures(self) -> List[FotMobFixture]:
-        fotmob_service = FotMobJSONService()
-        return fotmob_service._load_fixtures()
+    @staticmethod
+    def prediction_key(match: dict) -> str:
+        """Predictions are keyed by FotMob game_id (FBref id, then match id, if FotMob hasn't listed it)."""
+        ids = match.get("ids", {})
+        return ids.get("fotmob") or ids.get("fbref") or match["match_id"]
 
     @staticmethod
     def calculate_points(
@@ -44,58 +48,79 @@ class PointsResolverService:
 
         return 0
 
+    @staticmethod
+    def _round_predictions(user_doc: dict, round_number: int) -> Dict[str, dict]:
+        """game_id → prediction for one round, as stored by add_prediction (predictions.<round>.matches)."""
+        predictions = user_doc.get("predictions") or {}
+        round_preds = predictions.get(str(round_number)) or predictions.get(round_number) or {}
+        matches = round_preds.get("matches", []) if isinstance(round_preds, dict) else []
+        return {str(p.get("game_id")): p for p in matches if isinstance(p, dict)}
+
+    def _round_points(self, user_doc: dict, round_number: int, matches: List[dict]) -> List[MatchPoints]:
+        preds = self._round_predictions(user_doc, round_number)
+        round_points_list: List[MatchPoints] = []
+        for fixture in matches:
+            key = self.prediction_key(fixture)
+            user_pred = preds.get(key)
+
+            # Scores are only set once a source reports the match finished
+            actual_home = fixture.get("home_score")
+            actual_away = fixture.get("away_score")
+
+            pred_home = user_pred.get("home_score") if user_pred else None
+            pred_away = user_pred.get("away_score") if user_pred else None
+
+            points = self.calculate_points(actual_home, actual_away, pred_home, pred_away)
+            round_points_list.append(MatchPoints(game_id=key, points=points))
+        return round_points_list
+
+    def _last_finished_round(self) -> Optional[int]:
+        finished = [r for r in self.match_store.rounds() if any(m.get("status") == "finished" for m in self.match_store.by_round(r))]
+        return max(finished) if finished else None
+
     async def resolve_and_save_all_users(self):
         """
         Loads all users from MongoDB, calculates points for each match,
         aggregates total, last round, and season points, then saves back.
         """
+        await self.resolve_rounds(self.match_store.rounds(), full=True)
+
+    async def resolve_rounds(self, rounds: Iterable[int], full: bool = False) -> int:
+        """
+        Recalculate only `rounds` for every user, keeping their stored points for the
+        other rounds (full=True discards those), then re-aggregate totals and save.
+        Returns the number of users updated.
+        """
+        rounds = sorted(set(rounds))
+        # Pre-joined matches per round, straight from the match store's round index
+        fixtures_by_round: Dict[int, List[dict]] = {r: self.match_store.by_round(r) for r in rounds}
+        last_round = self._last_finished_round()
+
         users_cursor = collection.find({})
         users = [fix_id(u) async for u in users_cursor]
-
-        # Group fixtures by round
-        fixtures_by_round: Dict[int, List[FotMobFixture]] = {}
-        for f in self.fixtures:
-            fixtures_by_round.setdefault(f.round, []).append(f)
+        standings: List[Tuple[dict, Dict[str, List[MatchPoints]]]] = []
 
         for user_doc in users:
             user_id = str(user_doc["id"])
-            user_predictions: Dict[int, Dict[str, MatchPrediction]] = user_doc.get("predictions", {})
+            stored = (user_doc.get("points") or {})
 
             matches_points: Dict[str, List[MatchPoints]] = {}
-            total_points = 0
-            last_round_points = 0
-
-            # Process rounds in order
-            for round_number in sorted(fixtures_by_round.keys()):
-                round_fixtures = fixtures_by_round[round_number]
-                round_points_list: List[MatchPoints] = []
-
-                for fixture in round_fixtures:
-                    user_pred: Optional[MatchPrediction] = None
-                    if user_predictions.get(round_number):
-                        key = fixture.game_id
-                        user_pred = user_predictions[round_number].get(key)
-
-                    actual_home = int(fixture.home_score) if fixture.home_score is not None else None
-                    actual_away = int(fixture.away_score) if fixture.away_score is not None else None
+            if not full:
+                for r, items in (stored.get("matches") or {}).items():
+                    matches_points[str(r)] = [MatchPoints(**mp) for mp in items]
+            for round_number, round_fixtures in fixtures_by_round.items():
+                matches_points[str(round_number)] = self._round_points(user_doc, round_number, round_fixtures)
 
-                    pred_home = user_pred.home_score if user_pred else None
-                    pred_away = user_pred.away_score if user_pred else None
-
-                    points = self.calculate_points(actual_home, actual_away, pred_home, pred_away)
-
-                    round_points_list.append(MatchPoints(game_id=fixture.game_id, points=points))
-                    total_points += points
-
-                matches_points[str(round_number)] = round_points_list
-                last_round_points = sum(mp.points for mp in round_points_list)
+            total_points = sum(mp.points for items in matches_points.values() for mp in items)
+            last_round_points = sum(mp.points for mp in matches_points.get(str(last_round), [])) if last_round else 0
 
             # Build season points from user_doc
+            stored_season = stored.get("season_points") or {}
             season_points = SeasonPoints(
-                top_scorer=user_doc.get("points", {}).get("season_points", {}).get("top_scorer", 0),
-                assist_king=user_doc.get("points", {}).get("season_points", {}).get("assist_king", 0),
-                league_champion=user_doc.get("points", {}).get("season_points", {}).get("league_champion"),
-                relegated_teams=user_doc.get("points", {}).get("season_points", {}).get("relegated_teams"),
+                top_scorer=stored_season.get("top_scorer", 0),
+                assist_king=stored_season.get("assist_king", 0),
+                league_champion=stored_season.get("league_champion"),
+                relegated_teams=stored_season.get("relegated_teams"),
             )
 
             # Build final Points object
@@ -108,3 +133,74 @@ class PointsResolverService:
 
             # Save back
             await UserUpdateService.update_points(user_id, user_points)
+            standings.append((user_doc, matches_points))
+
+        print(f"✅ Points resolved for rounds {rounds} ({len(users)} users)")
+        await self.publish_leaderboards(standings)
+        return len(users)
+
+    # -------------------------
+    # LEADERBOARDS
+    # -------------------------
+    def leaderboard_artifact(self, round_number: Optional[int] = None) -> str:
+        """Artifact name of one round's pre-rendered leaderboard (the latest round if None)."""
+        key = "latest" if round_number is None else str(round_number)
+        return f"leaderboard/{self.match_store.league}_{self.match_store.season}/{key}"
+
+    @staticmethod
+    def leaderboards(standings: List[Tuple[dict, Dict[str, List[MatchPoints]]]]) -> List[LeaderboardSnapshot]:
+        """
+        Standings after every round with points: cumulative totals, exact scores (3 pts)
+        and correct results (any points). Equal totals and exact counts share a position;
+        deltaPosition is the move since the previous round (positive = up).
+        """
+        rounds = sorted({int(r) for _, matches_points in standings for r in matches_points if str(r).isdigit()})
+        totals: Dict[str, List[int]] = {}
+        previous: Dict[str, int] = {}
+        snapshots: List[LeaderboardSnapshot] = []
+        for round_number in rounds:
+            rows: List[UserLeaderboardStats] = []
+            for user_doc, matches_points in standings:
+                user_id = str(user_doc["id"])
+                total = totals.setdefault(user_id, [0, 0, 0])
+                for mp in matches_points.get(str(round_number), []):
+                    total[0] += mp.points
+                    total[1] += mp.points == 3
+                    total[2] += mp.points > 0
+                rows.append(UserLeaderboardStats(
+                    user_id=user_id,
+                    name=user_doc.get("name"),
+                    team_name=user_doc.get("team_name"),
+                    totalPoints=total[0],
+                    exactPredictions=total[1],
+                    correctPredictions=total[2],
+                ))
+            rows.sort(key=lambda u: (-u.totalPoints, -u.exactPredictions, (u.name or "").lower()))
+            for i, row in enumerate(rows):
+                prev = rows[i - 1] if i else None
+                tied = prev is not None and (prev.totalPoints, prev.exactPredictions) == (row.totalPoints, row.exactPredictions)
+                row.position = prev.position if tied else i + 1
+                row.deltaPosition = previous[row.user_id] - row.position if row.user_id in previous else None
+            previous = {row.user_id: row.position for row in rows}
+            snapshots.append(LeaderboardSnapshot(round_number=round_number, snapshot=rows))
+        return snapshots
+
+    async def publish_leaderboards(self, standings: Optional[List[Tuple[dict, Dict[str, List[MatchPoints]]]]] = None) -> int:
+        """
+        Pre-render every round's leaderboard (and "latest") for the API. Without
+        `standings`, the points already stored on the users are used.
+        Returns the number of artifacts whose content changed.
+        """
+        if standings is None:
+            standings = []
+            async for user_doc in collection.find({}):
+                user_doc = fix_id(user_doc)
+                stored = (user_doc.get("points") or {}).get("matches") or {}
+                standings.append((user_doc, {str(r): [MatchPoints(**mp) for mp in items] for r, items in stored.items()}))
+
+        snapshots = self.leaderboards(standings)
+        artifacts = [(self.leaderboard_artifact(s.round_number), s.model_dump()) for s in snapshots]
+        if snapshots:
+            artifacts.append((self.leaderboard_artifact(), snapshots[-1].model_dump()))
+        # Compressing and writing files: keep it off the event loop
+        return await asyncio.to_thread(lambda: sum(artifact_store.publish(name, payload) for name, payload in artifacts))
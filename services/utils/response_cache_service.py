@@ -0,0 +1,183 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from services.utils.serialization_service import serializer
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+class ResponseCacheService:
+    """
+    Conditional, compressed JSON responses for endpoints whose payload follows a known
+    data version (a file mtime, meta.last_updated, a bootstrap fetch time, ...).
+
+    respond(request, version, body) derives a strong ETag from the version and answers
+    If-None-Match with 304 before `body` is called, so a repeat poll costs a header
+    compare. Otherwise the payload is encoded once with orjson, compressed with the best
+    encoding the client accepts (br, then gzip) and kept per (ETag, encoding) until it
+    falls out of a byte-bounded LRU; every later request for that version is served
+    from memory. Each encoding gets its own ETag ("<tag>-gzip") as strong validators
+    must, and If-None-Match matches any encoding of the same version.
+    """
+
+    MIN_COMPRESS_SIZE = 1024  # smaller bodies go out as they are
+    MAX_CACHE_BYTES = 64 * 1024 * 1024
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5
+    CACHE_CONTROL = "no-cache"  # clients may keep a copy but must revalidate it
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._cache_bytes = 0
+
+    # ------------------------
+    # Validators
+    # ------------------------
+    @staticmethod
+    def etag(*parts: Any) -> str:
+        """Strong ETag for a data version given as any number of parts (path, mtime, filters, ...)."""
+        digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:32]
+        return f'"{digest}"'
+
+    @staticmethod
+    def _base_tag(tag: str) -> str:
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        for suffix in ("-gzip", "-br"):
+            if tag.endswith(suffix):
+                return tag[: -len(suffix)]
+        return tag
+
+    def matches(self, request: Request, etag: str) -> bool:
+        """True if the client's If-None-Match already names this version (in any encoding)."""
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        if header.strip() == "*":
+            return True
+        base = self._base_tag(etag)
+        return any(self._base_tag(tag) == base for tag in header.split(","))
+
+    # ------------------------
+    # Encoding
+    # ------------------------
+    @staticmethod
+    def negotiate(accept_encoding: Optional[str]) -> str:
+        """"br", "gzip" or "identity", by the client's Accept-Encoding (q=0 excludes)."""
+        prefs: Dict[str, float] = {}
+        for part in (accept_encoding or "").split(","):
+            token, _, params = part.strip().partition(";")
+            if not token:
+                continue
+            q = 1.0
+            for param in params.split(";"):
+                name, _, value = param.strip().partition("=")
+                if name.strip().lower() == "q":
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            prefs[token.strip().lower()] = q
+        for encoding in (("br", "gzip") if brotli is not None else ("gzip",)):
+            if prefs.get(encoding, prefs.get("*", 0.0)) > 0:
+                return encoding
+        return "identity"
+
+    def _compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=self.BROTLI_QUALITY)
+        if encoding == "gzip":
+            return gzip.compress(data, compresslevel=self.GZIP_LEVEL, mtime=0)
+        return data
+
+    # ------------------------
+    # Cache
+    # ------------------------
+    def _get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+            return data
+
+    def _put(self, key: Tuple[str, str], data: bytes) -> None:
+        if len(data) > self.MAX_CACHE_BYTES // 4:
+            return  # one oversized payload shouldn't evict everything else
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self._cache_bytes -= len(old)
+            self._cache[key] = data
+            self._cache_bytes += len(data)
+            while self._cache_bytes > self.MAX_CACHE_BYTES and self._cache:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    # ------------------------
+    # Responses
+    # ------------------------
+    def headers(self, etag: str, encoding: str) -> Dict[str, str]:
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": self.CACHE_CONTROL}
+        if encoding != "identity":
+            headers["ETag"] = f'"{self._base_tag(etag)}-{encoding}"'
+            headers["Content-Encoding"] = encoding
+        return headers
+
+    def respond(
+        self,
+        request: Request,
+        version: Any,
+        body: Union[bytes, Callable[[], Any], Any],
+    ) -> Response:
+        """
+        304 / cached / freshly encoded response for `body` at `version`.
+        `body` is bytes, a JSON-able value, or a callable producing either; a callable is
+        only called on a cache miss. A None version means "unknown": the ETag is then the
+        content hash, so 304s still work but the body is built every time.
+        """
+        if version is None:
+            body = body() if callable(body) else body
+            data = body if isinstance(body, bytes) else serializer.dumps(body)
+            etag = f'"{hashlib.sha1(data).hexdigest()[:32]}"'
+        else:
+            etag, data = self.etag(version), None
+
+        encoding = self.negotiate(request.headers.get("accept-encoding"))
+        if self.matches(request, etag):
+            return Response(status_code=304, headers=self.headers(etag, encoding))
+
+        key = (self._base_tag(etag), encoding)
+        payload = self._get(key)
+        if payload is None:
+            if data is None:
+                data = self._get((key[0], "identity"))
+            if data is None:
+                body = body() if callable(body) else body
+                data = body if isinstance(body, bytes) else serializer.dumps(body)
+                self._put((key[0], "identity"), data)
+            if len(data) < self.MIN_COMPRESS_SIZE:
+                encoding, payload = "identity", data
+            else:
+                payload = self._compress(data, encoding)
+                self._put(key, payload)
+        return Response(content=payload, media_type="application/json", headers=self.headers(etag, encoding))
+
+
+response_cache = ResponseCacheService()
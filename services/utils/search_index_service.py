@@ -0,0 +1,95 @@
+import bisect
+import difflib
+import heapq
+import re
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Letters NFKD doesn't decompose into ASCII (Ødegaard, Højlund, ...)
+_FOLD = str.maketrans({"ø": "o", "Ø": "O", "æ": "ae", "Æ": "AE", "ß": "ss", "ł": "l", "Ł": "L", "đ": "d", "Đ": "D"})
+
+
+def fold(text: Any) -> str:
+    """Accent-fold and lowercase; any punctuation separates words ("Smith-Rowe" → "smith rowe")."""
+    text = unicodedata.normalize("NFKD", str(text).translate(_FOLD)).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", " ", text.casefold()).strip()
+
+
+class PrefixSearchIndex:
+    """
+    Type-ahead search over a fixed list of items (players, teams).
+
+    Every word of an item's name, and the whole name, goes into one sorted array of
+    (key, item index); a query is folded the same way and answered with two bisects per
+    word, so cost depends on the number of hits, not the list size. Multi-word queries
+    must prefix-match every word ("b fern" → Bruno Fernandes). Hits are ranked by the
+    caller's relevance score (higher first), whole-name prefix matches first. If nothing
+    matches, words fall back to their closest known words (difflib), so typos like
+    "haalnd" still find someone.
+    """
+
+    FUZZY_CUTOFF = 0.75
+
+    def __init__(self, items: Sequence[Dict[str, Any]], name: Callable[[Dict[str, Any]], str],
+                 score: Callable[[Dict[str, Any]], float] = lambda item: 0.0):
+        self.items = list(items)
+        self.names = [fold(name(item)) for item in self.items]
+        self.scores = [score(item) or 0.0 for item in self.items]
+
+        entries: List[Tuple[str, int]] = []
+        for i, folded in enumerate(self.names):
+            words = folded.split()
+            entries.extend((word, i) for word in set(words))
+            if len(words) > 1:
+                entries.append((folded, i))
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._ids = [i for _, i in entries]
+        self._words = sorted(set(self._keys))
+
+    def _prefix(self, prefix: str) -> set:
+        lo = bisect.bisect_left(self._keys, prefix)
+        hi = bisect.bisect_left(self._keys, prefix + "\x7f", lo)
+        return set(self._ids[lo:hi])
+
+    def _match(self, words: List[str]) -> set:
+        hits: Optional[set] = None
+        for word in words:
+            found = self._prefix(word)
+            hits = found if hits is None else hits & found
+            if not hits:
+                return set()
+        return hits or set()
+
+    def _fuzzy(self, words: List[str]) -> set:
+        hits: Optional[set] = None
+        for word in words:
+            close = difflib.get_close_matches(word, self._words, n=5, cutoff=self.FUZZY_CUTOFF)
+            found = set().union(*(self._prefix(c) for c in close)) if close else set()
+            hits = found if hits is None else hits & found
+            if not hits:
+                return set()
+        return hits or set()
+
+    def match_all(self, query: str, fuzzy: bool = False) -> List[Dict[str, Any]]:
+        """Every item whose words prefix-match all query words (closest words if `fuzzy` and none do), unranked."""
+        words = fold(query).split()
+        if not words:
+            return []
+        hits = self._match(words) or (self._fuzzy(words) if fuzzy else set())
+        return [self.items[i] for i in sorted(hits)]
+
+    def search(self, query: str, limit: int = 10,
+               where: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        """Top `limit` items matching `query`, best first; `where` filters items (e.g. by team)."""
+        folded = fold(query)
+        words = folded.split()
+        if not words:
+            return []
+        hits = self._match(words) or self._fuzzy(words)
+        if where is not None:
+            hits = {i for i in hits if where(self.items[i])}
+        best = heapq.nlargest(
+            limit, hits, key=lambda i: (self.names[i].startswith(folded), self.scores[i], -len(self.names[i]))
+        )
+        return [self.items[i] for i in best]
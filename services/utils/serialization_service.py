@@ -0,0 +1,119 @@
+import json
+import math
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback: same output, just slower
+    orjson = None
+
+
+class SerializationService:
+    """
+    DataFrame → JSON for every scraper, column-at-a-time instead of row-at-a-time.
+
+    frame_records() turns list values into JSON strings and spreads dict values into
+    "<col>_<key>" entries (what the per-service flatten_dict helpers used to do per
+    row), keeping each row's own sub-keys and values as they were; records() converts
+    datetime columns, NaN / NaT and NumPy scalars to plain Python values; dumps()
+    encodes straight to bytes with orjson, which also understands NumPy and datetime
+    values left in hand-built payloads (the stdlib fallback gives the same JSON).
+    """
+
+    @staticmethod
+    def _encode_lists(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+        """List values → JSON strings, column-wise; also returns the columns holding dicts."""
+        out, dict_cols = {}, []
+        for col in df.columns:
+            values = df[col]
+            if values.dtype == object:
+                is_list = values.map(lambda v: isinstance(v, list))
+                if is_list.any():
+                    values = values.where(~is_list, values[is_list].map(lambda v: json.dumps(v, ensure_ascii=False)))
+                if values.map(lambda v: isinstance(v, dict)).any():
+                    dict_cols.append(col)
+            out[col] = values
+        return pd.DataFrame(out, index=df.index), dict_cols
+
+    @staticmethod
+    def records(df: pd.DataFrame, iso_dates: bool = False) -> List[Dict[str, Any]]:
+        """
+        JSON-ready row dicts. Datetime columns become strings: str(Timestamp) by default
+        (the format the stored files already use), ISO-8601 with `iso_dates`; NaN / NaT → None.
+        """
+        out = df.copy()
+        for col in out.select_dtypes(include=["datetime", "datetimetz"]).columns:
+            values = out[col]
+            text = values.map(lambda v: v.isoformat()) if iso_dates else values.astype(str)
+            out[col] = text.where(values.notna(), None)
+        out = out.astype(object).where(out.notna(), None)
+        return out.to_dict(orient="records")
+
+    @staticmethod
+    def _default(obj: Any) -> Any:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, (pd.Timestamp, pd.Timedelta)) or hasattr(obj, "isoformat"):
+            return None if pd.isna(obj) else obj.isoformat()
+        if isinstance(obj, (set, tuple)):
+            return list(obj)
+        return str(obj)
+
+    @classmethod
+    def _json_safe(cls, obj: Any) -> Any:
+        """What orjson does natively, for the stdlib fallback: NaN / inf → None, NumPy → Python, keys → str."""
+        if isinstance(obj, np.ndarray):
+            obj = obj.tolist()
+        elif isinstance(obj, np.generic):
+            obj = obj.item()
+        if isinstance(obj, float):
+            return obj if math.isfinite(obj) else None
+        if isinstance(obj, dict):
+            return {
+                (k if isinstance(k, (str, int, float, bool)) or k is None else cls._default(k)): cls._json_safe(v)
+                for k, v in obj.items()
+            }
+        if isinstance(obj, (list, tuple, set)):
+            return [cls._json_safe(v) for v in obj]
+        return obj
+
+    def dumps(self, obj: Any) -> bytes:
+        """Compact UTF-8 JSON bytes; NaN / inf floats → null."""
+        if orjson is not None:
+            return orjson.dumps(obj, default=self._default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            self._json_safe(obj), ensure_ascii=False, separators=(",", ":"), default=self._default, allow_nan=False
+        ).encode("utf-8")
+
+    @staticmethod
+    def loads(data: Any) -> Any:
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+
+    def frame_records(self, df: pd.DataFrame, iso_dates: bool = False) -> List[Dict[str, Any]]:
+        """
+        Flattened, JSON-ready rows: what every scraper hands to its sync / store.
+        Dict values become "<col>_<key>" entries in the column's place, row by row, so a
+        row only gets the sub-keys its own dict has and their values keep their type.
+        """
+        flat, dict_cols = self._encode_lists(df)
+        rows = self.records(flat, iso_dates=iso_dates)
+        if not dict_cols:
+            return rows
+        nested = {col: flat[col].tolist() for col in dict_cols}
+        out = []
+        for i, row in enumerate(rows):
+            flat_row: Dict[str, Any] = {}
+            for col, value in row.items():
+                if col in nested and isinstance(nested[col][i], dict):
+                    for key, sub in nested[col][i].items():
+                        flat_row[f"{col}_{key}"] = sub
+                else:
+                    flat_row[col] = value
+            out.append(flat_row)
+        return out
+
+
+serializer = SerializationService()
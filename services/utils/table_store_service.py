@@ -0,0 +1,118 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class TableStoreService:
+    """
+    Columnar persistence for scraped tables: Parquet files (pyarrow, zstd) with typed
+    columns, the table's meta dict riding along in the file as DataFrame.attrs.
+
+    write() flattens what Parquet can't hold as-is (index levels become columns,
+    MultiIndex headers are joined with "_"; object columns holding dicts / lists or
+    mixed types are JSON-encoded per value and listed in attrs["json_columns"]) and
+    replaces the file atomically. read() memory-maps the file and keeps the frame until
+    the file's mtime changes. JSON is only produced at the API edge, by to_records(),
+    which also decodes the JSON-encoded columns, so values round-trip exactly.
+    """
+
+    COMPRESSION = "zstd"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[str, Optional[Tuple[str, ...]]], Tuple[float, pd.DataFrame]] = {}
+
+    # ------------------------
+    # Write
+    # ------------------------
+    @staticmethod
+    def prepare(df: pd.DataFrame, datetime_cols: Sequence[str] = ()) -> pd.DataFrame:
+        """
+        Parquet-safe copy of a scraped frame; `datetime_cols` are parsed to UTC timestamps.
+        0 / "0" / "" in them are the scrapers' fillna(0) placeholders and become NaT, not 1970.
+        """
+        df = df.reset_index() if not isinstance(df.index, pd.RangeIndex) else df.copy()
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = ["_".join(str(p) for p in col if p not in (None, "")) for col in df.columns]
+        else:
+            df.columns = [str(c) for c in df.columns]
+
+        for col in datetime_cols:
+            if col in df.columns:
+                values = df[col]
+                if values.dtype.kind not in "mM":
+                    values = values.mask(values.isin([0, "0", ""]))
+                df[col] = pd.to_datetime(values, utc=True, errors="coerce")
+
+        json_columns = []
+        for col in df.columns[df.dtypes == object]:
+            kinds = set(df[col].dropna().map(type))
+            if len(kinds) > 1 or kinds & {dict, list}:
+                df[col] = df[col].map(
+                    lambda v: None if v is None else json.dumps(v, ensure_ascii=False, default=str)
+                )
+                json_columns.append(col)
+        df.attrs["json_columns"] = json_columns
+        return df
+
+    def write(self, path: Path, df: pd.DataFrame, meta: Optional[Dict[str, Any]] = None,
+              datetime_cols: Sequence[str] = ()) -> None:
+        path = Path(path)
+        table = self.prepare(df, datetime_cols)
+        table.attrs["meta"] = meta or {}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        table.to_parquet(tmp, engine="pyarrow", compression=self.COMPRESSION, index=False)
+        os.replace(tmp, path)
+        with self._lock:
+            # Readers reload on the new mtime; drop stale column projections now
+            for key in [k for k in self._cache if k[0] == str(path)]:
+                del self._cache[key]
+
+    # ------------------------
+    # Read
+    # ------------------------
+    def exists(self, path: Path) -> bool:
+        return Path(path).exists()
+
+    def read(self, path: Path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """The table (optionally only some columns), memory-mapped and cached until the file changes."""
+        path = Path(path)
+        mtime = path.stat().st_mtime  # FileNotFoundError if never written
+        key = (str(path), tuple(columns) if columns else None)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        df = pd.read_parquet(path, engine="pyarrow", columns=list(columns) if columns else None, memory_map=True)
+        with self._lock:
+            self._cache[key] = (mtime, df)
+        return df
+
+    def read_meta(self, path: Path) -> Dict[str, Any]:
+        return dict(self.read(path).attrs.get("meta", {}))
+
+    # ------------------------
+    # API edge
+    # ------------------------
+    @staticmethod
+    def to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """JSON-ready rows: timestamps as ISO strings, missing values as None, JSON columns decoded."""
+        out = df.copy()
+        for col in df.attrs.get("json_columns", []):
+            if col in out.columns:
+                out[col] = out[col].map(lambda v: json.loads(v) if isinstance(v, str) else v)
+        for col in out.select_dtypes(include=["datetime", "datetimetz"]).columns:
+            out[col] = out[col].map(lambda v: v.isoformat() if pd.notna(v) else None)
+        out = out.astype(object).where(out.notna(), None)
+        return out.to_dict(orient="records")
+
+
+table_store = TableStoreService()
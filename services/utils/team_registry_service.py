@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.config import BUILTIN_LEAGUES, settings, team_data_path
+
+logger = logging.getLogger(__name__)
+
+
+class TeamRegistryService:
+    """
+    Canonical team identities shared by every data source.
+
+    Each team has a stable id (e.g. "man_utd") and a display name. All known spellings
+    from FPL, FBref, FotMob and WhoScored are normalized once into a single
+    alias → id dict, so resolving any source's name is one hash lookup.
+    Unknown spellings are logged once; they can be learned from fixtures that kick off
+    at the same time in a source whose names already resolve.
+
+    Premier League clubs are built in; the clubs of every other configured league are
+    loaded from core.config.team_data_path(league), so leagues are added by config.
+    """
+
+    # id: (display name, aliases across FPL / FBref / FotMob / WhoScored)
+    TEAMS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+        "arsenal": ("Arsenal", ()),
+        "aston_villa": ("Aston Villa", ("Villa",)),
+        "bournemouth": ("Bournemouth", ("AFC Bournemouth",)),
+        "brentford": ("Brentford", ()),
+        "brighton": ("Brighton", ("Brighton & Hove Albion", "Brighton and Hove Albion", "Brighton Hove Albion")),
+        "burnley": ("Burnley", ()),
+        "chelsea": ("Chelsea", ()),
+        "crystal_palace": ("Crystal Palace", ()),
+        "everton": ("Everton", ()),
+        "fulham": ("Fulham", ()),
+        "ipswich": ("Ipswich", ("Ipswich Town",)),
+        "leeds": ("Leeds", ("Leeds United", "Leeds Utd")),
+        "leicester": ("Leicester", ("Leicester City",)),
+        "liverpool": ("Liverpool", ()),
+        "luton": ("Luton", ("Luton Town",)),
+        "man_city": ("Man City", ("Manchester City",)),
+        "man_utd": ("Man Utd", ("Manchester United", "Manchester Utd", "Man United")),
+        "newcastle": ("Newcastle", ("Newcastle United", "Newcastle Utd")),
+        "nottm_forest": ("Nott'm Forest", ("Nottingham Forest", "Nott'ham Forest", "Nottm Forest")),
+        "sheffield_utd": ("Sheffield Utd", ("Sheffield United", "Sheff Utd")),
+        "southampton": ("Southampton", ()),
+        "sunderland": ("Sunderland", ()),
+        "tottenham": ("Tottenham", ("Spurs", "Tottenham Hotspur")),
+        "west_ham": ("West Ham", ("West Ham United", "West Ham Utd")),
+        "wolves": ("Wolves", ("Wolverhampton", "Wolverhampton Wanderers")),
+    }
+
+    LEARNED_FILE = Path("data/teams/learned_aliases.json")
+
+    def __init__(self, learned_file: Optional[Path] = None, league_files: Optional[Iterable[Path]] = None):
+        self.learned_file = Path(learned_file) if learned_file else self.LEARNED_FILE
+        self._lock = threading.Lock()
+        if league_files is None:
+            league_files = [team_data_path(league) for league in settings.LEAGUES if league not in BUILTIN_LEAGUES]
+        teams = dict(self.TEAMS)
+        for path in league_files:
+            teams.update(self._read_league(Path(path)))
+        self._names: Dict[str, str] = {tid: display for tid, (display, _) in teams.items()}
+        self._aliases: Dict[str, str] = {}
+        for tid, (display, aliases) in teams.items():
+            for alias in (tid, display, *aliases):
+                self._aliases[self.normalize(alias)] = tid
+        self._builtin = set(self._aliases)
+        # Raw input → id, so repeat lookups skip normalization entirely
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._unknown_logged: Set[str] = set()
+        self._load_learned()
+
+    @staticmethod
+    def _read_league(path: Path) -> Dict[str, Tuple[str, Tuple[str, ...]]]:
+        """Clubs of one configured league; a broken file fails startup like a missing one."""
+        try:
+            clubs = json.loads(path.read_text(encoding="utf-8"))
+            return {tid: (display, tuple(aliases)) for tid, (display, aliases) in clubs.items()}
+        except (OSError, ValueError, TypeError) as e:
+            raise ValueError(f"Unreadable league team file {path}: {e}") from e
+
+    # ------------------------
+    # Normalization / lookup
+    # ------------------------
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Accent-fold, lowercase, drop a leading "vs", '&' → 'and', strip punctuation."""
+        text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii")
+        text = text.casefold().replace("&", " and ")
+        text = re.sub(r"^vs\.?\s+", "", text.strip())
+        text = re.sub(r"[^a-z0-9 ]+", "", text)
+        return re.sub(r"\s+", " ", text).strip()
+
+    def resolve(self, name: Optional[str]) -> Optional[str]:
+        """Canonical team id for any known spelling, or None (logged once per spelling)."""
+        if not name:
+            return None
+        try:
+            return self._resolved[name]
+        except KeyError:
+            pass
+        team_id = self._aliases.get(self.normalize(name))
+        if team_id is None and name not in self._unknown_logged:
+            self._unknown_logged.add(name)
+            logger.warning(f"Unknown team alias '{name}'")
+        if team_id is not None:
+            self._resolved[name] = team_id
+        return team_id
+
+    def name(self, team_id: Optional[str]) -> Optional[str]:
+        """Display name for a canonical id."""
+        return self._names.get(team_id) if team_id else None
+
+    def ids(self) -> List[str]:
+        return list(self._names)
+
+    def aliases(self, team_id: Optional[str]) -> List[str]:
+        """Every normalized spelling that resolves to `team_id` (built-in and learned)."""
+        return [alias for alias, tid in self._aliases.items() if tid == team_id] if team_id else []
+
+    # ------------------------
+    # Alias learning
+    # ------------------------
+    def learn_alias(self, alias: str, team_id: str, persist: bool = True) -> bool:
+        """Map a new spelling onto an existing team. Returns True if it was new."""
+        if team_id not in self._names:
+            raise ValueError(f"Unknown team id '{team_id}'")
+        key = self.normalize(alias)
+        if not key or self._aliases.get(key) == team_id:
+            return False
+        with self._lock:
+            self._aliases[key] = team_id
+            self._resolved[alias] = team_id
+            self._unknown_logged.discard(alias)
+        logger.info(f"Learned team alias '{alias}' → {team_id}")
+        if persist:
+            self._save_learned()
+        return True
+
+    def learn_from_fixtures(
+        self,
+        known: Iterable[Tuple[datetime, str, str]],
+        candidates: Iterable[Tuple[datetime, str, str]],
+        tolerance: timedelta = timedelta(minutes=15),
+    ) -> int:
+        """
+        Learn unknown spellings by kickoff alignment.
+        `known` fixtures are (kickoff, home, away) from a source whose names resolve;
+        for each candidate fixture with an unresolved side, a known fixture at the same
+        kickoff (± tolerance) whose other side matches pins the unknown name down.
+        If both sides are unknown, it's only learned when exactly one known fixture kicks off then.
+        Returns the number of aliases learned.
+        """
+        bucket = int(tolerance.total_seconds()) or 60
+        by_slot: Dict[int, List[Tuple[datetime, str, str]]] = {}
+        for kickoff, home, away in known:
+            home_id, away_id = self.resolve(home), self.resolve(away)
+            if home_id and away_id:
+                by_slot.setdefault(int(kickoff.timestamp()) // bucket, []).append((kickoff, home_id, away_id))
+
+        learned = 0
+        for kickoff, home, away in candidates:
+            home_id, away_id = self.resolve(home), self.resolve(away)
+            if home_id and away_id:
+                continue
+            slot = int(kickoff.timestamp()) // bucket
+            nearby = [
+                k for s in (slot - 1, slot, slot + 1) for k in by_slot.get(s, [])
+                if abs(k[0] - kickoff) <= tolerance
+            ]
+            if home_id:
+                matches = [k for k in nearby if k[1] == home_id]
+                if len(matches) == 1:
+                    learned += self.learn_alias(away, matches[0][2], persist=False)
+            elif away_id:
+                matches = [k for k in nearby if k[2] == away_id]
+                if len(matches) == 1:
+                    learned += self.learn_alias(home, matches[0][1], persist=False)
+            elif len(nearby) == 1:
+                learned += self.learn_alias(home, nearby[0][1], persist=False)
+                learned += self.learn_alias(away, nearby[0][2], persist=False)
+
+        if learned:
+            self._save_learned()
+        return learned
+
+    # ------------------------
+    # Persistence of learned aliases
+    # ------------------------
+    def _learned_aliases(self) -> Dict[str, str]:
+        return {alias: tid for alias, tid in self._aliases.items() if alias not in self._builtin}
+
+    def _save_learned(self) -> None:
+        try:
+            self.learned_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.learned_file.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(self._learned_aliases(), ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp, self.learned_file)
+        except OSError as e:
+            logger.error(f"Saving learned team aliases failed: {e}")
+
+    def _load_learned(self) -> None:
+        if not self.learned_file.exists():
+            return
+        try:
+            learned = json.loads(self.learned_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable learned team aliases: {e}")
+            return
+        for alias, team_id in learned.items():
+            if team_id in self._names:
+                self._aliases[alias] = team_id
+
+
+team_registry = TeamRegistryService()
@@ -1,96 +1,209 @@
-from difflib import SequenceMatcher
 import json
+import weakref
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import pandas as pd
 from datetime import datetime
+from core.config import settings, fixtures_path, table_path
 from models.fotmob.fixture import FotMobFixture
+from services.utils.team_registry_service import team_registry
+from services.utils.fixture_sync_service import FixtureSyncService
+from services.utils.match_store_service import MatchStoreService
+from services.utils.table_store_service import table_store
 
-WHO_JSON_PATH = "data/whoscored/fixtures/ENG-Premier League_2526.json"
 class WhoScoredJSONService:
-    def __init__(self, json_file: str = WHO_JSON_PATH):
-        self.json_file = Path(json_file)
+    """
+    Match FotMob fixtures to WhoScored games.
+
+    Matching is a batch as-of join on kickoff (±MATCH_TOLERANCE) keyed by canonical
+    home/away team ids. Every FotMob game_id → WhoScored game_id match is cached, so
+    repeat enrichment is a dictionary lookup. Misses aren't cached (the game may be
+    scraped or moved into range later). A cached match is dropped when a FotMob sync
+    reports the fixture rescheduled or removed, and the whole cache when the WhoScored
+    file is rewritten (it is reloaded first).
+    """
+
+    MATCH_TOLERANCE = pd.Timedelta(minutes=15)
+
+    # Live instances, told about fixture syncs by one class-level listener
+    _live: "weakref.WeakSet[WhoScoredJSONService]" = weakref.WeakSet()
+    _listening = False
+
+    def __init__(self, json_file: Optional[str] = None, league: Optional[str] = None, season: Optional[str] = None):
+        league, season = league or settings.DEFAULT_LEAGUE, season or settings.SEASON
+        if json_file:
+            self.json_file = Path(json_file)
+        else:
+            # Parquet table, or the JSON file written before the switch
+            self.json_file = table_path("whoscored", "fixtures", league, season)
+            if not self.json_file.exists():
+                self.json_file = fixtures_path("whoscored", league, season)
         if not self.json_file.exists():
-            raise FileNotFoundError(f"WhoScored fixture file not found: {json_file}")
+            raise FileNotFoundError(f"WhoScored fixture file not found: {self.json_file}")
+        self._load()
+        WhoScoredJSONService._live.add(self)
+        if not WhoScoredJSONService._listening:
+            FixtureSyncService.add_listener(WhoScoredJSONService._on_fixtures_synced)
+            WhoScoredJSONService._listening = True
+
+    def _load(self) -> None:
+        self._mtime = self.json_file.stat().st_mtime
         self.fixtures: pd.DataFrame = self._load_json()
+        self._build_index()
+
+    def reload_if_changed(self) -> bool:
+        """Re-read the WhoScored file (and start a fresh id cache) if it was rewritten."""
+        try:
+            changed = self.json_file.stat().st_mtime != self._mtime
+        except OSError:
+            return False
+        if changed:
+            self._load()
+        return changed
+
+    # ------------------------
+    # Cache invalidation
+    # ------------------------
+    @classmethod
+    def _on_fixtures_synced(cls, source: str, league: str, season: str, changes: List[Dict[str, Any]]) -> None:
+        for service in list(cls._live):
+            service.invalidate(source, league, season, changes)
+
+    def invalidate(self, source: str, league: str, season: str, changes: List[Dict[str, Any]]) -> None:
+        """Drop cached matches a fixture sync made stale."""
+        if self.meta.get("league") and (league, str(season)) != (self.meta["league"], str(self.meta.get("season"))):
+            return
+        if source == "whoscored":
+            self.reload_if_changed()
+        elif source == "fotmob":
+            for change in changes:
+                if {"rescheduled", "removed"} & set(change["changes"]):
+                    self._id_map.pop(change["id"], None)
 
     def _load_json(self) -> pd.DataFrame:
-        import json
-        from pathlib import Path
-
         file_path = Path(self.json_file)
         if not file_path.exists():
             raise FileNotFoundError(f"WhoScored fixture file not found: {self.json_file}")
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        fixtures = data.get("fixtures", [])
-        df = pd.DataFrame(fixtures) if fixtures else pd.DataFrame()
+        if file_path.suffix == ".parquet":
+            # Typed columns straight from the table; copy so the cached frame stays untouched
+            df = table_store.read(file_path).copy()
+            self.meta = dict(df.attrs.get("meta", {}))
+            df = df.drop(columns=["_hash"], errors="ignore")
+        else:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.meta = data.get("meta", {})
+            fixtures = data.get("fixtures", [])
+            df = pd.DataFrame(fixtures) if fixtures else pd.DataFrame()
 
         if "date" in df.columns:
             df["date"] = pd.to_datetime(df["date"], utc=True)
-        if "home_team" in df.columns:
-            df["home_team_lower"] = df["home_team"].str.lower()
-        if "away_team" in df.columns:
-            df["away_team_lower"] = df["away_team"].str.lower()
-
         return df
 
-    @staticmethod
-    def similar(a: str, b: str) -> float:
-        """Return a similarity ratio between 0 and 1."""
-        return SequenceMatcher(None, a, b).ratio()
-
-    def enrich_fixture(self, fixture: FotMobFixture) -> FotMobFixture:
+    def _build_index(self) -> None:
+        """Row records, game_id → row and a kickoff-sorted join frame, built once per load."""
+        df = self.fixtures
+        self._records: List[dict] = df.to_dict(orient="records")
+        self._row_by_game_id: Dict[str, int] = (
+            {str(gid): i for i, gid in enumerate(df["game_id"].tolist())} if "game_id" in df.columns else {}
+        )
+        # FotMob game_id → matched WhoScored game_id (misses aren't cached)
+        self._id_map: Dict[str, str] = {}
+        self.match_store: Optional[MatchStoreService] = (
+            MatchStoreService.for_league(self.meta["league"], self.meta["season"])
+            if self.meta.get("league") and self.meta.get("season") else None
+        )
+
+        # Canonical team ids, resolved once per load, live only in the join frame: the rows
+        # keep WhoScored's own columns (its numeric home_team_id / away_team_id included)
+        if {"date", "home_team", "away_team"} <= set(df.columns):
+            right = pd.DataFrame({
+                "date": df["date"],
+                "home_canonical_id": df["home_team"].map(team_registry.resolve),
+                "away_canonical_id": df["away_team"].map(team_registry.resolve),
+                "row": range(len(df)),
+            })
+            self._by_kickoff = right.dropna(subset=["home_canonical_id", "away_canonical_id"]).sort_values("date", kind="stable")
+        else:
+            self._by_kickoff = pd.DataFrame(columns=["date", "home_canonical_id", "away_canonical_id", "row"])
+
+    def _learn_unknown_teams(self, fixtures: List[FotMobFixture]) -> None:
+        """Teach the registry FotMob spellings it doesn't know yet, by kickoff alignment."""
+        unknown = [
+            (pd.to_datetime(f.date, utc=True).to_pydatetime(), f.home_team, f.away_team)
+            for f in fixtures
+            if not (team_registry.resolve(f.home_team) and team_registry.resolve(f.away_team))
+        ]
+        if not unknown or not self._records:
+            return
+        known = [(r["date"].to_pydatetime(), r["home_team"], r["away_team"]) for r in self._records]
+        team_registry.learn_from_fixtures(known, unknown, self.MATCH_TOLERANCE.to_pytimedelta())
+
+    def match_fixtures(self, fixtures: List[FotMobFixture]) -> Dict[str, Optional[str]]:
+        """
+        FotMob game_id → WhoScored game_id for all `fixtures` in one vectorized pass.
+        Only fixtures not seen before are joined; everything else comes from the cache.
+        """
+        self.reload_if_changed()
+        pending = [f for f in fixtures if f.game_id not in self._id_map]
+        if not pending:
+            return {f.game_id: self._id_map[f.game_id] for f in fixtures}
+
+        # Existing WhoScored ids that are still present win outright, then the match store's join
+        joinable = []
+        for f in pending:
+            stored = self.match_store.get_by_source_id("fotmob", f.game_id) if self.match_store else None
+            stored_id = (stored or {}).get("ids", {}).get("whoscored")
+            if f.whoscored_match_id and str(f.whoscored_match_id) in self._row_by_game_id:
+                self._id_map[f.game_id] = str(f.whoscored_match_id)
+            elif stored_id in self._row_by_game_id:
+                self._id_map[f.game_id] = stored_id
+            else:
+                joinable.append(f)
+
+        if joinable:
+            self._learn_unknown_teams(joinable)
+            left = pd.DataFrame({
+                "fotmob_id": [f.game_id for f in joinable],
+                "date": pd.to_datetime([f.date for f in joinable], utc=True),
+                "home_canonical_id": [team_registry.resolve(f.home_team) for f in joinable],
+                "away_canonical_id": [team_registry.resolve(f.away_team) for f in joinable],
+            })
+            left = left.dropna(subset=["home_canonical_id", "away_canonical_id"]).sort_values("date", kind="stable")
+
+            if not left.empty and not self._by_kickoff.empty:
+                joined = pd.merge_asof(
+                    left,
+                    self._by_kickoff,
+                    on="date",
+                    by=["home_canonical_id", "away_canonical_id"],
+                    tolerance=self.MATCH_TOLERANCE,
+                    direction="nearest",
+                )
+                game_ids = self.fixtures["game_id"].astype(str).to_numpy()
+                for fid, row in zip(joined["fotmob_id"], joined["row"]):
+                    if not pd.isna(row):
+                        self._id_map[fid] = game_ids[int(row)]
+
+        return {f.game_id: self._id_map.get(f.game_id) for f in fixtures}
+
+    def enrich_fixtures(self, fixtures: List[FotMobFixture]) -> List[FotMobFixture]:
         """
-        Enrich a FotMobFixture with WhoScored match ID and full match data.
+        Enrich many FotMobFixtures with WhoScored match ID and full match data.
         Always ensures incidents are included if available.
         """
-        df = self.fixtures.copy()
-
-        # --- Step 1: Try to match by existing WhoScored game_id ---
-        if fixture.whoscored_match_id:
-            match_row = df[df["game_id"].astype(str) == str(fixture.whoscored_match_id)]
-            if not match_row.empty:
-                match_data = match_row.iloc[0].to_dict()
-                fixture.whoscored_match_id = str(match_data["game_id"])
-                fixture.whoscored = match_data
-                return fixture  # ✅ Found exact match
-
-        # --- Step 2: Match by date ±15 min and team similarity ---
-        match_ts = pd.Timestamp(fixture.date)
-        if match_ts.tzinfo is None:
-            match_ts = match_ts.tz_localize("UTC")
-        else:
-            match_ts = match_ts.tz_convert("UTC")
-
-        df_filtered = df[(df["date"] - match_ts).abs() <= pd.Timedelta(minutes=15)]
-        if df_filtered.empty:
-            fixture.whoscored_match_id = None
-            fixture.whoscored = None
-            return fixture
-
-        # Compute best team similarity
-        home_lower = fixture.home_team.lower()
-        away_lower = fixture.away_team.lower()
-        best_score = 0
-        best_match = None
-
-        for _, row in df_filtered.iterrows():
-            home_score = self.similar(home_lower, row["home_team_lower"])
-            away_score = self.similar(away_lower, row["away_team_lower"])
-            total_score = home_score + away_score
-            if total_score > best_score:
-                best_score = total_score
-                best_match = row
-
-        if best_match is not None:
-            match_data = best_match.to_dict()
-            fixture.whoscored_match_id = str(match_data["game_id"])
-            fixture.whoscored = match_data
-        else:
-            fixture.whoscored_match_id = None
-            fixture.whoscored = None
+        id_map = self.match_fixtures(fixtures)
+        for fixture in fixtures:
+            ws_id = id_map.get(fixture.game_id)
+            if ws_id is None:
+                fixture.whoscored_match_id = None
+                fixture.whoscored = None
+            else:
+                fixture.whoscored_match_id = ws_id
+                fixture.whoscored = dict(self._records[self._row_by_game_id[ws_id]])
+        return fixtures
 
-        return fixture
\ No newline at end of file
+    def enrich_fixture(self, fixture: FotMobFixture) -> FotMobFixture:
+        """Single-fixture form of enrich_fixtures (cached after the first match)."""
+        return self.enrich_fixtures([fixture])[0]
@@ -4,20 +4,24 @@ from typing import Optional, List
 import pandas as pd
 from datetime import datetime, timezone
 import soccerdata as sd
+from core.config import settings, table_path
+from services.utils.fixture_sync_service import FixtureSyncService
+from services.utils.match_store_service import MatchStoreService
+from services.utils.serialization_service import serializer
 
 
 class WhoScoredService:
     def __init__(self, league: str, seasons: Optional[str] = None):
         self.league = league
-        self.seasons = [seasons] if seasons else [2526]
+        self.seasons = [seasons] if seasons else [settings.SEASON]
         # no_cache ensures fresh data every time
         self.ws = sd.WhoScored(leagues=[league], seasons=self.seasons, no_cache=True)
 
-    def get_fixtures(self) -> dict:
+    def get_fixtures(self, update_store: bool = True) -> dict:
         """
-        Fetch all fixtures from WhoScored and ALWAYS overwrite the JSON.
-        Past and future fixtures are updated fully.
-        Returns JSON-like dict with meta + fixtures.
+        Fetch all fixtures from WhoScored and diff them against the stored Parquet table.
+        The file is only rewritten (atomically) when something changed.
+        Returns JSON-like dict with meta + fixtures + changes.
         """
         df: pd.DataFrame = self.ws.read_schedule(force_cache=False)
         if df is None or df.empty:
@@ -26,33 +30,23 @@ class WhoScoredService:
         df = df.fillna(0)
         df["date"] = pd.to_datetime(df["date"], utc=True)
 
-        file_path = Path("data/whoscored/fixtures") / f"{self.league}_{self.seasons[0]}.json"
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Convert all fixtures to list of dicts
-        final_fixtures: List[dict] = df.to_dict(orient="records")
-
-        # Convert datetime columns to ISO strings for JSON
-        datetime_cols = df.select_dtypes(include=["datetime", "datetimetz"]).columns
-        for fixture in final_fixtures:
-            for col in datetime_cols:
-                fixture[col] = fixture[col].isoformat()
-
-        # Prepare output with meta
-        output = {
-            "meta": {
-                "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "league": self.league,
-                "season": self.seasons[0],
-            },
-            "fixtures": final_fixtures,
-        }
-
-        # ALWAYS overwrite JSON file
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(output, f, ensure_ascii=False, indent=2)
-
-        print(f"✅ WhoScored fixtures fully updated: {file_path}")
+        file_path = table_path("whoscored", "fixtures", self.league, self.seasons[0])
+
+        # Convert all fixtures to list of dicts, datetime columns as ISO strings
+        final_fixtures: List[dict] = serializer.records(df, iso_dates=True)
+
+        # Only rewrite the file when fixtures changed; the change list drives downstream updates
+        output = FixtureSyncService.for_file(
+            "whoscored", self.league, self.seasons[0], file_path, kickoff_fields=("date", "start_time")
+        ).sync(final_fixtures)
+
+        if output["changes"]:
+            print(f"✅ WhoScored fixtures updated: {file_path} ({len(output['changes'])} changed)")
+            if update_store:
+                changed = [c["fixture"] for c in output["changes"] if c["fixture"] is not None]
+                MatchStoreService.for_league(self.league, self.seasons[0]).update_source("whoscored", changed)
+        else:
+            print(f"ℹ️ WhoScored fixtures unchanged: {file_path}")
         return output
 
     def get_missing_players(self, match_id: int) -> List[dict]:
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# core.config needs these to import; nothing here talks to a real database
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
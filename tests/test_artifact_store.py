@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+from starlette.requests import Request
+
+from routes.fbref import fbref_fixtures
+from services.utils.artifact_store_service import ArtifactStoreService, artifact_store
+from services.utils.response_cache_service import response_cache
+
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+PAYLOAD = {"meta": {"league": "L"}, "fixtures": [{"game_id": str(i), "week": 1} for i in range(200)]}
+
+
+def test_artifact_etag_matches_live_response(tmp_path):
+    store = ArtifactStoreService(tmp_path)
+    assert store.publish("fixtures/1", PAYLOAD)
+    assert not store.publish("fixtures/1", PAYLOAD)  # unchanged content isn't rewritten
+
+    served = store.serve(make_request(), "fixtures/1")
+    live = response_cache.respond(make_request(), None, PAYLOAD)
+    assert served.headers["etag"] == live.headers["etag"]
+
+    not_modified = store.serve(make_request(if_none_match=live.headers["etag"]), "fixtures/1")
+    assert not_modified.status_code == 304
+    assert store.serve(make_request(), "fixtures/2") is None
+
+
+def test_unknown_week_is_rendered_live_without_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_store, "root", tmp_path)
+    published = []
+    fbs = SimpleNamespace(
+        match_store=SimpleNamespace(next_round=lambda: 1),
+        fixture_store=SimpleNamespace(weeks=lambda: [1, 2]),
+        fixtures_artifact=lambda week, include_events=True: f"fixtures/{week}{'' if include_events else '.lite'}",
+        publish_fixtures=lambda weeks: published.extend(weeks),
+        get_fixtures=lambda week, include_events=True: {"meta": {}, "fixtures": []},
+    )
+    monkeypatch.setattr(fbref_fixtures, "get_service", lambda league: fbs)
+
+    response = asyncio.run(fbref_fixtures.fixtures(make_request(), week=999999, events=True, league=None))
+    assert response.status_code == 200
+    assert published == []
+    assert list(tmp_path.rglob("*")) == []
+
+    asyncio.run(fbref_fixtures.fixtures(make_request(), week=2, events=True, league=None))
+    assert published == [2]
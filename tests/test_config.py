@@ -0,0 +1,31 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from core.config import BUILTIN_LEAGUES, Settings, team_data_path
+from services.utils.team_registry_service import TeamRegistryService
+
+
+def test_builtin_leagues_accepted():
+    assert Settings(LEAGUES=list(BUILTIN_LEAGUES)).DEFAULT_LEAGUE == BUILTIN_LEAGUES[0]
+
+
+@pytest.mark.parametrize("leagues", [["ESP-La Liga"], ["ENG-Premier League", "GER-Bundesliga"], []])
+def test_leagues_without_registry_data_rejected(leagues):
+    with pytest.raises(ValidationError):
+        Settings(LEAGUES=leagues)
+
+
+def test_league_added_by_config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = team_data_path("ESP-La Liga")
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"real_madrid": ["Real Madrid", ["Real Madrid CF"]]}), encoding="utf-8")
+
+    leagues = Settings(LEAGUES=["ENG-Premier League", "ESP-La Liga"]).LEAGUES
+    registry = TeamRegistryService(tmp_path / "learned.json", league_files=[team_data_path(leagues[1])])
+
+    assert registry.resolve("Real Madrid CF") == "real_madrid"
+    assert registry.resolve("Arsenal") == "arsenal"
+    assert registry._learned_aliases() == {}
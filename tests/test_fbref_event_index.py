@@ -0,0 +1,55 @@
+import pytest
+
+from services.fbref.fbref_event_index_service import FBrefEventIndexService
+
+FIXTURES = [
+    {
+        "game_id": "g1", "week": 1, "date": "2025-08-16", "home_team": "Arsenal", "away_team": "Chelsea",
+        "events": [
+            {"minute": "12", "team": "Arsenal", "event_type": "goal", "player1": "Bukayo Saka", "player2": "Martin Ødegaard"},
+            {"minute": "40", "team": "Chelsea", "event_type": "own_goal", "player1": "Levi Colwill"},
+            {"minute": "90+2", "team": "Arsenal", "event_type": "penalty_goal", "player1": "Bukayo Saka"},
+        ],
+    },
+    {
+        "game_id": "g2", "week": 2, "date": "2025-08-23", "home_team": "Manchester Utd", "away_team": "Arsenal",
+        "events": [
+            {"minute": "30", "team": "Manchester Utd", "event_type": "goal", "player1": "Bruno Fernandes"},
+            {"minute": "55", "team": "Arsenal", "event_type": "goal", "player1": "Gabriel Martinelli", "player2": "Bukayo Saka"},
+            {"minute": "70", "team": "Arsenal", "event_type": "goal", "player1": "Gabriel"},
+        ],
+    },
+]
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    index = FBrefEventIndexService("ENG-Premier League", "test")
+    index.update_fixtures(FIXTURES)
+    return index
+
+
+def test_goals_leaderboard_leaves_out_own_goals(index):
+    leaders = index.counts("player", event_type="goals")
+    assert {row["player"] for row in leaders} == {"Bukayo Saka", "Bruno Fernandes", "Gabriel Martinelli", "Gabriel"}
+    assert [e["player1"] for e in index.query(event_type="own_goals")] == ["Levi Colwill"]
+
+
+def test_player_matches_name_prefix(index):
+    assert len(index.query(player="Saka")) == 2
+    assert [e["player1"] for e in index.query(player="b fern")] == ["Bruno Fernandes"]
+    assert [e["player1"] for e in index.query(secondary="odegaard")] == ["Bukayo Saka"]
+    assert index.query(player="Haaland") == []
+
+
+def test_exact_name_wins_over_prefix(index):
+    assert [e["player1"] for e in index.query(player="Gabriel")] == ["Gabriel"]
+    assert [e["player1"] for e in index.query(player="gab mart")] == ["Gabriel Martinelli"]
+
+
+def test_name_search_follows_reindexing(index):
+    index.update_fixtures([{**FIXTURES[1], "events": FIXTURES[1]["events"] + [
+        {"minute": "88", "team": "Arsenal", "event_type": "goal", "player1": "Kai Havertz"},
+    ]}])
+    assert [e["player1"] for e in index.query(player="havertz")] == ["Kai Havertz"]
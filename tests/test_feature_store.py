@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from services.fbref.fbref_feature_store_service import FBrefFeatureStoreService
+
+STANDARD = pd.DataFrame({
+    "team": ["Arsenal", "Arsenal", "Chelsea"],
+    "player": ["Bukayo Saka", "Martin Ødegaard", "Cole Palmer"],
+    "pos": ["FW", "MF", "MF"],
+    "standard_playing_time_90s": [10.0, 0.0, 8.0],
+    "standard_performance_gls": [5.0, 1.0, 6.0],
+})
+SHOOTING = pd.DataFrame({
+    "team": ["Arsenal", "Chelsea", "Chelsea"],
+    "player": ["Bukayo Saka", "Cole Palmer", "Nicolas Jackson"],
+    "shooting_standard_sh": ["30", "25", "18"],
+    "shooting_standard_sot_pct": [40.0, 44.0, 33.3],
+})
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = FBrefFeatureStoreService("ENG-Premier League", "test", feature_dir=tmp_path)
+    frames = {"standard": STANDARD, "shooting": SHOOTING}
+    monkeypatch.setattr(store, "STAT_TYPES", tuple(frames))
+    monkeypatch.setattr(store, "_read", lambda stat_type: frames[stat_type].copy())
+    return store
+
+
+def test_column_name_and_per90():
+    assert FBrefFeatureStoreService.column_name("shooting", ("Expected", "npxG+xAG")) == "shooting_expected_npxg_xag"
+    df = FBrefFeatureStoreService.add_per90(STANDARD.copy())
+    assert df["standard_performance_gls_p90"].tolist()[0] == 0.5
+    assert pd.isna(df["standard_performance_gls_p90"].tolist()[1])  # no minutes, no rate
+    assert "standard_playing_time_90s_p90" not in df.columns
+
+
+def test_feather_round_trip(store):
+    assert not store.ready
+    store.ensure_ready()
+    built = store.frame()
+    assert store.ready and len(built) == 4
+    assert built["shooting_standard_sh"].dtype == "float64"
+    assert "shooting_standard_sh_p90" in built.columns
+    assert "shooting_standard_sot_pct_p90" not in built.columns
+
+    reloaded = FBrefFeatureStoreService("ENG-Premier League", "test", feature_dir=store.feature_file.parent).frame()
+    pd.testing.assert_frame_equal(reloaded, built)
+
+    rows = store.players(["martin odegaard"], ["standard_performance_gls"])
+    assert rows["player"].tolist() == ["Martin Ødegaard"]
+    assert list(rows.columns) == ["team_id", "team", "player", "standard_performance_gls"]
+
+
+def test_frame_before_build_is_not_found(store):
+    with pytest.raises(FileNotFoundError):
+        store.frame()
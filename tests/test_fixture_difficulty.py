@@ -0,0 +1,50 @@
+import pandas as pd
+
+from services.fbref.fbref_fantasy_fixture_data import FixtureDifficultyService
+from services.utils.team_registry_service import team_registry
+
+TEAMS = {1: {"name": "Arsenal"}, 2: {"name": "Chelsea"}, 3: {"name": "Liverpool"}, 4: {"name": "Everton"}}
+
+
+def make_service(modifiers, fixtures):
+    """A service laid out on FPL teams / fixtures without reading FBref."""
+    service = object.__new__(FixtureDifficultyService)
+    service._fpl_teams, service._fpl_fixtures = TEAMS, fixtures
+    service._state = {"modifiers": {team_registry.resolve(name): mods for name, mods in modifiers.items()}}
+    service._state["grid"] = service._build_grid(service._state)
+    return service
+
+
+def test_modifiers_are_positive_for_leaky_opponents():
+    stats = pd.DataFrame({
+        "team_name": ["Arsenal", "Everton"],
+        "Per 90 Minutes_xG": [0.8, 1.8],
+        "Per 90 Minutes_Gls": [0.6, 1.6],
+    })
+    modifiers = FixtureDifficultyService._compute_modifiers(object.__new__(FixtureDifficultyService), stats)
+    assert modifiers["Everton"][0] > 0 > modifiers["Arsenal"][0]
+    assert modifiers["Everton"][1] > 0 > modifiers["Arsenal"][1]
+
+
+def test_ticker_ranks_by_average_per_fixture_with_blank_and_double():
+    modifiers = {"Arsenal": [-0.5, -0.5], "Chelsea": [0.2, 0.2], "Liverpool": [-0.4, -0.4], "Everton": [0.4, 0.4]}
+    fixtures = [
+        # GW1: Arsenal double (Everton, Chelsea), Liverpool blank
+        {"event": 1, "team_h": 1, "team_a": 4},
+        {"event": 1, "team_h": 2, "team_a": 1},
+        # GW2: Liverpool host Everton, Arsenal play Chelsea
+        {"event": 2, "team_h": 3, "team_a": 4},
+        {"event": 2, "team_h": 1, "team_a": 2},
+    ]
+    ticker = make_service(modifiers, fixtures).get_fixture_ticker(horizon=2, start_gw=1)
+    by_name = {t["team"]: t for t in ticker["teams"]}
+
+    liverpool, arsenal = by_name["Liverpool"], by_name["Arsenal"]
+    assert liverpool["fixtures"] == 1 and liverpool["gameweeks"][0]["fixture_count"] == 0
+    assert liverpool["difficulty_avg"]["OUT"] == 0.4  # the blank isn't an easy zero-difficulty game
+    assert arsenal["fixtures"] == 3 and arsenal["gameweeks"][0]["fixture_count"] == 2
+    assert arsenal["difficulty_avg"]["OUT"] == round((0.4 + 0.2 + 0.2) / 3, 2)
+
+    # Liverpool's one easy game beats Arsenal's three decent ones on average (a summed
+    # ranking would put Arsenal's double first); Chelsea, twice against Arsenal, are last
+    assert [t["team"] for t in ticker["teams"]] == ["Liverpool", "Arsenal", "Everton", "Chelsea"]
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from services.utils.job_queue_service import FileJobStore, JobQueueService
+from services.utils.lease_service import FileLeaseService
+
+
+def make_workers(tmp_path, n=2):
+    """Queues as separate worker processes would have them: one shared job dir and lease dir."""
+    return [
+        JobQueueService(FileJobStore(tmp_path / "jobs"), FileLeaseService(tmp_path / "leases"))
+        for _ in range(n)
+    ]
+
+
+def test_identical_jobs_coalesce_across_workers(tmp_path):
+    async def scenario():
+        a, b = make_workers(tmp_path)
+        release, runs = asyncio.Event(), []
+
+        async def work(job):
+            runs.append(job.id)
+            job.report("scrape", 1, 2)
+            await release.wait()
+            return {"fixtures": 3}
+
+        first = await a.submit("update", work, key=("update", "L", 1))
+        await asyncio.sleep(0.05)
+        second = await b.submit("update", work, key=("update", "L", 1))
+        assert second["id"] == first["id"] and second["waiters"] == 2
+
+        seen = await b.get(first["id"])  # the other worker reads the shared status
+        assert seen["status"] == "running" and seen["stage"] == "scrape"
+
+        release.set()
+        await asyncio.sleep(0.05)
+        done = await b.get(first["id"])
+        assert done["status"] == "success" and done["result"] == {"fixtures": 3}
+        assert runs == [first["id"]]
+
+        third = await b.submit("update", work, key=("update", "L", 1))
+        assert third["id"] != first["id"]  # finished jobs don't absorb new requests
+        await asyncio.sleep(0.05)
+        assert {job["id"] for job in await a.list()} == {first["id"], third["id"]}
+
+    asyncio.run(scenario())
+
+
+def test_lane_runs_one_job_at_a_time_across_workers(tmp_path):
+    async def scenario():
+        a, b = make_workers(tmp_path)
+        active, peak = [0], [0]
+
+        async def work(job):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.1)
+            active[0] -= 1
+
+        a.HEARTBEAT_SECONDS = b.HEARTBEAT_SECONDS = 0.02
+        j1 = await a.submit("update", work, key=("update", "L", 1), lane=("fbref", "L"))
+        j2 = await b.submit("update", work, key=("update", "L", 2), lane=("fbref", "L"))
+        await asyncio.sleep(0.4)
+        assert peak[0] == 1
+        assert (await a.get(j1["id"]))["status"] == (await a.get(j2["id"]))["status"] == "success"
+
+    asyncio.run(scenario())
+
+
+def test_job_of_a_dead_worker_stops_blocking(tmp_path):
+    async def scenario():
+        a, = make_workers(tmp_path, 1)
+        store = a.store
+        await store.claim(
+            {"id": "dead", "name": "update", "status": "running", "waiters": 1, "created_at": "2000-01-01T00:00:00Z",
+             "active_key": "k", "heartbeat_at": time.time() - 3600},
+            stale_before=time.time() - a.STALE_AFTER_SECONDS,
+        )
+        fresh, created = await store.claim(
+            {"id": "fresh", "name": "update", "status": "queued", "waiters": 1, "created_at": "2000-01-01T00:00:01Z",
+             "active_key": "k", "heartbeat_at": time.time()},
+            stale_before=time.time() - a.STALE_AFTER_SECONDS,
+        )
+        assert created and fresh["id"] == "fresh"
+        lost = await store.get("dead")
+        assert lost["status"] == "error" and lost["error"] == a.LOST_ERROR
+
+    asyncio.run(scenario())
@@ -0,0 +1,149 @@
+import asyncio
+import copy
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from services.utils.lease_service import FileLeaseService, MongoLeaseService
+
+
+class FakeLeaseCollection:
+    """
+    Local stand-in for the motor collection MongoLeaseService uses: _id-unique
+    documents, the {"_id", "$or": [owner | expires_at $lte]} filter and upserts that
+    raise DuplicateKeyError when the _id exists but the filter doesn't match.
+    """
+
+    def __init__(self):
+        self.docs = {}
+
+    async def create_index(self, *args, **kwargs):
+        return "expires_at_1"
+
+    @staticmethod
+    def _matches(doc, flt):
+        for key, value in flt.items():
+            if key == "$or":
+                if not any(FakeLeaseCollection._matches(doc, sub) for sub in value):
+                    return False
+            elif isinstance(value, dict) and "$lte" in value:
+                if key not in doc or not doc[key] <= value["$lte"]:
+                    return False
+            elif doc.get(key) != value:
+                return False
+        return True
+
+    async def find_one_and_update(self, flt, update, upsert=False, return_document=None):
+        doc = self.docs.get(flt["_id"])
+        if doc is not None and self._matches(doc, flt):
+            doc.update(update["$set"])
+            return copy.deepcopy(doc)
+        if not upsert:
+            return None
+        if doc is not None:
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.docs[flt["_id"]] = {"_id": flt["_id"], **update["$set"]}
+        return copy.deepcopy(self.docs[flt["_id"]])
+
+    async def delete_one(self, flt):
+        doc = self.docs.get(flt["_id"])
+        if doc is not None and self._matches(doc, flt):
+            del self.docs[flt["_id"]]
+
+    async def find_one(self, flt):
+        return copy.deepcopy(self.docs.get(flt["_id"]))
+
+
+@pytest.fixture(params=["file", "mongo"])
+def leases(request, tmp_path):
+    """Two lease services (two processes) sharing one backend."""
+    if request.param == "file":
+        return FileLeaseService(tmp_path, owner="a"), FileLeaseService(tmp_path, owner="b")
+    collection = FakeLeaseCollection()
+    return MongoLeaseService(collection, owner="a"), MongoLeaseService(collection, owner="b")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_acquire_free_lease(leases):
+    a, b = leases
+    assert run(a.acquire("poll", timedelta(minutes=1)))
+    assert not run(b.acquire("poll", timedelta(minutes=1)))
+    assert run(a.holder("poll"))["owner"] == "a"
+
+
+def test_renew_before_ttl_extends_lease(leases):
+    a, b = leases
+    assert run(a.acquire("poll", timedelta(seconds=30)))
+    first = datetime.fromisoformat(run(a.holder("poll"))["expires_at"])
+    assert run(a.acquire("poll", timedelta(minutes=10)))
+    renewed = datetime.fromisoformat(run(a.holder("poll"))["expires_at"])
+    assert renewed > first + timedelta(minutes=5)
+    assert not run(b.acquire("poll", timedelta(minutes=1)))
+
+
+def test_takeover_after_expiry(leases):
+    a, b = leases
+    assert run(a.acquire("poll", timedelta(milliseconds=50)))
+    assert not run(b.acquire("poll", timedelta(minutes=1)))
+    run(asyncio.sleep(0.1))
+    assert run(a.holder("poll")) is None
+    assert run(b.acquire("poll", timedelta(minutes=1)))
+    assert run(b.holder("poll"))["owner"] == "b"
+    # The old leader can't renew once it lost the lease
+    assert not run(a.acquire("poll", timedelta(minutes=1)))
+
+
+def test_release_by_non_owner_keeps_lease(leases):
+    a, b = leases
+    assert run(a.acquire("poll", timedelta(minutes=1)))
+    run(b.release("poll"))
+    assert run(a.holder("poll"))["owner"] == "a"
+    assert not run(b.acquire("poll", timedelta(minutes=1)))
+
+
+def test_release_by_owner_hands_over(leases):
+    a, b = leases
+    assert run(a.acquire("poll", timedelta(minutes=1)))
+    run(a.release("poll"))
+    assert run(a.holder("poll")) is None
+    assert run(b.acquire("poll", timedelta(minutes=1)))
+
+
+def test_leases_are_independent_by_name(leases):
+    a, b = leases
+    assert run(a.acquire("poll", timedelta(minutes=1)))
+    assert run(b.acquire("other", timedelta(minutes=1)))
+    assert run(a.holder("other"))["owner"] == "b"
+
+
+def test_file_lease_waits_on_guard_without_blocking_the_loop(tmp_path):
+    a = FileLeaseService(tmp_path, owner="a")
+    guard = tmp_path / "poll.guard"
+    guard.touch()  # another process is mid read-modify-write
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async def release_guard():
+            await asyncio.sleep(0.2)
+            guard.unlink()
+
+        task = asyncio.create_task(ticker())
+        asyncio.create_task(release_guard())
+        acquired = await a.acquire("poll", timedelta(minutes=1))
+        task.cancel()
+        return acquired, ticks
+
+    acquired, ticks = run(scenario())
+    assert acquired
+    assert ticks >= 5  # the loop kept running while acquire waited for the guard
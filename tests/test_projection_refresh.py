@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+from services.fantasy.fantasy_player_model_service import FantasyPlayerModelService
+from services.fantasy.fantasy_projection_service import FantasyProjectionService
+
+
+class FakeFantasy:
+    def __init__(self, bootstrap, fixtures):
+        self.bootstrap, self.fixtures = bootstrap, fixtures
+
+    def get_bootstrap(self, force=False):
+        return self.bootstrap
+
+    def get_fixtures(self):
+        return self.fixtures
+
+
+def make_model(fantasy):
+    registered = []
+    model = FantasyPlayerModelService.__new__(FantasyPlayerModelService)
+    model.fantasy = fantasy
+    model.fixture_service = SimpleNamespace(
+        set_fixtures=lambda teams, fixtures: registered.append(fixtures),
+        get_team_strength=lambda name: None,
+        league_xg_per90=None,
+    )
+    model.bootstrap, model.fixtures = {}, []
+    model.refresh_fpl(force=False)
+    return model, registered
+
+
+def test_refresh_reloads_fpl_fixtures_and_rebuilds_matrices():
+    bootstrap = {
+        "teams": [{"id": 1, "name": "Arsenal"}, {"id": 2, "name": "Chelsea"}],
+        "elements": [{"id": 10, "team": 1, "element_type": 3}],
+        "element_types": [{"id": 3, "singular_name_short": "MID"}],
+    }
+    fantasy = FakeFantasy(bootstrap, [{"id": 1, "event": 5, "team_h": 1, "team_a": 2, "finished": False}])
+    model, registered = make_model(fantasy)
+    projections = FantasyProjectionService(model)
+    assert projections.opponent.shape == (2, 1, 1)
+
+    # A rescheduled match turns gameweek 6 into a double for both clubs
+    fantasy.fixtures = fantasy.fixtures + [
+        {"id": 2, "event": 6, "team_h": 2, "team_a": 1, "finished": False},
+        {"id": 3, "event": 6, "team_h": 1, "team_a": 2, "finished": False},
+    ]
+    version = projections.version
+    projections.refresh()
+
+    assert projections.version == version + 1
+    assert projections.gameweeks.tolist() == [5, 6]
+    assert projections.opponent.shape == (2, 2, 2)
+    assert registered[-1] is fantasy.fixtures
+
+
+def test_failed_fetch_keeps_previous_fpl_data():
+    bootstrap = {"teams": [{"id": 1, "name": "Arsenal"}], "elements": [], "element_types": []}
+    fixtures = [{"id": 1, "event": 5, "team_h": 1, "team_a": 1, "finished": False}]
+    fantasy = FakeFantasy(bootstrap, fixtures)
+    model, _ = make_model(fantasy)
+
+    fantasy.bootstrap, fantasy.fixtures = {}, []
+    model.refresh_fpl()
+
+    assert model.teams == {1: {"id": 1, "name": "Arsenal"}}
+    assert model.fixtures == fixtures
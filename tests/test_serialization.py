@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.utils import serialization_service
+from services.utils.serialization_service import serializer
+
+
+def flatten_dict(d):
+    """The per-row helper the scrapers used before frame_records()."""
+    flat = {}
+    for k, v in d.items():
+        if isinstance(v, dict):
+            for subk, subv in v.items():
+                flat[f"{k}_{subk}"] = subv
+        elif isinstance(v, list):
+            flat[k] = json.dumps(v, ensure_ascii=False)
+        else:
+            flat[k] = v
+    return flat
+
+
+def test_frame_records_matches_per_row_flatten_on_ragged_dicts():
+    df = pd.DataFrame({
+        "game_id": ["a", "b", "c"],
+        "date": pd.to_datetime(["2025-08-16 14:00", "2025-08-17 16:30", "2025-08-18 20:00"]),
+        "score": [{"home": 2, "away": 1}, {"home": 0}, 0],
+        "status": [{"finished": True, "reason": {"short": "FT"}}, {"started": False}, {"finished": False}],
+        "scorers": [["Saka"], [], 0],
+    })
+    expected = [flatten_dict(row) for row in df.assign(date=df["date"].astype(str)).to_dict(orient="records")]
+    records = serializer.frame_records(df)
+    assert records == expected
+    assert [list(r) for r in records] == [list(r) for r in expected]  # same keys, same order
+    assert type(records[1]["score_home"]) is int
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    pytest.importorskip("orjson")
+    payload = {
+        "xg": float("nan"),
+        "inf": float("inf"),
+        "values": np.array([1.5, np.nan]),
+        "count": np.int64(3),
+        "ratio": np.float32(0.5),
+        "kickoff": pd.Timestamp("2025-08-16 14:00", tz="UTC"),
+        1: ("a", "b"),
+    }
+    fast = serializer.dumps(payload)
+    monkeypatch.setattr(serialization_service, "orjson", None)
+    assert serializer.dumps(payload) == fast
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from services.utils.table_store_service import TableStoreService
+
+FIXTURES = pd.DataFrame({
+    "game_id": ["a", "b", "c"],
+    "kickoff": [pd.Timestamp("2025-08-16 14:00", tz="UTC"), 0, "2025-08-23T16:30:00Z"],
+    "score": [{"home": 2, "away": 1}, None, {"home": 0, "away": 0}],
+    "scorers": [["Saka", "Havertz"], [], None],
+    "attendance": [60000, 0, 59000],
+})
+
+
+@pytest.fixture
+def store():
+    return TableStoreService()
+
+
+def test_round_trip_keeps_meta_json_columns_and_types(tmp_path, store):
+    path = tmp_path / "fixtures.parquet"
+    store.write(path, FIXTURES, meta={"league": "ENG-Premier League", "weeks": [1, 2]}, datetime_cols=["kickoff"])
+
+    df = store.read(path)
+    assert df.attrs["meta"] == {"league": "ENG-Premier League", "weeks": [1, 2]}
+    assert sorted(df.attrs["json_columns"]) == ["score", "scorers"]
+    assert str(df["kickoff"].dtype) == "datetime64[ns, UTC]"
+    assert df["attendance"].dtype == "int64"
+
+    records = store.to_records(df)
+    assert records[0]["score"] == {"home": 2, "away": 1}
+    assert records[1]["scorers"] == [] and records[2]["scorers"] is None
+    assert records[0]["kickoff"] == "2025-08-16T14:00:00+00:00"
+
+
+def test_zero_placeholder_dates_become_missing(tmp_path, store):
+    path = tmp_path / "fixtures.parquet"
+    store.write(path, FIXTURES, datetime_cols=["kickoff"])
+    assert [r["kickoff"] for r in store.to_records(store.read(path))] == [
+        "2025-08-16T14:00:00+00:00", None, "2025-08-23T16:30:00+00:00",
+    ]
+
+
+def test_reload_of_unchanged_table_diffs_to_zero(tmp_path, store):
+    path = tmp_path / "fixtures.parquet"
+    store.write(path, FIXTURES, meta={"n": 3}, datetime_cols=["kickoff"])
+    first = store.to_records(store.read(path))
+
+    # Rewrite what was read back, as the sync does after a no-op scrape
+    store.write(path, pd.DataFrame(first), meta={"n": 3}, datetime_cols=["kickoff"])
+    reread = TableStoreService().read(path)
+    assert store.to_records(reread) == first
+    assert reread.attrs["meta"] == {"n": 3}
+
+
+def test_fixture_sync_reload_from_parquet_diffs_to_zero(tmp_path):
+    from services.utils.fixture_sync_service import FixtureSyncService
+
+    scraped = [
+        {"game_id": "a", "date": "2025-08-16 14:00:00", "home_score": 2, "away_score": 1, "status": "finished",
+         "xg": 1.7, "events": [{"minute": "12", "player1": "Saka"}]},
+        {"game_id": "b", "date": 0, "home_score": None, "away_score": None, "status": "scheduled",
+         "xg": None, "events": []},
+    ]
+    path = tmp_path / "fixtures.parquet"
+    first = FixtureSyncService("test", "L", "2526", path).sync([dict(f) for f in scraped])
+    assert len(first["changes"]) == 2
+
+    # A fresh process reads the table back and re-syncs the same scrape
+    again = FixtureSyncService("test", "L", "2526", path).sync([dict(f) for f in scraped])
+    assert again["changes"] == []
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from services.fantasy.fantasy_transfer_planner_service import FantasyTransferPlannerService
+
+
+def make_projections(players, n_teams=20):
+    ep = np.array([p.pop("ep") for p in players], dtype=float)
+    return SimpleNamespace(
+        players=players,
+        player_pos=np.array([p["element_type"] for p in players], dtype=np.int64),
+        player_team=np.array([p["team"] for p in players], dtype=np.int64),
+        team_ids=np.arange(n_teams),
+        compute=lambda horizon: {"total": ep},
+        model=SimpleNamespace(teams={}),
+    )
+
+
+def test_budget_squad_still_finds_affordable_upgrade():
+    players, squad = [], []
+    # 15 cheap squad players: 2 GKP, 5 DEF, 5 MID, 3 FWD, spread over clubs
+    for n, code in enumerate([1] * 2 + [2] * 5 + [3] * 5 + [4] * 3):
+        players.append({"id": n + 1, "element_type": code, "team": n % 15, "now_cost": 45, "ep": 10.0})
+        squad.append(n + 1)
+    # 60 premium midfielders nobody in this squad can afford, all out-projecting the bargain
+    for n in range(60):
+        players.append({"id": 100 + n, "element_type": 3, "team": n % 20, "now_cost": 120 + n % 10, "ep": 40.0 + n})
+    players.append({"id": 999, "element_type": 3, "team": 19, "now_cost": 50, "ep": 25.0})
+
+    planner = FantasyTransferPlannerService(make_projections(players))
+    result = planner.plan_for_squad(squad, bank=5, horizon=5, free_transfers=1, top_k=5)
+
+    best = result["best_by_transfers"]["1"]
+    assert best is not None
+    assert best["transfers"][0]["in"]["id"] == 999
+    assert best["net_gain"] == 15.0
+
+
+def budget_squad(dear=()):
+    """15 squad players at 4.5m (2 GKP, 5 DEF, 5 MID, 3 FWD), with `dear` MIDs repriced."""
+    players, squad = [], []
+    for n, code in enumerate([1] * 2 + [2] * 5 + [3] * 5 + [4] * 3):
+        players.append({"id": n + 1, "element_type": code, "team": n % 15, "now_cost": 45, "ep": 10.0})
+        squad.append(n + 1)
+    mids = [p for p in players if p["element_type"] == 3]
+    for p, price in zip(mids, dear):
+        p["now_cost"] = price
+    return players, squad
+
+
+def test_unaffordable_premiums_do_not_crowd_out_a_double_transfer_target():
+    # Selling both 8.0m midfielders for the 4.0m filler leaves exactly 12.0m for one buy
+    players, squad = budget_squad(dear=(80, 80))
+    players.append({"id": 500, "element_type": 3, "team": 16, "now_cost": 40, "ep": 5.0})
+    players.append({"id": 501, "element_type": 3, "team": 15, "now_cost": 120, "ep": 50.0})
+    # Same price band, better projections, a tenth too dear for any plan
+    for n in range(5):
+        players.append({"id": 600 + n, "element_type": 3, "team": 17 + n % 3, "now_cost": 121 + n % 4, "ep": 60.0 + n})
+
+    planner = FantasyTransferPlannerService(make_projections(players))
+    result = planner.plan_for_squad(squad, bank=0, horizon=5, free_transfers=2, top_k=5)
+
+    best = result["best_by_transfers"]["2"]
+    assert best is not None
+    assert sorted(t["in"]["id"] for t in best["transfers"]) == [500, 501]
+    assert best["net_gain"] == 35.0
+
+
+def test_straight_swap_for_priciest_player_survives_when_every_buy_is_dear():
+    # Cheapest player on offer (6.0m) costs more than the second priciest squad player
+    players, squad = budget_squad(dear=(100,))
+    players.append({"id": 500, "element_type": 3, "team": 15, "now_cost": 100, "ep": 30.0})
+    players.append({"id": 501, "element_type": 2, "team": 16, "now_cost": 60, "ep": 1.0})
+
+    planner = FantasyTransferPlannerService(make_projections(players))
+    result = planner.plan_for_squad(squad, bank=0, horizon=5, free_transfers=1, top_k=5)
+
+    best = result["best_by_transfers"]["1"]
+    assert best is not None
+    assert best["transfers"][0]["in"]["id"] == 500
@@ -0,0 +1,42 @@
+import json
+import os
+
+from models.fotmob.fixture import FotMobFixture
+from services.whoscored.whoscored_json_service import WhoScoredJSONService
+
+ARSENAL_CHELSEA = {"game_id": "1901", "date": "2025-08-16T14:00:00Z", "home_team": "Arsenal", "away_team": "Chelsea"}
+LIVERPOOL_EVERTON = {"game_id": "1902", "date": "2025-08-17T16:30:00Z", "home_team": "Liverpool", "away_team": "Everton"}
+
+
+def write_whoscored(path, fixtures, mtime):
+    path.write_text(json.dumps({"meta": {}, "fixtures": fixtures}), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def fotmob(game_id, date, home, away):
+    return FotMobFixture(round=1, week="1", date=date, home_team=home, away_team=away, home_score=0,
+                         away_score=0, status="scheduled", game_id=game_id, url="")
+
+
+def test_misses_are_retried_and_reschedules_invalidate(tmp_path):
+    path = tmp_path / "whoscored.json"
+    write_whoscored(path, [ARSENAL_CHELSEA], mtime=1_000_000)
+    service = WhoScoredJSONService(json_file=str(path))
+    fixtures = [
+        fotmob("f1", "2025-08-16T14:05:00Z", "Arsenal", "Chelsea"),
+        fotmob("f2", "2025-08-17T16:30:00Z", "Liverpool", "Everton"),
+    ]
+    assert service.match_fixtures(fixtures) == {"f1": "1901", "f2": None}
+
+    # WhoScored publishes the second game: the earlier miss wasn't cached
+    write_whoscored(path, [ARSENAL_CHELSEA, LIVERPOOL_EVERTON], mtime=1_000_100)
+    assert service.match_fixtures(fixtures) == {"f1": "1901", "f2": "1902"}
+
+    # FotMob moves f1 by a week; WhoScored hasn't caught up yet
+    WhoScoredJSONService._on_fixtures_synced("fotmob", "L", "2526", [{"id": "f1", "changes": ["rescheduled"]}])
+    fixtures[0] = fotmob("f1", "2025-08-23T14:00:00Z", "Arsenal", "Chelsea")
+    assert service.match_fixtures(fixtures) == {"f1": None, "f2": "1902"}
+
+    # ...and matches again once WhoScored has the new kickoff
+    write_whoscored(path, [{**ARSENAL_CHELSEA, "date": "2025-08-23T14:00:00Z"}, LIVERPOOL_EVERTON], mtime=1_000_200)
+    assert service.match_fixtures(fixtures) == {"f1": "1901", "f2": "1902"}